@@ -0,0 +1,4 @@
+"""
+Advisor Core
+Code shared by the Streamlit app, the MCP servers and the deployment scripts
+"""
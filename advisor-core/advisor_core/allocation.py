@@ -0,0 +1,116 @@
+"""
+Allocation Core
+Capital market assumptions, horizon caps, risk-score mapping, the bounded
+mean-variance frontier solver and allocation wording shared by the Streamlit
+app and the MCP server
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+ASSET_CLASSES = ('stocks', 'bonds', 'alternatives', 'cash')
+ASSET_LABELS = {'stocks': 'Stocks', 'bonds': 'Bonds', 'alternatives': 'Alternatives', 'cash': 'Cash'}
+
+# Suggested implementation per asset class label
+VEHICLES = {
+    'Stocks': 'broad-market equity index funds, split between domestic and international',
+    'Bonds': 'investment-grade aggregate bond funds',
+    'Alternatives': 'REIT and diversified real-asset funds',
+    'Cash': 'money-market funds or short Treasury bills',
+}
+
+# Long-run capital market assumptions (annualized), used when no price
+# history is available to build the asset return matrix
+CAPITAL_MARKET_ASSUMPTIONS = {
+    'expected_return': np.array([0.085, 0.040, 0.060, 0.030]),
+    'volatility': np.array([0.160, 0.055, 0.120, 0.005]),
+    'correlation': np.array([
+        [1.00, 0.10, 0.60, 0.00],
+        [0.10, 1.00, 0.20, 0.10],
+        [0.60, 0.20, 1.00, 0.00],
+        [0.00, 0.10, 0.00, 1.00],
+    ]),
+    'benchmark_weights': np.array([1.0, 0.0, 0.0, 0.0]),
+}
+
+HORIZON_BUCKETS = ('1-3 years', '3-5 years', '5-10 years', '10+ years')
+
+# Upper limit in years of each bucket but the last
+HORIZON_LIMITS = (3, 5, 10)
+
+# Per-asset weight caps by horizon (stocks, bonds, alternatives, cash):
+# shorter horizons cannot ride out equity drawdowns
+HORIZON_UPPER_BOUNDS = np.array([
+    [0.40, 1.00, 0.10, 1.00],
+    [0.60, 1.00, 0.15, 1.00],
+    [0.80, 1.00, 0.20, 1.00],
+    [0.95, 1.00, 0.20, 1.00],
+])
+
+RISK_TOLERANCE_SCORES = {'Conservative': 3.0, 'Moderate': 5.5, 'Aggressive': 8.0}
+
+# One-in-twenty-year loss from annual mean and volatility (normal approximation)
+Z_95 = 1.6448536269514722
+
+
+def horizon_bucket(years: float, open_ended: bool = False) -> int:
+    """Index into HORIZON_BUCKETS for a horizon in years; an open-ended '10+ years' belongs above the 10 year limit"""
+    return int(np.searchsorted(HORIZON_LIMITS, years, side='right' if open_ended else 'left'))
+
+
+def format_allocation(allocation_pct: Dict[str, float]) -> str:
+    """'Stocks 60%, Bonds 40%' from percentages by label (shares under half a percent are left out)"""
+    return ", ".join(f"{label} {pct:g}%" for label, pct in allocation_pct.items() if pct >= 0.5)
+
+
+def assumption_moments() -> Tuple[np.ndarray, np.ndarray]:
+    """Annualized expected returns and covariance from the capital market assumptions"""
+    cma = CAPITAL_MARKET_ASSUMPTIONS
+    return cma['expected_return'], cma['correlation'] * np.outer(cma['volatility'], cma['volatility'])
+
+
+def score_to_volatility(score: float) -> float:
+    """Target volatility for a 1-10 risk score (1 -> 0%, 10 -> 20% vol)"""
+    return (min(max(score, 1.0), 10.0) - 1.0) / 9.0 * 0.20
+
+
+def project_box_simplex(values: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """Row-wise exact projection onto {w : sum(w) = 1, lower <= w <= upper}.
+
+    sum(clip(v - s, lower, upper)) is piecewise linear and non-increasing in
+    the shift s with breakpoints at v - upper and v - lower, so the shift is
+    found by evaluating every breakpoint and interpolating where it crosses 1.
+    """
+    breakpoints = np.sort(np.concatenate([values - upper, values - lower], axis=1), axis=1)
+    totals = np.clip(values[:, None, :] - breakpoints[:, :, None], lower[:, None, :], upper[:, None, :]).sum(axis=2)
+    right = np.clip((totals > 1.0).sum(axis=1), 1, breakpoints.shape[1] - 1)[:, None]
+    s0, s1 = np.take_along_axis(breakpoints, right - 1, 1), np.take_along_axis(breakpoints, right, 1)
+    f0, f1 = np.take_along_axis(totals, right - 1, 1), np.take_along_axis(totals, right, 1)
+    drop = f0 - f1
+    shift = s0 + np.where(drop > 0, (f0 - 1.0) / np.where(drop > 0, drop, 1.0), 0.0) * (s1 - s0)
+    return np.clip(values - shift, lower, upper)
+
+
+def solve_frontier(expected_returns: np.ndarray, covariance: np.ndarray, lower: np.ndarray,
+                   upper: np.ndarray, levels: int = 256, iterations: int = 600) -> np.ndarray:
+    """Mean-variance optimal weights (rows x levels x assets) for each row of bounds.
+
+    Solves max w.mu - gamma/2 w'Sigma w within each row's per-asset bounds
+    for a log-spaced grid of risk aversions. Every (bounds, level) problem is
+    a row of one batch, solved together by accelerated projected gradient.
+    """
+    rows, size = upper.shape
+    gammas = np.tile(np.geomspace(0.25, 1e4, levels), rows)[:, None]
+    step = 1.0 / (gammas * np.linalg.eigvalsh(covariance).max() + 1e-12)
+    lower = np.repeat(lower, levels, axis=0)
+    upper = np.repeat(upper, levels, axis=0)
+
+    weights = project_box_simplex(np.full((rows * levels, size), 1.0 / size), lower, upper)
+    momentum = weights
+    for k in range(1, iterations + 1):
+        gradient = expected_returns - gammas * (momentum @ covariance)
+        updated = project_box_simplex(momentum + step * gradient, lower, upper)
+        momentum = updated + (k - 1.0) / (k + 2.0) * (updated - weights)
+        weights = updated
+    return weights.reshape(rows, levels, size)
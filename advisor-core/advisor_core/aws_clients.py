@@ -0,0 +1,117 @@
+"""
+Shared AWS Client Factory
+One tuned boto3 client per service, region and client configuration, reused across the process
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+# Settings fields that change how a client is built; they are part of its cache key
+CONFIG_FIELDS = (
+    'aws_max_pool_connections',
+    'aws_connect_timeout',
+    'aws_read_timeout',
+    'aws_tcp_keepalive',
+    'aws_retry_mode',
+    'aws_max_attempts',
+)
+
+_clients: Dict[Tuple, object] = {}
+_lock = threading.Lock()
+_session = None
+_default_settings = None
+
+
+class ClientSettings:
+    """Region and connection settings from the AWS_* environment variables.
+
+    Any object with these attributes can be passed as ``settings``; the
+    Streamlit app's ``Settings`` reads the same variables.
+    """
+
+    def __init__(self):
+        self.aws_region = os.getenv('AWS_REGION', 'us-east-1')
+        self.bedrock_region = os.getenv('BEDROCK_REGION', self.aws_region)
+        self.aws_max_pool_connections = int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '50'))
+        self.aws_connect_timeout = float(os.getenv('AWS_CONNECT_TIMEOUT', '5'))
+        self.aws_read_timeout = float(os.getenv('AWS_READ_TIMEOUT', '120'))
+        self.aws_retry_mode = os.getenv('AWS_RETRY_MODE', 'adaptive')
+        self.aws_max_attempts = int(os.getenv('AWS_MAX_ATTEMPTS', '5'))
+        self.aws_tcp_keepalive = os.getenv('AWS_TCP_KEEPALIVE', 'true').lower() == 'true'
+
+
+def default_settings() -> ClientSettings:
+    """Environment settings, read once per process (``reset_clients`` re-reads them)"""
+    global _default_settings
+    if _default_settings is None:
+        _default_settings = ClientSettings()
+    return _default_settings
+
+
+def build_client_config(settings: Optional[ClientSettings] = None) -> Config:
+    """Connection pool, keep-alive, timeout and retry settings for boto3 clients"""
+    settings = settings or default_settings()
+    return Config(
+        max_pool_connections=settings.aws_max_pool_connections,
+        connect_timeout=settings.aws_connect_timeout,
+        read_timeout=settings.aws_read_timeout,
+        tcp_keepalive=settings.aws_tcp_keepalive,
+        retries={
+            'mode': settings.aws_retry_mode,
+            'total_max_attempts': settings.aws_max_attempts
+        }
+    )
+
+
+def _client_key(service_name: str, region_name: Optional[str], settings: ClientSettings) -> Tuple:
+    if region_name is None:
+        region_name = settings.bedrock_region if service_name.startswith('bedrock') else settings.aws_region
+    return (service_name, region_name) + tuple(getattr(settings, field) for field in CONFIG_FIELDS)
+
+
+def get_client(service_name: str, region_name: Optional[str] = None,
+               settings: Optional[ClientSettings] = None):
+    """Return the shared client for a service, creating it on first use.
+
+    boto3 clients are thread-safe but sessions are not, so clients are built
+    under a lock from one process-wide session and then shared freely.
+    Callers whose settings differ in any of ``CONFIG_FIELDS`` get their own
+    client.
+    """
+    global _session
+
+    settings = settings or default_settings()
+    key = _client_key(service_name, region_name, settings)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            if _session is None:
+                _session = boto3.session.Session()
+            client = _session.client(service_name, region_name=key[1], config=build_client_config(settings))
+            _clients[key] = client
+    return client
+
+
+def register_client(service_name: str, client, region_name: Optional[str] = None,
+                    settings: Optional[ClientSettings] = None):
+    """Share a prebuilt client for a service (e.g. an offline stand-in for load tests)"""
+    key = _client_key(service_name, region_name, settings or default_settings())
+    with _lock:
+        _clients[key] = client
+
+
+def reset_clients():
+    """Drop cached clients and re-read the environment (e.g. after credentials or settings change)"""
+    global _session, _default_settings
+    with _lock:
+        _clients.clear()
+        _session = None
+        _default_settings = None
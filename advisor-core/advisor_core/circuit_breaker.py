@@ -0,0 +1,65 @@
+"""
+Circuit Breaker
+Stops calling a failing remote service for a while, then probes it with one trial call
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Stops calling a service after repeated failures, then lets one trial call through.
+
+    Closed: calls pass. After ``failure_threshold`` consecutive failures it
+    opens and every call is refused for ``reset_after`` seconds. Then it is
+    half-open: the first ``allow()`` claims the single trial call and every
+    other caller is refused until the trial is recorded, which closes the
+    circuit on success or re-opens it. A trial never recorded (e.g. a
+    cancelled call) is given up after another ``reset_after`` seconds.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_after: float = 30.0, name: str = 'Bedrock'):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self.opened_at >= self.reset_after else 'open'
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only the caller that claims the trial"""
+        with self._lock:
+            state = self.state
+            if state != 'half-open':
+                return state == 'closed'
+            now = time.monotonic()
+            if self.trial_started is not None and now - self.trial_started < self.reset_after:
+                return False
+            self.trial_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_started = None
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"{self.name} circuit opened after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
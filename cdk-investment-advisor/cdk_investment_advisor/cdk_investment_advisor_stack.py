@@ -108,6 +108,15 @@ class CdkInvestmentAdvisorStack(Stack):
             }
         )
 
+        # boto3 client tuning shared by Lambda functions (mirrors the app's AWS_* settings)
+        aws_client_environment = {
+            "AWS_MAX_POOL_CONNECTIONS": "50",
+            "AWS_CONNECT_TIMEOUT": "5",
+            "AWS_READ_TIMEOUT": "120",
+            "AWS_RETRY_MODE": "adaptive",
+            "AWS_MAX_ATTEMPTS": "5"
+        }
+
         # Lambda function for investment analysis
         investment_analyzer_lambda = _lambda.Function(
             self, "InvestmentAnalyzerFunction",
@@ -115,14 +124,27 @@ class CdkInvestmentAdvisorStack(Stack):
             handler="index.lambda_handler",
             code=_lambda.Code.from_inline("""
 import json
+import os
 import boto3
 import logging
+from botocore.config import Config
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-bedrock_runtime = boto3.client('bedrock-runtime')
-s3_client = boto3.client('s3')
+# Clients are created once per container and reused across invocations
+client_config = Config(
+    max_pool_connections=int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '50')),
+    connect_timeout=float(os.environ.get('AWS_CONNECT_TIMEOUT', '5')),
+    read_timeout=float(os.environ.get('AWS_READ_TIMEOUT', '120')),
+    tcp_keepalive=True,
+    retries={
+        'mode': os.environ.get('AWS_RETRY_MODE', 'adaptive'),
+        'total_max_attempts': int(os.environ.get('AWS_MAX_ATTEMPTS', '5'))
+    }
+)
+bedrock_runtime = boto3.client('bedrock-runtime', config=client_config)
+s3_client = boto3.client('s3', config=client_config)
 
 def lambda_handler(event, context):
     try:
@@ -189,7 +211,8 @@ def lambda_handler(event, context):
             timeout=Duration.minutes(5),
             environment={
                 "DATA_BUCKET": investment_data_bucket.bucket_name,
-                "KB_BUCKET": knowledge_base_bucket.bucket_name
+                "KB_BUCKET": knowledge_base_bucket.bucket_name,
+                **aws_client_environment
             }
         )
 
@@ -5,26 +5,32 @@ Tests the deployed Lambda functions and S3 integration
 """
 
 import json
-import boto3
 from botocore.exceptions import ClientError
 
+# Shared, tuned client factory (pip install -e ../advisor-core)
+from advisor_core.aws_clients import get_client
+
+DATA_BUCKET = 'investment-advisor-data-944308403469-us-east-1'
+KB_BUCKET = 'investment-advisor-kb-944308403469-us-east-1'
+
+def get_s3():
+    """The shared us-east-1 S3 client"""
+    return get_client('s3', region_name='us-east-1')
+
 def test_s3_access():
     """Test S3 bucket access and list documents"""
     print("🔍 Testing S3 Access...")
     
-    s3_client = boto3.client('s3', region_name='us-east-1')
-    
-    buckets = [
-        'investment-advisor-data-944308403469-us-east-1',
-        'investment-advisor-kb-944308403469-us-east-1'
-    ]
+    buckets = [DATA_BUCKET, KB_BUCKET]
     
     for bucket in buckets:
         try:
-            response = s3_client.list_objects_v2(Bucket=bucket)
+            # Paginated listing, so buckets with more than 1000 objects are fully shown
+            pages = get_s3().get_paginator('list_objects_v2').paginate(Bucket=bucket)
+            objects = [obj for page in pages for obj in page.get('Contents', [])]
             print(f"✅ {bucket}:")
-            if 'Contents' in response:
-                for obj in response['Contents']:
+            if objects:
+                for obj in objects:
                     print(f"   📄 {obj['Key']} ({obj['Size']} bytes)")
             else:
                 print("   📁 Empty bucket")
@@ -35,7 +41,7 @@ def test_lambda_portfolio_optimizer():
     """Test the Portfolio Optimizer Lambda function"""
     print("\n🧮 Testing Portfolio Optimizer Lambda...")
     
-    lambda_client = boto3.client('lambda', region_name='us-east-1')
+    lambda_client = get_client('lambda', region_name='us-east-1')
     
     test_payload = {
         "portfolio": {
@@ -62,8 +68,6 @@ def test_investment_data_upload():
     """Test uploading sample investment data"""
     print("\n📊 Testing Investment Data Upload...")
     
-    s3_client = boto3.client('s3', region_name='us-east-1')
-    
     sample_data = {
         "user_id": "test_user_001",
         "investment_amount": 100000,
@@ -78,8 +82,8 @@ def test_investment_data_upload():
     }
     
     try:
-        s3_client.put_object(
-            Bucket='investment-advisor-data-944308403469-us-east-1',
+        get_s3().put_object(
+            Bucket=DATA_BUCKET,
             Key='user-data/test_user_001.json',
             Body=json.dumps(sample_data, indent=2),
             ContentType='application/json'
@@ -93,8 +97,7 @@ def test_knowledge_base_documents():
     """Test reading knowledge base documents"""
     print("\n📚 Testing Knowledge Base Documents...")
     
-    s3_client = boto3.client('s3', region_name='us-east-1')
-    
+    s3_client = get_s3()
     documents = [
         'research/investment-research-2025.txt',
         'guides/portfolio-optimization-guide.txt'
@@ -102,13 +105,12 @@ def test_knowledge_base_documents():
     
     for doc in documents:
         try:
-            response = s3_client.get_object(
-                Bucket='investment-advisor-kb-944308403469-us-east-1',
-                Key=doc
-            )
-            content = response['Body'].read().decode('utf-8')
-            print(f"✅ {doc} ({len(content)} characters)")
-            print(f"   Preview: {content[:100]}...")
+            # Only the preview bytes are transferred, not the whole document
+            response = s3_client.get_object(Bucket=KB_BUCKET, Key=doc, Range='bytes=0-99')
+            size = int(response['ContentRange'].rsplit('/', 1)[1])
+            preview = response['Body'].read().decode('utf-8', errors='ignore')
+            print(f"✅ {doc} ({size} bytes)")
+            print(f"   Preview: {preview}...")
             
         except ClientError as e:
             print(f"❌ Error reading {doc}: {e}")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Report Pipeline Latency Benchmark
+Compares serial and concurrent section generation against a Bedrock client with simulated latency
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_worker_pool import OfflineBedrockClient
+from mcp_server_bedrock import BedrockMCPServer
+from report_pipeline import REPORT_LAYOUTS
+
+
+class SlowBedrockClient(OfflineBedrockClient):
+    """Offline client whose calls take a fixed wall-clock time, like a remote model"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke_model(self, modelId, body):
+        time.sleep(self.latency)
+        return super().invoke_model(modelId, body)
+
+
+def report_args(report_type: str):
+    return {
+        'report_type': report_type,
+        'user_profile': {'risk_tolerance': 'moderate', 'time_horizon': '10+ years', 'investment_amount': 250000},
+        'portfolio_data': {'Stocks': 60, 'Bonds': 30, 'Alternatives': 10},
+    }
+
+
+async def measure(latency: float, report_type: str, max_concurrency: int) -> float:
+    server = BedrockMCPServer(bedrock_client=SlowBedrockClient(latency))
+    server.report_concurrency = max_concurrency
+    start = time.perf_counter()
+    await server.call_tool('generate_report', report_args(report_type))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent report section generation")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per model call")
+    args = parser.parse_args()
+
+    print(f"{'report':>14} {'sections':>8} {'serial s':>9} {'parallel s':>10} {'speedup':>8}")
+    for report_type, layout in REPORT_LAYOUTS.items():
+        serial = asyncio.run(measure(args.latency, report_type, 1))
+        parallel = asyncio.run(measure(args.latency, report_type, len(layout)))
+        print(f"{report_type:>14} {len(layout):>8} {serial:>9.2f} {parallel:>10.2f} {serial / parallel:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
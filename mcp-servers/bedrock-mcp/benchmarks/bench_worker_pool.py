@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Worker Pool Throughput Benchmark
+Measures calls/s of the supervisor mode for 1..N workers against an offline Bedrock client
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from worker_pool import WorkerPool
+
+
+class OfflineBedrockClient:
+    """Stands in for bedrock-runtime so the benchmark measures local CPU work only"""
+
+    def invoke_model(self, modelId, body):
+        request = json.loads(body)
+        text = request.get('inputText') or json.dumps(request.get('messages'))
+        output = f"Report for {len(text)} characters of input."
+        if modelId.startswith('amazon.titan'):
+            payload = {'results': [{'outputText': output}]}
+        elif modelId.startswith('amazon.nova'):
+            payload = {'output': {'message': {'content': [{'text': output}]}}}
+        else:
+            payload = {'content': [{'text': output}]}
+        return {'body': io.BytesIO(json.dumps(payload).encode('utf-8'))}
+
+
+def offline_client_factory():
+    return OfflineBedrockClient()
+
+
+def build_calls(count: int, holdings: int):
+    """Report requests with large portfolios so prompt building and JSON dominate"""
+    calls = []
+    for i in range(count):
+        portfolio = {
+            f"ASSET_{j:04d}": {'weight': round(1.0 / holdings, 6), 'value': 1000.0 + i + j, 'sector': f"S{j % 11}"}
+            for j in range(holdings)
+        }
+        calls.append({
+            'name': 'generate_report',
+            'arguments': {
+                'user_profile': {'user_id': f"user_{i:06d}", 'risk_tolerance': 'moderate'},
+                'portfolio_data': portfolio,
+                'report_type': 'detailed'
+            }
+        })
+    return calls
+
+
+def run(workers: int, calls):
+    with WorkerPool(workers, client_factory=offline_client_factory) as pool:
+        # Warm up every worker so process start-up is excluded from the measurement
+        pool.map(calls[:workers * 2])
+        start = time.perf_counter()
+        results = pool.map(calls)
+        elapsed = time.perf_counter() - start
+    failures = sum(1 for result in results if result['status'] != 'ok')
+    return len(calls) / elapsed, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP supervisor mode scaling")
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--holdings", type=int, default=500)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    calls = build_calls(args.calls, args.holdings)
+    counts = sorted({1, 2, 4, 8, 16, args.max_workers} & set(range(1, args.max_workers + 1)))
+
+    print(f"{'workers':>8} {'calls/s':>10} {'speedup':>8} {'efficiency':>10} {'failures':>8}")
+    baseline = None
+    for workers in counts:
+        throughput, failures = run(workers, calls)
+        baseline = baseline or throughput
+        speedup = throughput / baseline
+        print(f"{workers:>8} {throughput:>10.1f} {speedup:>8.2f} {speedup / workers:>10.0%} {failures:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Local Fallback
+Deterministic narratives built from the locally computed figures, used
+when the model is unavailable
+"""
+
+from typing import Any, Dict, List, Optional
+
+from advisor_core.allocation import VEHICLES
+from report_pipeline import REPORT_LAYOUTS, SECTIONS, assemble
+
+
+class ModelUnavailable(RuntimeError):
+    """Bedrock failed, timed out or is short-circuited"""
+
+
+def _allocation_lines(allocation_pct: Dict[str, float]) -> List[str]:
+    return [f"- {label} {pct}%: {VEHICLES.get(label, 'diversified funds')}" for label, pct in allocation_pct.items()]
+
+
+def analysis_narrative(figures: Dict[str, Any]) -> str:
+    """Explanation of a QuantEngine.analyze result"""
+    metrics, outlook = figures['metrics'], figures['projection']
+    lines = [
+        f"This is the efficient allocation for {figures['risk_tolerance'].lower()} risk tolerance over a "
+        f"{figures['horizon_bucket']} horizon: the highest expected return available at "
+        f"{metrics['volatility_pct']}% volatility within the equity limits for that horizon.",
+        "",
+        "Suggested vehicles:",
+        *_allocation_lines(figures['allocation_pct']),
+        "",
+        f"In a one-in-twenty year the portfolio could lose about {metrics['var_95_pct']}%; the chance of "
+        f"ending the {outlook['years']:g}-year horizon below the starting amount is "
+        f"{outlook['probability_of_loss_pct']}%.",
+        "Hold bonds in tax-advantaged accounts where possible, and rebalance when any asset class drifts "
+        "more than 5 points from target.",
+    ]
+    return "\n".join(lines)
+
+
+def optimization_narrative(figures: Dict[str, Any]) -> str:
+    """Explanation of a QuantEngine.optimize result"""
+    before, after = figures['current_metrics'], figures['optimized_metrics']
+    moves = [
+        f"- {'Increase' if change > 0 else 'Reduce'} {label} by {abs(change)} points"
+        for label, change in sorted(figures['changes_pct'].items(), key=lambda item: -abs(item[1]))
+    ]
+    turnover = figures['turnover_pct']
+    lines = [
+        f"The optimized allocation is the {figures['selection_rule']} portfolio within the given constraints. "
+        f"Sharpe ratio moves from {before['sharpe_ratio']} to {after['sharpe_ratio']} and the 95% VaR "
+        f"from {before['var_95_pct']}% to {after['var_95_pct']}%.",
+        "",
+        "Changes:",
+        *(moves or ["- None: the current allocation is already on the constrained frontier"]),
+        "",
+        ("Trade in two or three steps over the next quarter to limit timing risk and realized gains."
+         if turnover > 20 else "Turnover is small enough to implement in a single rebalance."),
+        "Monitor drift quarterly against the new targets.",
+    ]
+    if figures.get('ignored_constraints'):
+        lines.append(f"Constraints not recognized and ignored: {', '.join(figures['ignored_constraints'])}.")
+    return "\n".join(lines)
+
+
+def risk_level(score: float) -> str:
+    return 'low' if score <= 3.5 else 'moderate' if score <= 6.5 else 'high'
+
+
+def risk_narrative(risk: Dict[str, Any], stress: Dict[str, Any]) -> str:
+    """Interpretation of QuantEngine.risk_metrics and StressTestEngine.run results"""
+    metrics = risk['metrics']
+    worst = sorted(stress['scenarios'], key=lambda scenario: -scenario['median_loss_pct'])[:2]
+    stocks = risk['allocation_pct'].get('Stocks', 0)
+    headline = f"The risk score of {stress['risk_score']}/10 is {risk_level(stress['risk_score'])}"
+    if len(worst) > 1:
+        headline += (f": the worst scenario ({worst[0]['name']}) costs a median {worst[0]['median_loss_pct']}%, "
+                     f"followed by {worst[1]['name']} at {worst[1]['median_loss_pct']}%")
+    lines = [
+        f"{headline}.",
+        f"Over {risk['horizon_years']:g} years the probability of a loss is {risk['probability_of_loss_pct']}%.",
+        f"The portfolio behaves like {metrics['effective_assets']} equally weighted holdings "
+        f"(diversification ratio {metrics['diversification_ratio']}).",
+        "",
+        "Mitigations:",
+    ]
+    if stocks > 60 and risk['horizon_years'] < 5:
+        lines.append(f"- {stocks}% in stocks is high for a {risk['horizon_years']:g}-year horizon; move part to bonds or cash")
+    if metrics['effective_assets'] < 2:
+        lines.append("- Add a third asset class to reduce concentration")
+    if stress['risk_score'] > 6.5:
+        lines.append("- Keep a year of planned withdrawals in cash so a drawdown does not force sales")
+    lines.append("- Rebalance back to target after large market moves")
+    return "\n".join(lines)
+
+
+def local_report(report_type: str, analysis: Optional[Dict[str, Any]], risk: Optional[Dict[str, Any]],
+                 stress: Optional[Dict[str, Any]]) -> str:
+    """Sectioned report from computed figures only (same layout as the model-written report)"""
+    texts = {key: "Not available without client data." for key in SECTIONS}
+    summary = []
+    if analysis:
+        metrics = analysis['metrics']
+        summary.append(
+            f"- Recommended allocation: {', '.join(f'{k} {v}%' for k, v in analysis['allocation_pct'].items())} "
+            f"(expected return {metrics['expected_return_pct']}%, volatility {metrics['volatility_pct']}%)"
+        )
+        texts['recommendations'] = analysis_narrative(analysis)
+    if risk and stress:
+        summary.append(f"- Current portfolio risk score {stress['risk_score']}/10, "
+                       f"worst scenario {stress['worst_scenario']}")
+        metrics = risk['metrics']
+        texts['portfolio_analysis'] = (
+            f"Allocation: {', '.join(f'{k} {v}%' for k, v in risk['allocation_pct'].items())}.\n"
+            f"Expected return {metrics['expected_return_pct']}%, volatility {metrics['volatility_pct']}%, "
+            f"Sharpe {metrics['sharpe_ratio']}, {metrics['effective_assets']} effective holdings."
+        )
+        texts['performance_metrics'] = (
+            f"- 95% one-year VaR: {metrics['var_95_pct']}%\n- 95% CVaR: {metrics['cvar_95_pct']}%\n"
+            f"- Diversification ratio: {metrics['diversification_ratio']}"
+        )
+        texts['risk_analysis'] = risk_narrative(risk, stress)
+    texts['executive_summary'] = "\n".join(summary) or "No allocation data was provided."
+    texts['next_steps'] = (
+        "- Confirm the target allocation with the client\n- Implement the trades at the next rebalance date\n"
+        "- Review quarterly, and regenerate this report once the AI service is available"
+    )
+    layout = REPORT_LAYOUTS.get(report_type, REPORT_LAYOUTS['detailed'])
+    return assemble(report_type, [(SECTIONS[key][0], texts[key]) for key in layout])
@@ -4,18 +4,22 @@ Custom MCP Server for Amazon Bedrock Integration
 Provides investment-specific AI capabilities
 """
 
+import argparse
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
-import boto3
+import os
+from typing import Any, Dict, List, Optional, Tuple
 from botocore.exceptions import ClientError
 
 from mcp.server import Server
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.types import (
     Resource,
+    ResourceLink,
+    ResourceTemplate,
     Tool,
     TextContent,
     ImageContent,
@@ -23,19 +27,141 @@ from mcp.types import (
     LoggingLevel
 )
 
+from advisor_core.allocation import format_allocation
+from advisor_core.aws_clients import get_client
+from advisor_core.circuit_breaker import CircuitBreaker
+from fallback import (
+    ModelUnavailable, analysis_narrative, local_report, optimization_narrative, risk_narrative
+)
+from prompts import ADVISOR_SYSTEM_PROMPT, UsageMetrics, build_request_body, parse_response
+from quant_engine import QuantEngine
+from report_pipeline import ReportPipeline
+from report_store import URI_PREFIX, ReportStore
+from response_cache import ResponseCache
+from stress_scenarios import MAX_UNCERTAINTY, SHOCK_LIMITS, StressTestEngine, format_results, portfolio_weights
+from validation import ArgumentError, compile_validator
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+USAGE_URI = "metrics://usage"
+
+# Output budget for the narrative around locally computed figures
+NARRATIVE_MAX_TOKENS = int(os.getenv("NARRATIVE_MAX_TOKENS", "600"))
+
+# Model per tool. All accept prompt-cache checkpoints, so the shared system
+# prompt (and a report's shared context) is served from cache after the first call
+ANALYSIS_MODEL = "amazon.nova-lite-v1:0"
+OPTIMIZATION_MODEL = "amazon.nova-pro-v1:0"
+RISK_MODEL = "amazon.nova-pro-v1:0"
+REPORT_MODEL = "amazon.nova-lite-v1:0"
+
+# Tool definitions; input schemas are also compiled into validators at startup
+TOOLS = [
+    Tool(
+        name="analyze_investment",
+        description="Analyze investment scenarios using AI",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "investment_amount": {"type": "number", "minimum": 0},
+                "risk_tolerance": {"type": "string", "enum": ["conservative", "moderate", "aggressive"]},
+                "time_horizon": {"type": "string"},
+                "goals": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["investment_amount", "risk_tolerance", "time_horizon"]
+        }
+    ),
+    Tool(
+        name="optimize_portfolio",
+        description="Optimize portfolio allocation using AI",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "current_allocation": {"type": "object"},
+                "constraints": {"type": "object"},
+                "objectives": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["current_allocation"]
+        }
+    ),
+    Tool(
+        name="assess_risk",
+        description="Assess investment risk using AI models",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "portfolio": {"type": "object", "description": "Holdings as percentages or amounts; used as weights"},
+                "portfolio_value": {"type": "number", "minimum": 0,
+                                    "description": "Portfolio value in dollars, to report stress losses in dollars"},
+                "market_conditions": {
+                    "type": "object",
+                    "properties": {
+                        "stress_scenarios": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "name": {"type": "string"},
+                                    "description": {"type": "string"},
+                                    "shocks": {
+                                        "type": "object",
+                                        "properties": {
+                                            factor: {"type": "number", "minimum": low, "maximum": high}
+                                            for factor, (low, high) in SHOCK_LIMITS.items()
+                                        },
+                                        "additionalProperties": False
+                                    },
+                                    "uncertainty": {"type": "number", "minimum": 0, "maximum": MAX_UNCERTAINTY}
+                                },
+                                "required": ["shocks"]
+                            }
+                        }
+                    }
+                },
+                "time_horizon": {"type": "string"}
+            },
+            "required": ["portfolio"]
+        }
+    ),
+    Tool(
+        name="generate_report",
+        description="Generate comprehensive investment report",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "user_profile": {"type": "object"},
+                "portfolio_data": {"type": "object"},
+                "report_type": {"type": "string", "enum": ["summary", "detailed", "risk_analysis"]},
+                "known_hash": {"type": "string", "description": "sha256 of a report the client already holds"}
+            },
+            "required": ["user_profile", "portfolio_data"]
+        }
+    )
+]
+
 class BedrockMCPServer:
-    def __init__(self):
+    def __init__(self, bedrock_client=None, cache: Optional[ResponseCache] = None):
         self.server = Server("bedrock-investment-advisor")
-        self.bedrock_client = None
-        self.available_models = [
-            "amazon.titan-text-express-v1",
-            "amazon.nova-pro-v1:0",
-            "anthropic.claude-3-haiku-20240307-v1:0"
-        ]
+        self.bedrock_client = bedrock_client
+        self.cache = cache
+        self.stress_engine = StressTestEngine()
+        self.quant = QuantEngine()
+        self.report_concurrency = int(os.getenv("REPORT_MAX_CONCURRENCY", "6"))
+        self.reports = ReportStore(
+            os.getenv("BEDROCK_REPORT_DIR"),
+            page_size=int(os.getenv("REPORT_PAGE_SIZE", "32768"))
+        )
+        self.inline_limit = int(os.getenv("REPORT_INLINE_LIMIT", "16384"))
+        self.usage = UsageMetrics()
+        self.model_timeout = float(os.getenv("BEDROCK_TIMEOUT", "30"))
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("BEDROCK_CIRCUIT_FAILURES", "3")),
+            reset_after=float(os.getenv("BEDROCK_CIRCUIT_RESET", "30"))
+        )
+        self.validators = {tool.name: compile_validator(tool.name, tool.inputSchema) for tool in TOOLS}
+        self.available_models = [ANALYSIS_MODEL, OPTIMIZATION_MODEL]
         
         # Register handlers
         self.setup_handlers()
@@ -46,262 +172,336 @@ class BedrockMCPServer:
         @self.server.list_tools()
         async def handle_list_tools() -> List[Tool]:
             """List available Bedrock tools"""
+            return TOOLS
+        
+        @self.server.list_resources()
+        async def handle_list_resources() -> List[Resource]:
+            """Stored reports, most recent first"""
             return [
-                Tool(
-                    name="analyze_investment",
-                    description="Analyze investment scenarios using AI",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "investment_amount": {"type": "number"},
-                            "risk_tolerance": {"type": "string", "enum": ["conservative", "moderate", "aggressive"]},
-                            "time_horizon": {"type": "string"},
-                            "goals": {"type": "array", "items": {"type": "string"}}
-                        },
-                        "required": ["investment_amount", "risk_tolerance", "time_horizon"]
-                    }
-                ),
-                Tool(
-                    name="optimize_portfolio",
-                    description="Optimize portfolio allocation using AI",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "current_allocation": {"type": "object"},
-                            "constraints": {"type": "object"},
-                            "objectives": {"type": "array", "items": {"type": "string"}}
-                        },
-                        "required": ["current_allocation"]
-                    }
-                ),
-                Tool(
-                    name="assess_risk",
-                    description="Assess investment risk using AI models",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "portfolio": {"type": "object"},
-                            "market_conditions": {"type": "object"},
-                            "time_horizon": {"type": "string"}
-                        },
-                        "required": ["portfolio"]
-                    }
-                ),
-                Tool(
-                    name="generate_report",
-                    description="Generate comprehensive investment report",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "user_profile": {"type": "object"},
-                            "portfolio_data": {"type": "object"},
-                            "report_type": {"type": "string", "enum": ["summary", "detailed", "risk_analysis"]}
-                        },
-                        "required": ["user_profile", "portfolio_data"]
-                    }
+                Resource(
+                    uri=entry.uri,
+                    name=entry.name,
+                    description=f"sha256 {entry.sha256}, {entry.pages} page(s) of {entry.page_size} characters",
+                    mimeType=entry.mime_type,
+                    size=entry.size
+                )
+                for entry in self.reports.entries()
+            ] + [
+                Resource(
+                    uri=USAGE_URI,
+                    name="Model token usage",
+                    description="Token totals per model, including prompt-cache reads and writes",
+                    mimeType="application/json"
+                )
+            ]
+        
+        @self.server.list_resource_templates()
+        async def handle_list_resource_templates() -> List[ResourceTemplate]:
+            return [
+                ResourceTemplate(
+                    uriTemplate=URI_PREFIX + "{sha256}{?page,offset,length}",
+                    name="Investment Report",
+                    description="Stored report, whole or by page (1-based) or character range",
+                    mimeType="text/markdown"
                 )
             ]
         
-        @self.server.call_tool()
+        @self.server.read_resource()
+        async def handle_read_resource(uri) -> List[ReadResourceContents]:
+            """Read a stored report, whole or one page / range of it"""
+            if str(uri) == USAGE_URI:
+                return [ReadResourceContents(content=json.dumps(self.usage.snapshot(), indent=2),
+                                             mime_type="application/json")]
+            text, entry, meta = self.reports.read(str(uri))
+            return [ReadResourceContents(content=text, mime_type=entry.mime_type, meta=meta)]
+        
+        # Arguments are validated (and coerced) by our compiled validators in call_tool
+        @self.server.call_tool(validate_input=False)
         async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             """Handle tool calls"""
-            try:
-                if name == "analyze_investment":
-                    return await self.analyze_investment(arguments)
-                elif name == "optimize_portfolio":
-                    return await self.optimize_portfolio(arguments)
-                elif name == "assess_risk":
-                    return await self.assess_risk(arguments)
-                elif name == "generate_report":
-                    return await self.generate_report(arguments)
-                else:
-                    raise ValueError(f"Unknown tool: {name}")
-            
-            except Exception as e:
-                logger.error(f"Tool call error: {str(e)}")
-                return [TextContent(type="text", text=f"Error: {str(e)}")]
+            return await self.call_tool(name, arguments)
+    
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Dispatch a tool call by name (shared by stdio and worker pool modes)"""
+        validator = self.validators.get(name)
+        if validator is None:
+            return [TextContent(type="text", text=f"Error: Unknown tool: {name}")]
+        try:
+            arguments = validator(arguments)
+        except ArgumentError as e:
+            logger.warning(str(e))
+            return [TextContent(type="text", text=json.dumps(e.to_dict()))]
+        
+        try:
+            if name == "analyze_investment":
+                return await self.analyze_investment(arguments)
+            elif name == "optimize_portfolio":
+                return await self.optimize_portfolio(arguments)
+            elif name == "assess_risk":
+                return await self.assess_risk(arguments)
+            elif name == "generate_report":
+                return await self.generate_report(arguments)
+            else:
+                raise ValueError(f"Unknown tool: {name}")
+        
+        except Exception as e:
+            logger.error(f"Tool call error: {str(e)}")
+            return [TextContent(type="text", text=f"Error: {str(e)}")]
     
     async def analyze_investment(self, args: Dict[str, Any]) -> List[TextContent]:
-        """Analyze investment scenario using Bedrock"""
+        """Compute the recommended allocation locally, then have Bedrock explain it"""
         try:
-            prompt = self.create_investment_analysis_prompt(args)
-            response = await self.call_bedrock_model(prompt, "amazon.titan-text-express-v1")
+            figures = self.quant.analyze(
+                args['investment_amount'], args['risk_tolerance'], args['time_horizon'], args.get('goals', [])
+            )
+            prompt = self.create_investment_analysis_prompt(args, figures)
+            narrative, source = await self.narrate(
+                prompt, ANALYSIS_MODEL, lambda: analysis_narrative(figures)
+            )
             
-            return [TextContent(
-                type="text",
-                text=f"Investment Analysis:\n\n{response}"
-            )]
+            metrics, outlook = figures['metrics'], figures['projection']
+            summary = (
+                f"Recommended allocation: {format_allocation(figures['allocation_pct'])}\n"
+                f"Expected return {metrics['expected_return_pct']}%, volatility {metrics['volatility_pct']}%, "
+                f"Sharpe {metrics['sharpe_ratio']}\n"
+                f"After {outlook['years']:g} years: median ${outlook['median_value']:,.0f} "
+                f"(10-90%: ${outlook['p10_value']:,.0f} - ${outlook['p90_value']:,.0f})"
+            )
+            return self.hybrid_result("Investment Analysis", summary, narrative, figures, source)
         
         except Exception as e:
             return [TextContent(type="text", text=f"Analysis failed: {str(e)}")]
     
     async def optimize_portfolio(self, args: Dict[str, Any]) -> List[TextContent]:
-        """Optimize portfolio using AI"""
+        """Optimize the allocation locally, then have Bedrock explain the changes"""
         try:
-            prompt = self.create_portfolio_optimization_prompt(args)
-            response = await self.call_bedrock_model(prompt, "amazon.nova-pro-v1:0")
+            figures = self.quant.optimize(
+                args['current_allocation'], args.get('constraints'), args.get('objectives', [])
+            )
+            prompt = self.create_portfolio_optimization_prompt(args, figures)
+            narrative, source = await self.narrate(
+                prompt, OPTIMIZATION_MODEL, lambda: optimization_narrative(figures)
+            )
             
-            return [TextContent(
-                type="text",
-                text=f"Portfolio Optimization:\n\n{response}"
-            )]
+            before, after = figures['current_metrics'], figures['optimized_metrics']
+            summary = (
+                f"Optimized allocation ({figures['selection_rule']}): "
+                f"{format_allocation(figures['optimized_allocation_pct'])}\n"
+                f"Expected return {before['expected_return_pct']}% -> {after['expected_return_pct']}%, "
+                f"volatility {before['volatility_pct']}% -> {after['volatility_pct']}%, "
+                f"turnover {figures['turnover_pct']}%"
+            )
+            return self.hybrid_result("Portfolio Optimization", summary, narrative, figures, source)
         
         except Exception as e:
             return [TextContent(type="text", text=f"Optimization failed: {str(e)}")]
     
     async def assess_risk(self, args: Dict[str, Any]) -> List[TextContent]:
-        """Assess investment risk"""
+        """Run stress tests and risk metrics locally, then have Bedrock interpret them"""
         try:
-            prompt = self.create_risk_assessment_prompt(args)
-            response = await self.call_bedrock_model(prompt, "anthropic.claude-3-haiku-20240307-v1:0")
+            stress = self.stress_engine.run(
+                args['portfolio'], args.get('market_conditions', {}).get('stress_scenarios'),
+                args.get('portfolio_value')
+            )
+            risk = self.quant.risk_metrics(args['portfolio'], args.get('time_horizon'))
+            prompt = self.create_risk_assessment_prompt(args, stress, risk)
+            narrative, source = await self.narrate(
+                prompt, RISK_MODEL, lambda: risk_narrative(risk, stress)
+            )
             
-            return [TextContent(
-                type="text",
-                text=f"Risk Assessment:\n\n{response}"
-            )]
+            metrics = risk['metrics']
+            summary = (
+                f"Volatility {metrics['volatility_pct']}%, 1-year VaR 95% {metrics['var_95_pct']}%, "
+                f"CVaR 95% {metrics['cvar_95_pct']}%, probability of loss over "
+                f"{risk['horizon_years']:g} years {risk['probability_of_loss_pct']}%\n\n"
+                f"Stress Tests:\n{format_results(stress)}"
+            )
+            return self.hybrid_result("Risk Assessment", summary, narrative, {**risk, 'stress': stress}, source)
         
         except Exception as e:
             return [TextContent(type="text", text=f"Risk assessment failed: {str(e)}")]
     
+    async def narrate(self, prompt: str, model_id: str, fallback) -> Tuple[str, str]:
+        """(narrative, source): the model's text, or the local narrative when Bedrock is unavailable"""
+        try:
+            return await self.call_bedrock_model(prompt, model_id, NARRATIVE_MAX_TOKENS), 'model'
+        except ModelUnavailable as e:
+            logger.warning(f"Using local narrative: {str(e)}")
+            return fallback(), 'local'
+    
+    def hybrid_result(self, title: str, summary: str, narrative: str, figures: Dict[str, Any],
+                      source: str = 'model') -> List[TextContent]:
+        """Computed figures and narrative as text, followed by the figures as JSON"""
+        if source == 'local':
+            narrative = f"(AI service unavailable; narrative generated locally.)\n\n{narrative}"
+        return [
+            TextContent(type="text", text=f"{title}:\n\n{summary}\n\n{narrative.strip()}"),
+            TextContent(type="text", text=json.dumps({**figures, 'narrative_source': source}))
+        ]
+    
     async def generate_report(self, args: Dict[str, Any]) -> List[TextContent]:
-        """Generate comprehensive investment report"""
+        """Generate a sectioned investment report, sections produced concurrently"""
         try:
-            prompt = self.create_report_prompt(args)
-            response = await self.call_bedrock_model(prompt, "amazon.titan-text-express-v1")
-            
-            return [TextContent(
-                type="text",
-                text=f"Investment Report:\n\n{response}"
-            )]
+            pipeline = ReportPipeline(
+                self.call_bedrock_model, REPORT_MODEL, self.report_concurrency
+            )
+            try:
+                report = await pipeline.run(args, on_section=self.section_notifier())
+            except ModelUnavailable as e:
+                logger.warning(f"Using local report: {str(e)}")
+                report = self.create_local_report(args)
+            entry = self.reports.put(report, name=f"{args.get('report_type', 'summary').title()} Investment Report")
+            return self.report_result(entry, report, args.get('known_hash'))
         
         except Exception as e:
             return [TextContent(type="text", text=f"Report generation failed: {str(e)}")]
     
-    def create_investment_analysis_prompt(self, args: Dict[str, Any]) -> str:
-        """Create prompt for investment analysis"""
-        return f"""
-        As an expert investment advisor, analyze the following investment scenario:
-        
-        Investment Amount: ${args['investment_amount']:,}
-        Risk Tolerance: {args['risk_tolerance']}
-        Time Horizon: {args['time_horizon']}
-        Goals: {', '.join(args.get('goals', []))}
+    def report_result(self, entry, report: str, known_hash: Optional[str] = None) -> List[Any]:
+        """Inline small reports; link large ones and send only their first page"""
+        link = ResourceLink(
+            type="resource_link",
+            uri=entry.uri,
+            name=entry.name,
+            description=f"sha256 {entry.sha256}",
+            mimeType=entry.mime_type,
+            size=entry.size
+        )
+        if known_hash and known_hash == entry.sha256:
+            return [TextContent(type="text", text=f"Investment Report unchanged ({entry.uri})"), link]
+        if entry.size <= self.inline_limit:
+            return [TextContent(type="text", text=f"Investment Report:\n\n{report}"), link]
         
-        Provide a comprehensive analysis including:
-        1. Recommended asset allocation
-        2. Specific investment vehicles
-        3. Expected returns and risks
-        4. Tax considerations
-        5. Rebalancing strategy
-        
-        Format the response as structured recommendations.
-        """
+        header = (
+            f"Investment Report ({entry.size:,} characters, {entry.pages} pages) stored at {entry.uri}\n"
+            f"sha256: {entry.sha256}\n"
+            f"Read further pages with {entry.page_uri(2)} ... {entry.page_uri(entry.pages)}\n\n"
+        )
+        return [TextContent(type="text", text=header + report[:entry.page_size]), link]
     
-    def create_portfolio_optimization_prompt(self, args: Dict[str, Any]) -> str:
-        """Create prompt for portfolio optimization"""
-        current = args['current_allocation']
-        return f"""
-        Optimize the following portfolio allocation:
-        
-        Current Allocation: {json.dumps(current, indent=2)}
-        Constraints: {json.dumps(args.get('constraints', {}), indent=2)}
-        Objectives: {', '.join(args.get('objectives', ['maximize_return', 'minimize_risk']))}
+    def section_notifier(self):
+        """Progress callback streaming finished sections to the client, if it asked for progress"""
+        try:
+            context = self.server.request_context
+        except LookupError:
+            return None
+        token = context.meta.progressToken if context.meta else None
+        if token is None:
+            return None
         
-        Provide:
-        1. Optimized allocation percentages
-        2. Rationale for changes
-        3. Expected improvement metrics
-        4. Implementation timeline
-        5. Monitoring recommendations
-        """
+        async def notify(key: str, heading: str, text: str, completed: int, total: int):
+            await context.session.send_progress_notification(
+                token, completed, total=total, message=f"## {heading}\n\n{text.strip()}"
+            )
+        return notify
     
-    def create_risk_assessment_prompt(self, args: Dict[str, Any]) -> str:
-        """Create prompt for risk assessment"""
-        return f"""
-        Assess the risk profile of this investment portfolio:
-        
-        Portfolio: {json.dumps(args['portfolio'], indent=2)}
-        Market Conditions: {json.dumps(args.get('market_conditions', {}), indent=2)}
-        Time Horizon: {args.get('time_horizon', 'Not specified')}
-        
-        Provide:
-        1. Overall risk score (1-10)
-        2. Key risk factors
-        3. Diversification analysis
-        4. Stress test scenarios
-        5. Risk mitigation recommendations
-        """
+    def create_local_report(self, args: Dict[str, Any]) -> str:
+        """Report from locally computed figures when Bedrock is unavailable"""
+        profile, holdings = args.get('user_profile', {}), args.get('portfolio_data', {})
+        analysis = risk = stress = None
+        if profile.get('risk_tolerance'):
+            try:
+                analysis = self.quant.analyze(
+                    float(profile.get('investment_amount', 100000)), profile['risk_tolerance'],
+                    profile.get('time_horizon'), profile.get('goals', profile.get('investment_goals', []))
+                )
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Skipping profile analysis in local report: {str(e)}")
+        if portfolio_weights(holdings)[1] > 0:
+            risk = self.quant.risk_metrics(holdings, profile.get('time_horizon'))
+            stress = self.stress_engine.run(holdings)
+        return local_report(args.get('report_type', 'summary'), analysis, risk, stress)
+    
+    @staticmethod
+    def compact(data: Any) -> str:
+        return json.dumps(data, separators=(',', ':'), sort_keys=True)
+    
+    def create_investment_analysis_prompt(self, args: Dict[str, Any], figures: Dict[str, Any]) -> str:
+        """Short narrative prompt around the computed allocation"""
+        return (
+            f"Client: ${args['investment_amount']:,} to invest, {args['risk_tolerance']} risk tolerance, "
+            f"time horizon {args['time_horizon']}, goals: {', '.join(args.get('goals', [])) or 'not specified'}.\n"
+            f"Computed recommendation: {self.compact(figures)}\n"
+            "In at most 250 words, explain why this allocation fits the client, suggest vehicles for each "
+            "asset class, and note tax and rebalancing considerations. Do not restate the figures as a table."
+        )
+    
+    def create_portfolio_optimization_prompt(self, args: Dict[str, Any], figures: Dict[str, Any]) -> str:
+        """Short narrative prompt around the computed optimization"""
+        return (
+            f"Objectives: {', '.join(args.get('objectives', [])) or 'balanced risk and return'}; "
+            f"constraints: {self.compact(args.get('constraints', {}))}.\n"
+            f"Computed optimization: {self.compact(figures)}\n"
+            "In at most 200 words, explain the rationale for the changes, an implementation timeline and "
+            "what to monitor. Do not restate the figures as a table."
+        )
+    
+    def create_risk_assessment_prompt(self, args: Dict[str, Any], stress: Dict[str, Any],
+                                      risk: Dict[str, Any]) -> str:
+        """Short narrative prompt around the computed risk metrics and stress losses"""
+        losses = {scenario['name']: scenario['median_loss_pct'] for scenario in stress['scenarios']}
+        return (
+            f"Time horizon: {args.get('time_horizon', 'not specified')}; "
+            f"market conditions: {self.compact(args.get('market_conditions', {}))}.\n"
+            f"Computed risk metrics: {self.compact(risk)}\n"
+            f"Median stress losses (%): {self.compact(losses)}; worst: {stress['worst_scenario']}; "
+            f"risk score {stress['risk_score']}/10.\n"
+            "In at most 200 words, interpret the risk score for this horizon, name the exposures driving the "
+            "worst scenarios, assess diversification and recommend mitigations. Do not restate the figures as a table."
+        )
     
-    def create_report_prompt(self, args: Dict[str, Any]) -> str:
-        """Create prompt for report generation"""
-        report_type = args.get('report_type', 'summary')
-        return f"""
-        Generate a {report_type} investment report for:
+    async def call_bedrock_model(self, prompt: str, model_id: str, max_tokens: int = 2000,
+                                 prefix: Optional[str] = None) -> str:
+        """Call Bedrock model: advisor system prompt, optional shared prefix, then the variable prompt.
         
-        User Profile: {json.dumps(args['user_profile'], indent=2)}
-        Portfolio Data: {json.dumps(args['portfolio_data'], indent=2)}
+        Raises ModelUnavailable on errors, on timeout and while the circuit is open.
+        """
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(model_id, prompt, max_tokens, ADVISOR_SYSTEM_PROMPT, prefix or '')
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        Include:
-        1. Executive summary
-        2. Current portfolio analysis
-        3. Performance metrics
-        4. Recommendations
-        5. Next steps
+        if not self.breaker.allow():
+            raise ModelUnavailable(f"Bedrock circuit open after {self.breaker.failures} consecutive failures")
         
-        Format as a professional investment report.
-        """
-    
-    async def call_bedrock_model(self, prompt: str, model_id: str) -> str:
-        """Call Bedrock model with prompt"""
         try:
             if not self.bedrock_client:
-                self.bedrock_client = boto3.client('bedrock-runtime', region_name='us-east-1')
+                self.bedrock_client = get_client('bedrock-runtime')
             
-            if model_id.startswith('amazon.titan'):
-                body = json.dumps({
-                    'inputText': prompt,
-                    'textGenerationConfig': {
-                        'maxTokenCount': 2000,
-                        'temperature': 0.7,
-                        'topP': 0.9
-                    }
-                })
-            elif model_id.startswith('amazon.nova'):
-                body = json.dumps({
-                    'messages': [{'role': 'user', 'content': [{'text': prompt}]}],
-                    'max_tokens': 2000,
-                    'temperature': 0.7
-                })
-            elif model_id.startswith('anthropic.claude'):
-                body = json.dumps({
-                    'anthropic_version': 'bedrock-2023-05-31',
-                    'max_tokens': 2000,
-                    'messages': [{'role': 'user', 'content': prompt}]
-                })
-            else:
-                raise ValueError(f"Unsupported model: {model_id}")
+            body = build_request_body(model_id, prompt, max_tokens, prefix=prefix)
             
-            response = self.bedrock_client.invoke_model(
-                modelId=model_id,
-                body=body
+            # boto3 blocks; run it off the event loop so concurrent calls overlap
+            response = await asyncio.wait_for(
+                asyncio.to_thread(self.bedrock_client.invoke_model, modelId=model_id, body=body),
+                timeout=self.model_timeout
             )
             
-            response_body = json.loads(response['body'].read())
-            
-            # Parse response based on model type
-            if model_id.startswith('amazon.titan'):
-                return response_body['results'][0]['outputText']
-            elif model_id.startswith('amazon.nova'):
-                return response_body['output']['message']['content'][0]['text']
-            elif model_id.startswith('anthropic.claude'):
-                return response_body['content'][0]['text']
+            text, usage = parse_response(model_id, json.loads(response['body'].read()))
+            self.usage.record(model_id, usage)
+            logger.info(
+                f"{model_id}: {usage.get('input_tokens', 0)} input tokens "
+                f"(cache read {usage.get('cache_read_tokens', 0)}, write {usage.get('cache_write_tokens', 0)}), "
+                f"{usage.get('output_tokens', 0)} output tokens"
+            )
             
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            logger.error(f"Bedrock call to {model_id} timed out after {self.model_timeout:g}s")
+            raise ModelUnavailable(f"Bedrock call timed out after {self.model_timeout:g}s")
         except ClientError as e:
+            self.breaker.record_failure()
             logger.error(f"Bedrock API error: {str(e)}")
-            return f"AI service temporarily unavailable. Error: {str(e)}"
+            raise ModelUnavailable(f"AI service temporarily unavailable: {str(e)}") from e
         except Exception as e:
+            self.breaker.record_failure()
             logger.error(f"Unexpected error: {str(e)}")
-            return f"Analysis failed due to technical error: {str(e)}"
+            raise ModelUnavailable(f"Model call failed: {str(e)}") from e
+        
+        self.breaker.record_success()
+        if cache_key:
+            self.cache.set(cache_key, text)
+        return text
     
     async def run(self):
         """Run the MCP server"""
@@ -324,5 +524,21 @@ async def main():
     server = BedrockMCPServer()
     await server.run()
 
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Bedrock MCP server for the Investment Advisor")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Run in supervisor mode with N worker processes instead of stdio")
+    parser.add_argument("--input", help="JSONL file of {\"name\", \"arguments\"} tool calls (supervisor mode)")
+    parser.add_argument("--output", help="JSONL file for results (defaults to stdout)")
+    parser.add_argument("--cache-dir", default=os.getenv("BEDROCK_CACHE_DIR"),
+                        help="Shared on-disk response cache directory")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.workers > 0:
+        from worker_pool import run_bulk
+        run_bulk(args.input, args.output, args.workers, cache_dir=args.cache_dir)
+    else:
+        asyncio.run(main())
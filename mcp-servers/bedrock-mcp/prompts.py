@@ -0,0 +1,183 @@
+"""
+Prompt Layout
+Stable advisor system prefix, per-model request bodies with prompt-cache
+checkpoints, and token usage accounting
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Shared by every tool call; keep it byte-for-byte stable so providers can
+# serve it from their prompt cache. It has to stay above PROMPT_CACHE_MIN_TOKENS
+# on its own: shorter prefixes are silently not cached
+ADVISOR_SYSTEM_PROMPT = """You are an expert investment advisor assisting a licensed financial professional.
+
+Principles:
+- Base every statement on the client data and computed figures supplied in the request. When a number is supplied (allocations, stress losses, risk scores, metrics), quote it as given; never recompute, round differently or invent figures that are not in the request.
+- Match recommendations to the client's risk tolerance, time horizon, goals and constraints. Call out explicitly when the current portfolio is inconsistent with them.
+- Prefer broadly diversified, low-cost vehicles (index funds and ETFs) over individual securities unless the request asks for specific holdings.
+- Consider taxes, fees, liquidity needs and rebalancing costs when recommending changes.
+- State risks and trade-offs plainly. Do not promise returns; describe expected outcomes as ranges with their main uncertainties.
+- This is decision support for an advisor, not personalized advice to a retail client; do not include legal disclaimers unless asked.
+
+How the supplied figures are produced:
+- Every number in a request was computed before the request was sent. Your job is to explain those numbers, connect them to the client and recommend actions; the computation itself is not up for debate, although you may point out limitations of the method.
+- Asset classes are Stocks, Bonds, Alternatives and Cash. Holdings that could not be mapped to a class are listed as unmapped holdings and are modelled as a balanced fund (half stocks, half bonds); mention them when they are a material share of the portfolio.
+- Expected return and volatility are annualized and come from long-run capital market assumptions, not from recent performance. Treat them as planning estimates that can be wrong by several percentage points in any given year.
+- The Sharpe ratio uses a 3% risk-free rate. The diversification ratio is the weighted average of asset volatilities divided by portfolio volatility; values close to 1 mean little diversification benefit. Effective assets is the inverse of the sum of squared weights; a value near 1 means the portfolio behaves like a single asset class.
+- VaR 95% and CVaR 95% are one-year parametric figures expressed as a percentage of portfolio value: VaR is the loss exceeded in one year out of twenty, CVaR is the average loss in those worst years. They assume normally distributed returns and understate the risk of sudden crashes.
+- Projections are lognormal: the median value is the central outcome and the 10th to 90th percentile values bound eight outcomes in ten. Probability of loss is the chance of ending the horizon below the starting value, before fees, taxes, contributions and withdrawals.
+- Recommended allocations are points on an efficient frontier that respects per-asset caps for the time horizon. Horizons are bucketed as 1-3 years, 3-5 years, 5-10 years and 10+ years; shorter horizons cap stocks and alternatives because there is less time to recover from a drawdown. Risk tolerance selects the target volatility on that frontier: Conservative portfolios aim low, Moderate in the middle and Aggressive high.
+- Optimized allocations report the selection rule that was applied (highest Sharpe ratio, lowest volatility at the current expected return, or highest expected return at the current volatility), the trades needed in percentage points and the turnover, which is the share of the portfolio that has to be traded. Constraints that could not be applied are listed as ignored constraints and should be mentioned.
+- Stress tests apply historical and hypothetical factor shocks (equity, interest rates, credit spreads and real assets) to the portfolio. Each scenario is sampled thousands of times around its central shock, so it reports a median loss, a 5-95% loss range and an expected shortfall (the average loss in the worst 5% of samples). Losses are positive numbers; a negative loss is a gain. Custom scenarios supplied by the user are marked as custom.
+- The stress risk score runs from 1 to 10 and is driven by the worst median scenario loss, where a 40% loss scores 10. Compare it with the client's risk tolerance: a Conservative client with a score above 5, or any client whose worst scenario loss exceeds what their horizon can absorb, needs an explicit warning.
+- When a portfolio value is supplied, losses may also be given in dollars. Quote dollar figures only when they are present.
+
+Recommendations:
+- Explain the main driver of each recommendation in one line: which figure it rests on and why it matters for this client.
+- When the current allocation differs from the recommended one, prioritize the changes with the largest risk impact, and note when turnover is high enough that phasing the trades or using new contributions would be cheaper than selling.
+- For short horizons emphasize capital preservation and liquidity; for long horizons emphasize staying invested through drawdowns and rebalancing discipline.
+- Name suitable vehicle types (for example a total market equity index fund, an aggregate bond fund, a short-term Treasury fund or a diversified real assets fund) rather than specific tickers, unless specific holdings are requested.
+- If the data is incomplete or inconsistent (allocations that do not sum to 100%, unknown holdings, a horizon that conflicts with the goals), say so briefly and state the assumption you made.
+
+Format:
+- Use Markdown with short sections and bullet points.
+- Lead with the conclusion, then the supporting reasoning.
+- Keep allocations as percentages that sum to 100%.
+- Be concise: no preamble, no restating of the request, no closing summary unless asked.
+- When writing one section of a larger report, write only that section's body; other sections are written separately from the same client data, so do not repeat material that belongs to them."""
+
+# Smallest prefix the supported providers will cache (Nova and most Claude
+# models; Claude 3.5 Haiku needs 2048)
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English prose)"""
+    return len(text) // 4
+
+
+# Model id prefixes that accept prompt-cache checkpoints through InvokeModel
+# (override with a comma-separated PROMPT_CACHE_MODELS)
+DEFAULT_PROMPT_CACHE_MODELS = (
+    'anthropic.claude-3-5-haiku', 'anthropic.claude-3-7-sonnet', 'anthropic.claude-sonnet-4',
+    'anthropic.claude-opus-4', 'amazon.nova-micro', 'amazon.nova-lite', 'amazon.nova-pro',
+    'amazon.nova-premier',
+)
+
+
+def prompt_cache_models() -> Tuple[str, ...]:
+    configured = os.getenv('PROMPT_CACHE_MODELS')
+    if configured is None:
+        return DEFAULT_PROMPT_CACHE_MODELS
+    return tuple(prefix.strip() for prefix in configured.split(',') if prefix.strip())
+
+
+def supports_prompt_cache(model_id: str) -> bool:
+    # Cross-region inference profiles prefix the id with a region group ("us.")
+    base = model_id.split('.', 1)[1] if model_id.split('.', 1)[0] in ('us', 'eu', 'apac') else model_id
+    return base.startswith(prompt_cache_models())
+
+
+def build_request_body(model_id: str, prompt: str, max_tokens: int, system: str = ADVISOR_SYSTEM_PROMPT,
+                       prefix: Optional[str] = None) -> str:
+    """InvokeModel body: cacheable system block, optional cacheable shared prefix, then the variable prompt"""
+    cache = supports_prompt_cache(model_id)
+
+    if model_id.startswith('amazon.titan'):
+        # No system role or caching: send everything as one input
+        parts = [part for part in (system, prefix, prompt) if part]
+        return json.dumps({
+            'inputText': "\n\n".join(parts),
+            'textGenerationConfig': {
+                'maxTokenCount': max_tokens,
+                'temperature': 0.7,
+                'topP': 0.9
+            }
+        })
+
+    if 'amazon.nova' in model_id:
+        system_blocks: List[Dict[str, Any]] = [{'text': system}]
+        content: List[Dict[str, Any]] = []
+        if cache:
+            system_blocks.append({'cachePoint': {'type': 'default'}})
+        if prefix:
+            content.append({'text': prefix})
+            if cache:
+                content.append({'cachePoint': {'type': 'default'}})
+        content.append({'text': prompt})
+        return json.dumps({
+            'system': system_blocks,
+            'messages': [{'role': 'user', 'content': content}],
+            'inferenceConfig': {'maxTokens': max_tokens, 'temperature': 0.7}
+        })
+
+    if 'anthropic.claude' in model_id:
+        checkpoint = {'cache_control': {'type': 'ephemeral'}} if cache else {}
+        content = []
+        if prefix:
+            content.append({'type': 'text', 'text': prefix, **checkpoint})
+        content.append({'type': 'text', 'text': prompt})
+        return json.dumps({
+            'anthropic_version': 'bedrock-2023-05-31',
+            'max_tokens': max_tokens,
+            'system': [{'type': 'text', 'text': system, **checkpoint}],
+            'messages': [{'role': 'user', 'content': content}]
+        })
+
+    raise ValueError(f"Unsupported model: {model_id}")
+
+
+def parse_response(model_id: str, response_body: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+    """(text, normalized token usage) from an InvokeModel response body"""
+    if model_id.startswith('amazon.titan'):
+        result = response_body['results'][0]
+        return result['outputText'], {
+            'input_tokens': int(response_body.get('inputTextTokenCount', 0)),
+            'output_tokens': int(result.get('tokenCount', 0)),
+        }
+
+    if 'amazon.nova' in model_id:
+        usage = response_body.get('usage', {})
+        return response_body['output']['message']['content'][0]['text'], {
+            'input_tokens': int(usage.get('inputTokens', 0)),
+            'output_tokens': int(usage.get('outputTokens', 0)),
+            'cache_read_tokens': int(usage.get('cacheReadInputTokenCount', 0)),
+            'cache_write_tokens': int(usage.get('cacheWriteInputTokenCount', 0)),
+        }
+
+    usage = response_body.get('usage', {})
+    return response_body['content'][0]['text'], {
+        'input_tokens': int(usage.get('input_tokens', 0)),
+        'output_tokens': int(usage.get('output_tokens', 0)),
+        'cache_read_tokens': int(usage.get('cache_read_input_tokens', 0)),
+        'cache_write_tokens': int(usage.get('cache_creation_input_tokens', 0)),
+    }
+
+
+class UsageMetrics:
+    """Running token totals per model, including prompt-cache reads and writes"""
+
+    FIELDS = ('calls', 'input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_write_tokens')
+
+    def __init__(self):
+        self._totals: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_id: str, usage: Dict[str, int]):
+        with self._lock:
+            totals = self._totals.setdefault(model_id, dict.fromkeys(self.FIELDS, 0))
+            totals['calls'] += 1
+            for field in self.FIELDS[1:]:
+                totals[field] += usage.get(field, 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Totals per model plus the share of prompt tokens served from cache"""
+        with self._lock:
+            report = {model: dict(totals) for model, totals in self._totals.items()}
+        for totals in report.values():
+            prompt_tokens = totals['input_tokens'] + totals['cache_read_tokens'] + totals['cache_write_tokens']
+            totals['cache_hit_ratio'] = round(totals['cache_read_tokens'] / prompt_tokens, 4) if prompt_tokens else 0.0
+        return report
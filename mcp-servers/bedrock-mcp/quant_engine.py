@@ -0,0 +1,286 @@
+"""
+Quant Engine
+Local allocation, projection and risk computations that give the MCP tools
+their numbers; the model is only asked to explain them
+"""
+
+import math
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from advisor_core.allocation import (
+    ASSET_CLASSES, ASSET_LABELS, CAPITAL_MARKET_ASSUMPTIONS, HORIZON_BUCKETS, HORIZON_UPPER_BOUNDS,
+    RISK_TOLERANCE_SCORES, Z_95, assumption_moments, horizon_bucket, score_to_volatility, solve_frontier
+)
+from stress_scenarios import ASSET_ALIASES
+
+# The Streamlit app's capital market assumptions, horizon caps and frontier solver
+EXPECTED_RETURN, COVARIANCE = assumption_moments()
+VOLATILITY = CAPITAL_MARKET_ASSUMPTIONS['volatility']
+RISK_FREE = 0.030
+
+# Unclassified holdings are modelled as a balanced fund
+OTHER_PROXY = np.array([0.5, 0.5, 0.0, 0.0])
+
+# Target portfolio volatility per risk tolerance, as the app maps its risk scores
+RISK_TOLERANCE_VOLATILITY = {
+    name.lower(): score_to_volatility(score) for name, score in RISK_TOLERANCE_SCORES.items()
+}
+
+# (volatility, expected return, weights) along a frontier, sorted by volatility
+Frontier = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def normal_cdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def horizon_years(horizon: Optional[str], default: float = 10.0) -> float:
+    """Years from free text such as '10+ years', '5-10 years' or '18 months' (upper end of a range)"""
+    if not horizon:
+        return default
+    numbers = [float(n) for n in re.findall(r"\d+(?:\.\d+)?", str(horizon))]
+    if not numbers:
+        text = str(horizon).lower()
+        return 2.0 if 'short' in text else 5.0 if 'medium' in text else 15.0 if 'long' in text else default
+    years = numbers[-1]
+    return years / 12.0 if 'month' in str(horizon).lower() else years
+
+
+def parse_horizon(horizon: Optional[str]) -> Tuple[float, int]:
+    """(years, horizon bucket index) from free text"""
+    years = horizon_years(horizon)
+    return years, horizon_bucket(years, bool(horizon) and re.search(r"\d\s*\+", str(horizon)) is not None)
+
+
+def allocation_weights(allocation: Dict[str, Any]) -> Tuple[np.ndarray, List[str]]:
+    """(weights over ASSET_CLASSES, unrecognized keys) from a ``{'Stocks': 60, ...}`` dict"""
+    weights = np.zeros(len(ASSET_CLASSES))
+    unmapped = []
+    for key, value in allocation.items():
+        try:
+            amount = float(value)
+        except (TypeError, ValueError):
+            continue
+        asset = ASSET_ALIASES.get(str(key).strip().lower())
+        if asset in ASSET_CLASSES:
+            weights[ASSET_CLASSES.index(asset)] += amount
+        else:
+            weights += amount * OTHER_PROXY
+            unmapped.append(str(key))
+    total = weights.sum()
+    return (weights / total if total > 0 else np.full(len(ASSET_CLASSES), 1.0 / len(ASSET_CLASSES))), unmapped
+
+
+def as_percentages(weights: np.ndarray) -> Dict[str, float]:
+    """Whole-percent allocation that sums to exactly 100 (largest remainder)"""
+    scaled = np.asarray(weights, dtype=np.float64) * 100.0
+    floors = np.floor(scaled)
+    floors[np.argsort(floors - scaled)[:int(round(100.0 - floors.sum()))]] += 1
+    return {ASSET_LABELS[asset]: int(pct) for asset, pct in zip(ASSET_CLASSES, floors) if pct > 0}
+
+
+def portfolio_stats(weights: np.ndarray) -> Dict[str, float]:
+    """Annual expected return, volatility, Sharpe, parametric VaR/CVaR and diversification"""
+    expected = float(weights @ EXPECTED_RETURN)
+    volatility = float(math.sqrt(max(weights @ COVARIANCE @ weights, 0.0)))
+    hhi = float(np.sum(weights ** 2))
+    tail = math.exp(-Z_95 ** 2 / 2.0) / math.sqrt(2.0 * math.pi) / 0.05
+    return {
+        'expected_return_pct': round(expected * 100, 2),
+        'volatility_pct': round(volatility * 100, 2),
+        'sharpe_ratio': round((expected - RISK_FREE) / volatility, 3) if volatility > 0 else 0.0,
+        'var_95_pct': round(max(Z_95 * volatility - expected, 0.0) * 100, 2),
+        'cvar_95_pct': round(max(tail * volatility - expected, 0.0) * 100, 2),
+        'diversification_ratio': round(float(weights @ VOLATILITY) / volatility, 3) if volatility > 0 else 1.0,
+        'effective_assets': round(1.0 / hhi, 2) if hhi > 0 else 0.0,
+    }
+
+
+def projection(amount: float, expected: float, volatility: float, years: float) -> Dict[str, Any]:
+    """Lognormal terminal-value percentiles and probability of loss over the horizon"""
+    variance = math.log(1.0 + volatility ** 2 / (1.0 + expected) ** 2)
+    drift = math.log(1.0 + expected) - variance / 2.0
+    mean, spread = drift * years, math.sqrt(variance * years)
+    value = lambda z: round(amount * math.exp(mean + z * spread), 2)  # noqa: E731
+    return {
+        'years': round(years, 2),
+        'p10_value': value(-1.2815515655446004),
+        'median_value': value(0.0),
+        'p90_value': value(1.2815515655446004),
+        'probability_of_loss_pct': round(normal_cdf(-mean / spread) * 100, 1) if spread > 0 else 0.0,
+    }
+
+
+def parse_constraints(constraints: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """(lower, upper, ignored keys) from ``{'max_stocks': 70}``, ``{'bonds': {'min': 20}}`` or fractions"""
+    lower, upper = np.zeros(len(ASSET_CLASSES)), np.ones(len(ASSET_CLASSES))
+    ignored = []
+
+    def fraction(value: Any) -> float:
+        value = float(value)
+        return value / 100.0 if value > 1.0 else value
+
+    for key, value in (constraints or {}).items():
+        name = str(key).strip().lower()
+        bound = None
+        if name.startswith(('max_', 'min_')):
+            bound, name = name[:3], name[4:]
+        asset = ASSET_ALIASES.get(name.replace('_', ' ')) or ASSET_ALIASES.get(name)
+        if asset not in ASSET_CLASSES:
+            ignored.append(str(key))
+            continue
+        index = ASSET_CLASSES.index(asset)
+        try:
+            if isinstance(value, dict):
+                if 'min' in value:
+                    lower[index] = fraction(value['min'])
+                if 'max' in value:
+                    upper[index] = fraction(value['max'])
+            elif bound == 'min':
+                lower[index] = fraction(value)
+            else:
+                upper[index] = fraction(value)
+        except (TypeError, ValueError):
+            ignored.append(str(key))
+
+    upper = np.maximum(upper, lower)
+    if lower.sum() > 1.0 or upper.sum() < 1.0:
+        raise ValueError("Allocation constraints are infeasible (minimums above 100% or maximums below 100%)")
+    return lower, upper, ignored
+
+
+class QuantEngine:
+    """Deterministic numbers for the advisory tools, computed before any model call.
+
+    The per-horizon and unconstrained frontiers are solved once at start-up,
+    so analysis and unconstrained optimization are table lookups; a new set
+    of client constraints costs one small batched solve, then is cached.
+    """
+
+    def __init__(self, levels: int = 48, cache_size: int = 64):
+        self.levels = levels
+        self.cache_size = cache_size
+        self._frontiers: 'OrderedDict[bytes, Frontier]' = OrderedDict()
+        # Horizon-capped frontiers plus the unconstrained one, in one batch
+        lower = np.zeros((len(HORIZON_BUCKETS) + 1, len(ASSET_CLASSES)))
+        upper = np.vstack([HORIZON_UPPER_BOUNDS, np.ones(len(ASSET_CLASSES))])
+        for row, weights in enumerate(self._solve(lower, upper)):
+            self._frontiers[self._key(lower[row], upper[row])] = self._sorted(weights)
+        self._pinned = len(self._frontiers)
+
+    def _solve(self, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        """Frontier weights (rows x levels x assets) for each row of bounds"""
+        return solve_frontier(EXPECTED_RETURN, COVARIANCE, lower, upper, self.levels, iterations=300)
+
+    @staticmethod
+    def _key(lower: np.ndarray, upper: np.ndarray) -> bytes:
+        return np.round(np.concatenate([lower, upper]), 6).tobytes()
+
+    @staticmethod
+    def _sorted(weights: np.ndarray) -> 'Frontier':
+        """(volatility, expected return, weights) ordered by volatility"""
+        volatility = np.sqrt(np.einsum('la,ab,lb->l', weights, COVARIANCE, weights))
+        order = np.argsort(volatility, kind='stable')
+        return volatility[order], weights[order] @ EXPECTED_RETURN, weights[order]
+
+    def frontier(self, lower: np.ndarray, upper: np.ndarray) -> 'Frontier':
+        """Efficient frontier under per-asset bounds (cached; start-up frontiers are never evicted)"""
+        key = self._key(lower, upper)
+        cached = self._frontiers.get(key)
+        if cached is not None:
+            return cached
+        solved = self._sorted(self._solve(lower[None], upper[None])[0])
+        self._frontiers[key] = solved
+        while len(self._frontiers) > self._pinned + self.cache_size:
+            evicted = next(k for i, k in enumerate(self._frontiers) if i >= self._pinned)
+            del self._frontiers[evicted]
+        return solved
+
+    @staticmethod
+    def _interpolate(axis: np.ndarray, weights: np.ndarray, target: float) -> np.ndarray:
+        """Weights at ``target`` along a non-decreasing frontier axis (clamped to its ends)"""
+        right = int(np.clip(np.searchsorted(axis, target), 1, len(axis) - 1))
+        span = axis[right] - axis[right - 1]
+        t = float(np.clip((target - axis[right - 1]) / span, 0.0, 1.0)) if span > 0 else 0.0
+        return (1.0 - t) * weights[right - 1] + t * weights[right]
+
+    def recommended_weights(self, risk_tolerance: str, bucket: int) -> np.ndarray:
+        target = RISK_TOLERANCE_VOLATILITY.get(str(risk_tolerance).lower(), RISK_TOLERANCE_VOLATILITY['moderate'])
+        volatility, _, weights = self.frontier(np.zeros(len(ASSET_CLASSES)), HORIZON_UPPER_BOUNDS[bucket])
+        return self._interpolate(volatility, weights, target)
+
+    def analyze(self, investment_amount: float, risk_tolerance: str, time_horizon: Optional[str],
+                goals: Sequence[str] = ()) -> Dict[str, Any]:
+        """Recommended allocation, its statistics and a projection of the amount over the horizon"""
+        years, bucket = parse_horizon(time_horizon)
+        weights = self.recommended_weights(risk_tolerance, bucket)
+        stats = portfolio_stats(weights)
+        return {
+            'risk_tolerance': risk_tolerance,
+            'horizon_bucket': HORIZON_BUCKETS[bucket],
+            'allocation_pct': as_percentages(weights),
+            'metrics': stats,
+            'projection': projection(float(investment_amount), stats['expected_return_pct'] / 100,
+                                     stats['volatility_pct'] / 100, years),
+            'goals': list(goals),
+        }
+
+    def optimize(self, current_allocation: Dict[str, Any], constraints: Optional[Dict[str, Any]] = None,
+                 objectives: Sequence[str] = ()) -> Dict[str, Any]:
+        """Constrained frontier portfolio chosen by objective, with the trades from the current allocation.
+
+        'minimize_risk' alone keeps the current expected return at the lowest
+        volatility, 'maximize_return' alone keeps the current volatility at
+        the highest return, anything else picks the best Sharpe ratio.
+        """
+        current, unmapped = allocation_weights(current_allocation)
+        lower, upper, ignored = parse_constraints(constraints or {})
+        volatility, expected, weights = self.frontier(lower, upper)
+
+        objectives = {str(objective).lower() for objective in objectives or ()}
+        if 'minimize_risk' in objectives and 'maximize_return' not in objectives:
+            target = self._interpolate(expected, weights, float(current @ EXPECTED_RETURN))
+            rule = 'lowest volatility at the current expected return'
+        elif 'maximize_return' in objectives and 'minimize_risk' not in objectives:
+            target = self._interpolate(volatility, weights, float(math.sqrt(current @ COVARIANCE @ current)))
+            rule = 'highest expected return at the current volatility'
+        else:
+            target = weights[int(np.argmax((expected - RISK_FREE) / np.maximum(volatility, 1e-9)))]
+            rule = 'highest Sharpe ratio'
+
+        current_pct, target_pct = as_percentages(current), as_percentages(target)
+        trades = {
+            label: target_pct.get(label, 0) - current_pct.get(label, 0)
+            for label in ASSET_LABELS.values()
+            if target_pct.get(label, 0) != current_pct.get(label, 0)
+        }
+        return {
+            'selection_rule': rule,
+            'current_allocation_pct': current_pct,
+            'optimized_allocation_pct': target_pct,
+            'changes_pct': trades,
+            'turnover_pct': round(float(np.abs(target - current).sum()) * 50, 1),
+            'current_metrics': portfolio_stats(current),
+            'optimized_metrics': portfolio_stats(target),
+            'unmapped_holdings': unmapped,
+            'ignored_constraints': ignored,
+        }
+
+    def risk_metrics(self, portfolio: Dict[str, Any], time_horizon: Optional[str] = None) -> Dict[str, Any]:
+        """Parametric risk statistics of a portfolio and its downside over the horizon"""
+        weights, unmapped = allocation_weights(portfolio)
+        stats = portfolio_stats(weights)
+        years = horizon_years(time_horizon)
+        outlook = projection(1.0, stats['expected_return_pct'] / 100, stats['volatility_pct'] / 100, years)
+        return {
+            'allocation_pct': as_percentages(weights),
+            'metrics': stats,
+            'horizon_years': outlook['years'],
+            'probability_of_loss_pct': outlook['probability_of_loss_pct'],
+            'p10_growth_multiple': round(outlook['p10_value'], 3),
+            'unmapped_holdings': unmapped,
+        }
@@ -0,0 +1,131 @@
+"""
+Report Pipeline
+Splits investment reports into independent sections, generates them
+concurrently from one shared context block and assembles the result
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# key -> (heading, instruction, max tokens)
+SECTIONS: Dict[str, Tuple[str, str, int]] = {
+    'executive_summary': (
+        'Executive Summary',
+        'Write a concise executive summary (one short paragraph and up to four bullet points) '
+        'of the client situation and the overall recommendation.',
+        500),
+    'portfolio_analysis': (
+        'Current Portfolio Analysis',
+        'Analyze the current portfolio: allocation, concentration, diversification and fit '
+        'with the client profile.',
+        900),
+    'performance_metrics': (
+        'Performance Metrics',
+        'Summarize the performance and risk metrics present in the data. Quote only figures '
+        'given in the data; do not invent numbers.',
+        700),
+    'risk_analysis': (
+        'Risk Analysis',
+        'Describe the main risk exposures, downside scenarios and how they relate to the '
+        'client time horizon and risk tolerance.',
+        900),
+    'recommendations': (
+        'Recommendations',
+        'Give specific, prioritized recommendations with a one-line rationale each.',
+        900),
+    'next_steps': (
+        'Next Steps',
+        'List concrete next steps with suggested timing and a review schedule.',
+        400),
+}
+
+REPORT_LAYOUTS = {
+    'summary': ('executive_summary', 'recommendations', 'next_steps'),
+    'detailed': ('executive_summary', 'portfolio_analysis', 'performance_metrics',
+                 'recommendations', 'next_steps'),
+    'risk_analysis': ('executive_summary', 'risk_analysis', 'portfolio_analysis',
+                      'recommendations', 'next_steps'),
+}
+
+# generate(prompt, model_id, max_tokens, prefix) -> text
+Generator = Callable[[str, str, int, Optional[str]], Awaitable[str]]
+# on_section(key, heading, text, completed, total)
+SectionCallback = Callable[[str, str, str, int, int], Awaitable[None]]
+
+
+def build_context(args: Dict[str, Any]) -> str:
+    """Shared context block, identical for every section of a report.
+
+    Sent as the cacheable prefix of every section request, and serialized
+    with sorted keys so the same inputs always produce the same text (and
+    therefore the same prompt-cache and response-cache keys).
+    """
+    return (
+        f"User Profile:\n{json.dumps(args.get('user_profile', {}), indent=2, sort_keys=True)}\n\n"
+        f"Portfolio Data:\n{json.dumps(args.get('portfolio_data', {}), indent=2, sort_keys=True)}\n"
+    )
+
+
+def section_prompt(report_type: str, key: str) -> str:
+    """Variable part of a section request (follows the shared context)"""
+    heading, instruction, _ = SECTIONS[key]
+    return (
+        "You are writing one section of a client report.\n"
+        f"Report type: {report_type}\n"
+        f"Section: {heading}\n"
+        f"{instruction}\n"
+        "Write only this section's body, without repeating the heading."
+    )
+
+
+def assemble(report_type: str, sections: List[Tuple[str, str]]) -> str:
+    """Final document from (heading, text) pairs in layout order"""
+    title = report_type.replace('_', ' ').title()
+    parts = [f"# {title} Investment Report"]
+    parts.extend(f"## {heading}\n\n{text.strip()}" for heading, text in sections)
+    return "\n\n".join(parts)
+
+
+class ReportPipeline:
+    """Generates report sections concurrently and reports each as it finishes"""
+
+    def __init__(self, generate: Generator, model_id: str, max_concurrency: int = 6):
+        self.generate = generate
+        self.model_id = model_id
+        self.max_concurrency = max_concurrency
+
+    async def run(self, args: Dict[str, Any], on_section: Optional[SectionCallback] = None) -> str:
+        report_type = args.get('report_type', 'summary')
+        layout = REPORT_LAYOUTS.get(report_type, REPORT_LAYOUTS['detailed'])
+        context = build_context(args)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started = time.perf_counter()
+
+        async def produce(key: str) -> Tuple[str, str]:
+            async with semaphore:
+                text = await self.generate(section_prompt(report_type, key), self.model_id, SECTIONS[key][2], context)
+            return key, text
+
+        results: Dict[str, str] = {}
+        tasks = [asyncio.ensure_future(produce(key)) for key in layout]
+        try:
+            for completed, task in enumerate(asyncio.as_completed(tasks), start=1):
+                key, text = await task
+                results[key] = text
+                if on_section:
+                    try:
+                        await on_section(key, SECTIONS[key][0], text, completed, len(layout))
+                    except Exception as e:
+                        logger.warning(f"Section callback failed for {key}: {str(e)}")
+        finally:
+            # One failed section fails the report; don't leave the others running
+            for task in tasks:
+                task.cancel()
+
+        logger.info(f"Generated {len(layout)} report sections in {time.perf_counter() - started:.2f}s")
+        return assemble(report_type, [(SECTIONS[key][0], results[key]) for key in layout])
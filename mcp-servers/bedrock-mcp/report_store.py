@@ -0,0 +1,200 @@
+"""
+Report Store
+Content-addressed storage for generated reports, served as paged MCP
+resources
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from mcp.shared.exceptions import McpError
+from mcp.types import INVALID_PARAMS, ErrorData
+
+logger = logging.getLogger(__name__)
+
+URI_PREFIX = "report://reports/"
+
+# JSON-RPC error code the MCP specification assigns to unknown resources
+RESOURCE_NOT_FOUND = -32002
+
+
+def _error(code: int, message: str) -> McpError:
+    return McpError(ErrorData(code=code, message=message))
+
+
+def _int_param(query: Dict[str, str], name: str, minimum: int) -> Optional[int]:
+    """Integer query parameter of at least ``minimum``, or None when absent"""
+    if name not in query:
+        return None
+    try:
+        value = int(query[name])
+    except ValueError:
+        raise _error(INVALID_PARAMS, f"Report '{name}' must be an integer, got {query[name]!r}")
+    if value < minimum:
+        raise _error(INVALID_PARAMS, f"Report '{name}' must be at least {minimum}, got {value}")
+    return value
+
+
+class ReportEntry:
+    """Metadata of a stored report; the id is the SHA-256 of its text"""
+
+    def __init__(self, sha256: str, name: str, size: int, page_size: int,
+                 mime_type: str = 'text/markdown', created: Optional[float] = None):
+        self.sha256 = sha256
+        self.name = name
+        self.size = size
+        self.page_size = page_size
+        self.mime_type = mime_type
+        self.created = created or time.time()
+
+    @property
+    def uri(self) -> str:
+        return f"{URI_PREFIX}{self.sha256}"
+
+    @property
+    def pages(self) -> int:
+        return max((self.size + self.page_size - 1) // self.page_size, 1)
+
+    def page_uri(self, page: int) -> str:
+        return f"{self.uri}?page={page}"
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'uri': self.uri,
+            'sha256': self.sha256,
+            'name': self.name,
+            'size': self.size,
+            'pages': self.pages,
+            'page_size': self.page_size,
+            'mime_type': self.mime_type,
+        }
+
+
+class ReportStore:
+    """Keeps recent reports in memory (LRU) and optionally mirrors them to a directory.
+
+    URIs are derived from content, so an unchanged report keeps its URI and
+    hash across calls and clients can skip re-fetching it. Reads are by
+    page (``?page=N``, 1-based, fixed page size) or by character range
+    (``?offset=&length=``). At most ``max_reports`` texts stay in memory;
+    with a directory, metadata of up to ``max_entries`` mirrored reports is
+    kept for listing, and older ones are still readable from disk.
+    """
+
+    def __init__(self, directory: Optional[str] = None, page_size: int = 32768, max_reports: int = 256,
+                 max_entries: int = 4096):
+        self.directory = directory
+        self.page_size = page_size
+        self.max_reports = max_reports
+        self.max_entries = max(max_entries, max_reports)
+        self._texts: 'OrderedDict[str, str]' = OrderedDict()
+        self._entries: 'OrderedDict[str, ReportEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def put(self, text: str, name: str = 'Investment Report', mime_type: str = 'text/markdown') -> ReportEntry:
+        sha256 = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            entry = self._entries.get(sha256)
+            if entry is None:
+                entry = ReportEntry(sha256, name, len(text), self.page_size, mime_type)
+            self._remember(entry)
+            self._texts[sha256] = text
+            self._texts.move_to_end(sha256)
+            while len(self._texts) > self.max_reports:
+                evicted, _ = self._texts.popitem(last=False)
+                if not self.directory:
+                    self._entries.pop(evicted, None)
+        if self.directory:
+            self._write(sha256, text)
+        return entry
+
+    def _remember(self, entry: ReportEntry):
+        """Add or refresh an entry, dropping the least recently used past ``max_entries`` (lock held)"""
+        self._entries[entry.sha256] = entry
+        self._entries.move_to_end(entry.sha256)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def entries(self) -> List[ReportEntry]:
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda entry: entry.created, reverse=True)
+
+    def text(self, sha256: str) -> Optional[str]:
+        with self._lock:
+            text = self._texts.get(sha256)
+            if text is not None:
+                self._texts.move_to_end(sha256)
+                return text
+        if self.directory:
+            path = os.path.join(self.directory, f"{sha256}.md")
+            try:
+                # newline='' keeps \r\n as written, so sizes and offsets match the stored text
+                with open(path, 'r', encoding='utf-8', newline='') as handle:
+                    return handle.read()
+            except OSError:
+                return None
+        return None
+
+    def read(self, uri: str) -> Tuple[str, ReportEntry, Dict[str, Any]]:
+        """(text slice, entry, slice metadata) for a report URI with optional page or range.
+
+        Raises ``McpError``: resource-not-found for an unknown report,
+        invalid-params for a malformed, negative or out-of-range page,
+        offset or length, or for a page combined with a range.
+        """
+        parsed = urlparse(str(uri))
+        sha256 = parsed.path.strip('/').split('/')[-1]
+        text = self.text(sha256)
+        if text is None:
+            raise _error(RESOURCE_NOT_FOUND, f"Unknown report resource: {uri}")
+        with self._lock:
+            entry = self._entries.get(sha256)
+            if entry is None:
+                # Mirrored by an earlier process or another worker
+                entry = ReportEntry(sha256, 'Investment Report', len(text), self.page_size)
+                self._remember(entry)
+
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        page = _int_param(query, 'page', 1)
+        offset = _int_param(query, 'offset', 0)
+        length = _int_param(query, 'length', 0)
+        if page is not None and (offset is not None or length is not None):
+            raise _error(INVALID_PARAMS, "Read a report by page or by offset/length, not both")
+        if offset is not None or length is not None:
+            offset = offset or 0
+            if offset > entry.size:
+                raise _error(INVALID_PARAMS, f"Offset {offset} is past the end of the report ({entry.size})")
+            length = min(entry.size - offset if length is None else length, entry.size - offset)
+            meta = {'offset': offset, 'length': length}
+        elif page is not None:
+            if page > entry.pages:
+                raise _error(INVALID_PARAMS, f"Page {page} out of range 1-{entry.pages}")
+            offset, length = (page - 1) * entry.page_size, entry.page_size
+            meta = {'page': page, 'pages': entry.pages}
+        else:
+            offset, length = 0, entry.size
+            meta = {}
+
+        meta.update({'sha256': entry.sha256, 'size': entry.size})
+        return text[offset:offset + length], entry, meta
+
+    def _write(self, sha256: str, text: str):
+        path = os.path.join(self.directory, f"{sha256}.md")
+        if os.path.exists(path):
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as handle:
+                handle.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not persist report {sha256}: {str(e)}")
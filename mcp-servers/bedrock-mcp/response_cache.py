@@ -0,0 +1,67 @@
+"""
+On-Disk Response Cache for the Bedrock MCP Server
+Shares model responses between server processes through a cache directory
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """File-per-entry cache keyed by model id and prompt.
+
+    Entries are written to a temp file and moved into place with
+    ``os.replace`` so concurrent worker processes never read a torn file.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: Optional[int] = None):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(self.directory, exist_ok=True)
+
+    def make_key(self, model_id: str, prompt: str, *params: Any) -> str:
+        """Build a stable cache key for a model call (plus any generation parameters)"""
+        digest = hashlib.sha256()
+        digest.update(model_id.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(prompt.encode('utf-8'))
+        for param in params:
+            digest.update(b'\0')
+            digest.update(str(param).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        # Two-character shards keep directory listings small on bulk runs
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+        if self.ttl_seconds is not None and time.time() - entry['created_at'] > self.ttl_seconds:
+            return None
+        return entry['response']
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response atomically"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+                json.dump({'created_at': time.time(), 'response': response}, handle)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Response cache write failed: {str(e)}")
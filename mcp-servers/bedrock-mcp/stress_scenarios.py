@@ -0,0 +1,230 @@
+"""
+Stress Scenarios
+Deterministic historical and hypothetical factor shocks applied to
+portfolios as one batched array computation
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Equity and real-asset shocks are returns; rates and credit shocks are
+# yield / spread changes in percentage points
+FACTORS = ('equity', 'rates', 'credit', 'real_assets')
+
+# Accepted range of a custom shock per factor: a return cannot fall below
+# -100%; yield and spread moves are capped well beyond any historical episode
+SHOCK_LIMITS = {
+    'equity': (-1.0, 1.0),
+    'rates': (-10.0, 10.0),
+    'credit': (-10.0, 20.0),
+    'real_assets': (-1.0, 1.0),
+}
+
+# Largest relative uncertainty of a custom scenario (standard deviation as a
+# multiple of the central shock)
+MAX_UNCERTAINTY = 2.0
+
+ASSET_CLASSES = ('stocks', 'bonds', 'alternatives', 'cash', 'other')
+
+# Return per unit factor shock (assets x factors); bonds carry ~6y duration
+# and ~2y spread duration, REIT-like alternatives are part equity, part real asset
+FACTOR_EXPOSURES = np.array([
+    #  equity  rates   credit  real_assets
+    [1.00,   0.000,  0.000,  0.00],   # stocks
+    [0.00,  -0.060, -0.020,  0.00],   # bonds
+    [0.60,  -0.040, -0.010,  0.50],   # alternatives
+    [0.00,  -0.0025, 0.000,  0.00],   # cash
+    [0.50,  -0.020, -0.010,  0.00],   # other / unclassified
+])
+
+ASSET_ALIASES = {
+    'stock': 'stocks', 'stocks': 'stocks', 'equity': 'stocks', 'equities': 'stocks',
+    'bond': 'bonds', 'bonds': 'bonds', 'fixed_income': 'bonds', 'fixed income': 'bonds',
+    'alternative': 'alternatives', 'alternatives': 'alternatives', 'real_estate': 'alternatives',
+    'real estate': 'alternatives', 'reits': 'alternatives', 'commodities': 'alternatives',
+    'cash': 'cash', 'money_market': 'cash', 'money market': 'cash',
+}
+
+# name -> (kind, description, factor shocks, relative uncertainty of each shock)
+SCENARIOS: Dict[str, Tuple[str, str, Sequence[float], Sequence[float]]] = {
+    '2008 Global Financial Crisis': (
+        'historical', 'Equities -50%, yields -1.5pp, credit spreads +4pp, real estate -30%',
+        (-0.50, -1.5, 4.0, -0.30), (0.15, 0.30, 0.25, 0.25)),
+    '2020 COVID Crash': (
+        'historical', 'Equities -34% in five weeks, yields -1.2pp, spreads +2.5pp',
+        (-0.34, -1.2, 2.5, -0.20), (0.15, 0.30, 0.25, 0.25)),
+    '2022 Rate Shock': (
+        'historical', 'Equities -25% while yields rose 2.5pp; stocks and bonds fell together',
+        (-0.25, 2.5, 1.0, -0.10), (0.20, 0.20, 0.30, 0.30)),
+    '2000 Dot-com Bust': (
+        'historical', 'Equities -45% over two years, yields -2pp, real assets flat',
+        (-0.45, -2.0, 1.5, 0.05), (0.15, 0.30, 0.30, 0.50)),
+    'Rate Spike +300bp': (
+        'hypothetical', 'Sudden 3pp rise in yields with a moderate equity sell-off',
+        (-0.15, 3.0, 0.75, -0.10), (0.30, 0.15, 0.40, 0.40)),
+    'Stagflation': (
+        'hypothetical', 'Equities -20%, yields +2pp, spreads +1.5pp, real assets +10%',
+        (-0.20, 2.0, 1.5, 0.10), (0.30, 0.25, 0.30, 0.50)),
+    'Equity Bear Market': (
+        'hypothetical', 'Equities -30% with a flight to quality in government bonds',
+        (-0.30, -1.0, 2.0, -0.15), (0.20, 0.30, 0.30, 0.30)),
+}
+
+
+def portfolio_weights(portfolio: Dict[str, Any]) -> Tuple[np.ndarray, float, List[str]]:
+    """(weights over ASSET_CLASSES, total value, unrecognized keys) from a ``{'Stocks': 60, ...}`` dict.
+
+    Unrecognized holdings are kept under 'other' so they still take losses.
+    """
+    weights = np.zeros(len(ASSET_CLASSES))
+    unmapped = []
+    for key, value in portfolio.items():
+        try:
+            amount = float(value)
+        except (TypeError, ValueError):
+            continue
+        asset = ASSET_ALIASES.get(str(key).strip().lower())
+        if asset is None:
+            asset = 'other'
+            unmapped.append(str(key))
+        weights[ASSET_CLASSES.index(asset)] += amount
+    total = float(weights.sum())
+    return (weights / total if total > 0 else weights), total, unmapped
+
+
+def custom_scenario_table(custom_scenarios: Any) -> Dict[str, Tuple]:
+    """SCENARIOS-style entries from ``[{'name': ..., 'shocks': {'equity': -0.3, ...}}, ...]``.
+
+    Raises ValueError naming the offending entry, since these come straight
+    from tool arguments.
+    """
+    if not isinstance(custom_scenarios, (list, tuple)):
+        raise ValueError(f"stress_scenarios must be a list of scenario objects, got {type(custom_scenarios).__name__}")
+
+    table = {}
+    for index, scenario in enumerate(custom_scenarios):
+        where = f"stress_scenarios[{index}]"
+        if not isinstance(scenario, dict):
+            raise ValueError(f"{where} must be an object with 'name' and 'shocks', got {type(scenario).__name__}")
+        factor_shocks = scenario.get('shocks', {})
+        if not isinstance(factor_shocks, dict):
+            raise ValueError(f"{where}.shocks must be an object keyed by factor ({', '.join(FACTORS)})")
+        unknown = sorted(set(map(str, factor_shocks)) - set(FACTORS))
+        if unknown:
+            raise ValueError(f"{where}.shocks has unknown factors {unknown}; expected {', '.join(FACTORS)}")
+        try:
+            central = tuple(float(factor_shocks.get(factor, 0.0)) for factor in FACTORS)
+            uncertainty = float(scenario.get('uncertainty', 0.2))
+        except (TypeError, ValueError):
+            raise ValueError(f"{where} shocks and uncertainty must be numbers")
+        for factor, shock in zip(FACTORS, central):
+            low, high = SHOCK_LIMITS[factor]
+            if not low <= shock <= high:
+                raise ValueError(f"{where}.shocks.{factor} must be between {low:g} and {high:g}, got {shock:g}")
+        if not 0.0 <= uncertainty <= MAX_UNCERTAINTY:
+            raise ValueError(f"{where}.uncertainty must be between 0 and {MAX_UNCERTAINTY:g}, got {uncertainty:g}")
+        table[str(scenario.get('name', f'Custom {len(table) + 1}'))] = (
+            'custom', scenario.get('description', 'User-defined shock'), central, (uncertainty,) * len(FACTORS)
+        )
+    return table
+
+
+def risk_score_from_loss(loss: float) -> float:
+    """1-10 score from the worst median scenario loss (40% loss -> 10)"""
+    return round(1.0 + 9.0 * min(max(loss / 0.40, 0.0), 1.0), 1)
+
+
+class StressTestEngine:
+    """Applies every scenario to a portfolio in one batched computation.
+
+    Each scenario is sampled ``samples`` times around its central shock
+    (relative uncertainty per factor, fixed seed), so results carry a loss
+    distribution yet are identical for identical inputs. Samples are drawn
+    once; a request is a single (scenarios x samples x factors) product with
+    the exposure matrix.
+    """
+
+    def __init__(self, scenarios: Optional[Dict[str, Tuple]] = None, samples: int = 5000, seed: int = 7):
+        self.scenarios = dict(scenarios or SCENARIOS)
+        self.names = list(self.scenarios)
+        self.samples = samples
+        self.seed = seed
+        self.shocks = self._sample(self.scenarios)
+
+    def _sample(self, scenarios: Dict[str, Tuple]) -> np.ndarray:
+        """(scenarios x samples x factors) perturbed factor shocks"""
+        central = np.array([scenario[2] for scenario in scenarios.values()], dtype=np.float64)
+        spread = np.array([scenario[3] for scenario in scenarios.values()], dtype=np.float64)
+        noise = np.random.default_rng(self.seed).standard_normal((len(central), self.samples, len(FACTORS)))
+        return central[:, None, :] * (1.0 + spread[:, None, :] * noise)
+
+    def losses(self, weights: np.ndarray, shocks: Optional[np.ndarray] = None) -> np.ndarray:
+        """Portfolio losses (scenarios x samples) as positive fractions"""
+        shocks = self.shocks if shocks is None else shocks
+        asset_returns = np.maximum(shocks @ FACTOR_EXPOSURES.T, -1.0)
+        return -(asset_returns @ weights)
+
+    def run(self, portfolio: Dict[str, Any], custom_scenarios: Optional[List[Dict[str, Any]]] = None,
+            portfolio_value: Optional[float] = None) -> Dict[str, Any]:
+        """Loss statistics for every scenario plus a deterministic risk score.
+
+        Holdings may be percentages or amounts; only their proportions are
+        used. Dollar losses are reported when ``portfolio_value`` is given.
+        """
+        weights, _, unmapped = portfolio_weights(portfolio)
+        names = list(self.names)
+        kinds = [scenario[0] for scenario in self.scenarios.values()]
+        descriptions = [scenario[1] for scenario in self.scenarios.values()]
+        shocks = self.shocks
+
+        if custom_scenarios:
+            extra = custom_scenario_table(custom_scenarios)
+            shocks = np.concatenate([shocks, self._sample(extra)])
+            names += list(extra)
+            kinds += [s[0] for s in extra.values()]
+            descriptions += [s[1] for s in extra.values()]
+
+        losses = self.losses(weights, shocks)
+        p05, p50, p95 = np.percentile(losses, [5, 50, 95], axis=1)
+        tail = np.sort(losses, axis=1)[:, -max(self.samples // 20, 1):]
+        expected_shortfall = tail.mean(axis=1)
+
+        results = []
+        for row, name in enumerate(names):
+            result = {
+                'name': name,
+                'kind': kinds[row],
+                'description': descriptions[row],
+                'median_loss_pct': round(float(p50[row]) * 100, 2),
+                'loss_p05_pct': round(float(p05[row]) * 100, 2),
+                'loss_p95_pct': round(float(p95[row]) * 100, 2),
+                'expected_shortfall_pct': round(float(expected_shortfall[row]) * 100, 2),
+            }
+            if portfolio_value is not None:
+                result['median_loss_usd'] = round(float(p50[row]) * portfolio_value, 2)
+            results.append(result)
+
+        worst = int(np.argmax(p50))
+        return {
+            'weights': {asset: round(float(w), 4) for asset, w in zip(ASSET_CLASSES, weights) if w > 0},
+            'unmapped_holdings': unmapped,
+            'scenarios': results,
+            'worst_scenario': names[worst],
+            'risk_score': risk_score_from_loss(float(p50[worst])),
+        }
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    """Plain-text table of stress results for prompts and tool output"""
+    lines = [f"{'Scenario':<30} {'Type':<12} {'Median':>8} {'5-95% range':>16} {'ES 95%':>8}"]
+    for scenario in results['scenarios']:
+        band = f"{scenario['loss_p05_pct']:.1f}-{scenario['loss_p95_pct']:.1f}%"
+        lines.append(
+            f"{scenario['name']:<30} {scenario['kind']:<12} {scenario['median_loss_pct']:>7.1f}% "
+            f"{band:>16} {scenario['expected_shortfall_pct']:>7.1f}%"
+        )
+    lines.append(f"Worst scenario: {results['worst_scenario']}; computed risk score: {results['risk_score']}/10")
+    if results['unmapped_holdings']:
+        lines.append(f"Treated as unclassified: {', '.join(results['unmapped_holdings'])}")
+    return "\n".join(lines)
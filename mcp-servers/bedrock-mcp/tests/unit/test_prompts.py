@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from prompts import (
+    ADVISOR_SYSTEM_PROMPT, PROMPT_CACHE_MIN_TOKENS, build_request_body, estimate_tokens, parse_response
+)
+
+TITAN = 'amazon.titan-text-express-v1'
+NOVA = 'amazon.nova-lite-v1:0'
+CLAUDE = 'anthropic.claude-3-7-sonnet-20250219-v1:0'
+
+
+def test_system_prompt_is_long_enough_to_cache():
+    assert estimate_tokens(ADVISOR_SYSTEM_PROMPT) >= PROMPT_CACHE_MIN_TOKENS
+
+
+def test_titan_body_has_no_checkpoints():
+    body = json.loads(build_request_body(TITAN, 'question', 100, prefix='context'))
+
+    assert body['inputText'] == f"{ADVISOR_SYSTEM_PROMPT}\n\ncontext\n\nquestion"
+    assert body['textGenerationConfig']['maxTokenCount'] == 100
+
+
+def test_nova_body_checkpoints_system_and_prefix():
+    body = json.loads(build_request_body(NOVA, 'question', 100, prefix='context'))
+
+    assert body['system'] == [{'text': ADVISOR_SYSTEM_PROMPT}, {'cachePoint': {'type': 'default'}}]
+    assert body['messages'][0]['content'] == [
+        {'text': 'context'}, {'cachePoint': {'type': 'default'}}, {'text': 'question'}
+    ]
+    assert body['inferenceConfig']['maxTokens'] == 100
+
+
+def test_claude_body_checkpoints_system_and_prefix():
+    body = json.loads(build_request_body(f'us.{CLAUDE}', 'question', 100, prefix='context'))
+
+    assert body['system'] == [
+        {'type': 'text', 'text': ADVISOR_SYSTEM_PROMPT, 'cache_control': {'type': 'ephemeral'}}
+    ]
+    assert body['messages'][0]['content'] == [
+        {'type': 'text', 'text': 'context', 'cache_control': {'type': 'ephemeral'}},
+        {'type': 'text', 'text': 'question'},
+    ]
+    assert body['max_tokens'] == 100
+
+
+def test_models_outside_the_cache_list_get_no_checkpoints(monkeypatch):
+    monkeypatch.setenv('PROMPT_CACHE_MODELS', 'amazon.nova-pro')
+    nova = json.loads(build_request_body(NOVA, 'question', 100, prefix='context'))
+    claude = json.loads(build_request_body('anthropic.claude-3-haiku-20240307-v1:0', 'question', 100))
+
+    assert 'cachePoint' not in json.dumps(nova)
+    assert 'cache_control' not in json.dumps(claude)
+
+
+def test_unknown_model_is_rejected():
+    with pytest.raises(ValueError):
+        build_request_body('meta.llama3-8b-instruct-v1:0', 'question', 100)
+
+
+def test_parse_titan_response():
+    body = {'inputTextTokenCount': 12, 'results': [{'outputText': 'answer', 'tokenCount': 3}]}
+
+    assert parse_response(TITAN, body) == ('answer', {'input_tokens': 12, 'output_tokens': 3})
+
+
+def test_parse_nova_response():
+    body = {
+        'output': {'message': {'content': [{'text': 'answer'}]}},
+        'usage': {'inputTokens': 20, 'outputTokens': 5, 'cacheReadInputTokenCount': 1500,
+                  'cacheWriteInputTokenCount': 0},
+    }
+
+    assert parse_response(NOVA, body) == ('answer', {
+        'input_tokens': 20, 'output_tokens': 5, 'cache_read_tokens': 1500, 'cache_write_tokens': 0
+    })
+
+
+def test_parse_claude_response():
+    body = {
+        'content': [{'type': 'text', 'text': 'answer'}],
+        'usage': {'input_tokens': 20, 'output_tokens': 5, 'cache_creation_input_tokens': 1500},
+    }
+
+    assert parse_response(CLAUDE, body) == ('answer', {
+        'input_tokens': 20, 'output_tokens': 5, 'cache_read_tokens': 0, 'cache_write_tokens': 1500
+    })
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from report_pipeline import REPORT_LAYOUTS, SECTIONS, ReportPipeline, build_context
+
+
+class StubModel:
+    """Async generator that records calls and concurrency"""
+
+    def __init__(self, delays=None, fail=None):
+        self.delays = delays or {}
+        self.fail = fail
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.cancelled = []
+
+    async def __call__(self, prompt, model_id, max_tokens, prefix):
+        key = next(key for key, (heading, _, _) in SECTIONS.items() if f"Section: {heading}\n" in prompt)
+        self.calls.append((key, model_id, max_tokens, prefix))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delays.get(key, 0.01))
+            if key == self.fail:
+                raise RuntimeError(f"{key} failed")
+            return f"text of {key}"
+        except asyncio.CancelledError:
+            self.cancelled.append(key)
+            raise
+        finally:
+            self.active -= 1
+
+
+ARGS = {'report_type': 'detailed', 'user_profile': {'risk_tolerance': 'Moderate'},
+        'portfolio_data': {'Stocks': 60, 'Bonds': 40}}
+
+
+def test_sections_run_concurrently_with_the_shared_context():
+    model = StubModel()
+    report = asyncio.run(ReportPipeline(model, 'amazon.nova-lite-v1:0').run(ARGS))
+
+    layout = REPORT_LAYOUTS['detailed']
+    assert model.peak == len(layout)
+    assert {call[0] for call in model.calls} == set(layout)
+    assert {call[3] for call in model.calls} == {build_context(ARGS)}
+    assert all(call[1] == 'amazon.nova-lite-v1:0' and call[2] == SECTIONS[call[0]][2] for call in model.calls)
+    # Assembled in layout order, whatever order the sections finished in
+    headings = [line[3:] for line in report.splitlines() if line.startswith('## ')]
+    assert report.startswith('# Detailed Investment Report')
+    assert headings == [SECTIONS[key][0] for key in layout]
+
+
+def test_concurrency_is_capped():
+    model = StubModel()
+    asyncio.run(ReportPipeline(model, 'model', max_concurrency=2).run(ARGS))
+
+    assert model.peak == 2 and len(model.calls) == len(REPORT_LAYOUTS['detailed'])
+
+
+def test_progress_is_reported_as_sections_finish():
+    model = StubModel(delays={'executive_summary': 0.05, 'next_steps': 0.001})
+    progress = []
+
+    async def on_section(key, heading, text, completed, total):
+        progress.append((key, heading, text, completed, total))
+        if key == 'recommendations':
+            raise RuntimeError("client went away")  # logged, does not fail the report
+
+    asyncio.run(ReportPipeline(model, 'model').run({**ARGS, 'report_type': 'summary'}, on_section))
+
+    assert [item[3:] for item in progress] == [(1, 3), (2, 3), (3, 3)]
+    assert progress[0][:3] == ('next_steps', 'Next Steps', 'text of next_steps')
+    assert progress[-1][0] == 'executive_summary'
+
+
+def test_a_failed_section_cancels_its_siblings():
+    model = StubModel(delays={'executive_summary': 0.001}, fail='executive_summary')
+    model.delays.update({key: 1.0 for key in REPORT_LAYOUTS['detailed'] if key != 'executive_summary'})
+
+    async def run():
+        with pytest.raises(RuntimeError, match='executive_summary failed'):
+            await ReportPipeline(model, 'model').run(ARGS)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert sorted(model.cancelled) == sorted(set(REPORT_LAYOUTS['detailed']) - {'executive_summary'})
+    assert model.active == 0
+
+
+def test_unknown_report_type_uses_the_detailed_layout():
+    model = StubModel()
+    report = asyncio.run(ReportPipeline(model, 'model').run({'report_type': 'quarterly'}))
+
+    assert report.startswith('# Quarterly Investment Report')
+    assert len(model.calls) == len(REPORT_LAYOUTS['detailed'])
+
+
+def test_context_is_stable_for_equal_inputs():
+    reordered = {'portfolio_data': {'Bonds': 40, 'Stocks': 60}, 'user_profile': {'risk_tolerance': 'Moderate'}}
+
+    assert build_context(ARGS) == build_context(reordered)
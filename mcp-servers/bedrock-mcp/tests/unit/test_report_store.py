@@ -0,0 +1,82 @@
+import pytest
+from mcp.shared.exceptions import McpError
+from mcp.types import INVALID_PARAMS
+
+from report_store import RESOURCE_NOT_FOUND, URI_PREFIX, ReportStore
+
+TEXT = "# Report\n\n" + "".join(f"line {n}\n" for n in range(40))
+
+
+def error_code(store, uri):
+    with pytest.raises(McpError) as error:
+        store.read(uri)
+    return error.value.error.code
+
+
+def test_content_addressed_uri():
+    store = ReportStore(page_size=100)
+    entry = store.put(TEXT, name='Summary')
+
+    assert entry.uri == f"{URI_PREFIX}{entry.sha256}"
+    assert store.put(TEXT).uri == entry.uri
+    assert store.put(TEXT + "!").uri != entry.uri
+    assert entry.describe()['pages'] == (len(TEXT) + 99) // 100
+
+
+def test_paged_reads_cover_the_text():
+    store = ReportStore(page_size=100)
+    entry = store.put(TEXT)
+
+    pages = [store.read(entry.page_uri(page)) for page in range(1, entry.pages + 1)]
+    assert "".join(text for text, _, _ in pages) == TEXT
+    assert [len(text) for text, _, _ in pages[:-1]] == [100] * (entry.pages - 1)
+    assert pages[0][2] == {'page': 1, 'pages': entry.pages, 'sha256': entry.sha256, 'size': len(TEXT)}
+    assert store.read(entry.uri)[0] == TEXT
+
+
+def test_offset_and_length_reads():
+    store = ReportStore(page_size=100)
+    entry = store.put(TEXT)
+
+    text, _, meta = store.read(f"{entry.uri}?offset=10&length=25")
+    assert text == TEXT[10:35] and (meta['offset'], meta['length']) == (10, 25)
+    assert store.read(f"{entry.uri}?offset=200")[0] == TEXT[200:]
+    assert store.read(f"{entry.uri}?length=5")[0] == TEXT[:5]
+    # Clamped to the end of the report
+    assert store.read(f"{entry.uri}?offset={len(TEXT) - 3}&length=50")[2]['length'] == 3
+    assert store.read(f"{entry.uri}?offset={len(TEXT)}")[0] == ''
+
+
+@pytest.mark.parametrize('query', [
+    '?page=0', '?page=99', '?page=two', '?offset=-1', '?length=-5', '?offset=100000', '?page=1&offset=0',
+])
+def test_bad_slices_are_invalid_params(query):
+    store = ReportStore(page_size=100)
+    entry = store.put(TEXT)
+
+    assert error_code(store, f"{entry.uri}{query}") == INVALID_PARAMS
+
+
+def test_unknown_report_is_not_found():
+    assert error_code(ReportStore(), f"{URI_PREFIX}{'0' * 64}") == RESOURCE_NOT_FOUND
+
+
+def test_mirrored_reports_survive_eviction_and_restart(tmp_path):
+    store = ReportStore(str(tmp_path), page_size=100, max_reports=1)
+    first = store.put("first\r\nreport\r\n")
+    store.put("second report")
+
+    # Evicted from memory, read back from disk with its line endings intact
+    assert store.read(first.uri)[0] == "first\r\nreport\r\n"
+    restarted = ReportStore(str(tmp_path), page_size=100)
+    text, entry, meta = restarted.read(f"{first.uri}?offset=5&length=2")
+    assert text == "\r\n" and entry.size == len("first\r\nreport\r\n") == meta['size']
+
+
+def test_memory_only_store_forgets_evicted_reports():
+    store = ReportStore(max_reports=1)
+    first = store.put("first")
+    store.put("second")
+
+    assert [entry.name for entry in store.entries()] == ['Investment Report']
+    assert error_code(store, first.uri) == RESOURCE_NOT_FOUND
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from stress_scenarios import FACTORS, SCENARIOS, StressTestEngine, custom_scenario_table
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return StressTestEngine()
+
+
+def scenario(result, name):
+    return next(row for row in result['scenarios'] if row['name'] == name)
+
+
+def test_factor_shocks_map_to_asset_losses(engine):
+    custom = [
+        {'name': 'Equity', 'shocks': {'equity': -0.30}, 'uncertainty': 0},
+        {'name': 'Rates', 'shocks': {'rates': 1.0}, 'uncertainty': 0},
+        {'name': 'Spreads', 'shocks': {'credit': 2.0}, 'uncertainty': 0},
+    ]
+    stocks = engine.run({'Stocks': 100}, custom)
+    bonds = engine.run({'Bonds': 100}, custom)
+
+    assert scenario(stocks, 'Equity')['median_loss_pct'] == pytest.approx(30.0)
+    assert scenario(stocks, 'Rates')['median_loss_pct'] == pytest.approx(0.0)
+    assert scenario(bonds, 'Equity')['median_loss_pct'] == pytest.approx(0.0)
+    # ~6 year duration and ~2 year spread duration
+    assert scenario(bonds, 'Rates')['median_loss_pct'] == pytest.approx(6.0)
+    assert scenario(bonds, 'Spreads')['median_loss_pct'] == pytest.approx(4.0)
+    # Without uncertainty every sample is the central shock
+    row = scenario(stocks, 'Equity')
+    assert row['loss_p05_pct'] == row['loss_p95_pct'] == row['expected_shortfall_pct']
+
+
+def test_losses_are_blended_by_weight_and_dollars_need_a_value(engine):
+    custom = [{'name': 'Crash', 'shocks': {'equity': -0.40, 'rates': -1.0}, 'uncertainty': 0}]
+    result = engine.run({'stocks': 60000, 'bonds': 40000}, custom, portfolio_value=100000)
+
+    row = scenario(result, 'Crash')
+    assert row['median_loss_pct'] == pytest.approx(0.6 * 40.0 - 0.4 * 6.0)
+    assert row['median_loss_usd'] == pytest.approx(row['median_loss_pct'] * 1000)
+    assert 'median_loss_usd' not in scenario(engine.run({'Stocks': 100}, custom), 'Crash')
+
+
+def test_built_in_scenarios_rank_equity_risk(engine):
+    stocks, cash = engine.run({'Stocks': 100}), engine.run({'Cash': 100})
+
+    assert [row['name'] for row in stocks['scenarios']] == list(SCENARIOS)
+    assert stocks['worst_scenario'] == '2008 Global Financial Crisis'
+    assert stocks['risk_score'] > cash['risk_score']
+    for row in stocks['scenarios']:
+        assert row['loss_p05_pct'] <= row['median_loss_pct'] <= row['loss_p95_pct'] <= row['expected_shortfall_pct']
+
+
+def test_unmapped_holdings_are_kept_as_other(engine):
+    result = engine.run({'Stocks': 50, 'Crypto': 50})
+
+    assert result['unmapped_holdings'] == ['Crypto']
+    assert result['weights'] == {'stocks': 0.5, 'other': 0.5}
+
+
+@pytest.mark.parametrize('custom, message', [
+    ({'name': 'x'}, 'must be a list'),
+    (['crash'], 'must be an object'),
+    ([{'shocks': [-0.3]}], 'keyed by factor'),
+    ([{'shocks': {'equities': -0.3}}], "unknown factors ['equities']"),
+    ([{'shocks': {'equity': 'a lot'}}], 'must be numbers'),
+    ([{'shocks': {'equity': -1.5}}], 'stress_scenarios[0].shocks.equity must be between -1 and 1'),
+    ([{'shocks': {'rates': 2.0}}, {'shocks': {'credit': 25}}], 'stress_scenarios[1].shocks.credit'),
+    ([{'shocks': {'equity': float('nan')}}], 'shocks.equity must be between'),
+    ([{'shocks': {'equity': -0.3}, 'uncertainty': -0.1}], 'uncertainty must be between 0 and 2'),
+    ([{'shocks': {'equity': -0.3}, 'uncertainty': 5}], 'uncertainty must be between 0 and 2'),
+])
+def test_custom_scenarios_are_validated(custom, message):
+    with pytest.raises(ValueError) as error:
+        custom_scenario_table(custom)
+    assert message in str(error.value)
+
+
+def test_custom_scenario_defaults():
+    table = custom_scenario_table([{'shocks': {'equity': -0.3}}, {'name': 'Mine', 'shocks': {}}])
+
+    assert list(table) == ['Custom 1', 'Mine']
+    kind, _, central, spread = table['Custom 1']
+    assert kind == 'custom' and central == (-0.3, 0.0, 0.0, 0.0) and spread == (0.2,) * len(FACTORS)
+
+
+def test_samples_are_reproducible_for_a_seed():
+    first, second, other = StressTestEngine(seed=7), StressTestEngine(seed=7), StressTestEngine(seed=8)
+
+    assert first.shocks.shape == (len(SCENARIOS), 5000, len(FACTORS))
+    np.testing.assert_array_equal(first.shocks, second.shocks)
+    assert not np.array_equal(first.shocks, other.shocks)
+    portfolio = {'Stocks': 60, 'Bonds': 30, 'Alternatives': 10}
+    assert first.run(portfolio) == second.run(portfolio)
+
+
+def test_custom_scenarios_leave_built_in_results_unchanged(engine):
+    portfolio = {'Stocks': 60, 'Bonds': 40}
+    plain = engine.run(portfolio)
+    extended = engine.run(portfolio, [{'name': 'Extra', 'shocks': {'equity': -0.1}}])
+
+    assert extended['scenarios'][:len(SCENARIOS)] == plain['scenarios']
+    assert extended['scenarios'][-1]['kind'] == 'custom'
@@ -0,0 +1,113 @@
+import pytest
+
+from validation import ArgumentError, compile_validator
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'amount': {'type': 'number', 'minimum': 0},
+        'count': {'type': 'integer', 'maximum': 10},
+        'tolerance': {'type': 'string', 'enum': ['Conservative', 'Moderate', 'Aggressive']},
+        'goals': {'type': 'array', 'items': {'type': 'string'}},
+        'notify': {'type': 'boolean'},
+        'profile': {
+            'type': 'object',
+            'properties': {'age': {'type': 'integer'}},
+            'additionalProperties': False,
+        },
+        'extra': {},
+    },
+    'required': ['amount'],
+}
+
+validate = compile_validator('plan', SCHEMA)
+
+
+def errors_for(arguments):
+    with pytest.raises(ArgumentError) as error:
+        validate(arguments)
+    return error.value
+
+
+@pytest.mark.parametrize('raw, coerced', [
+    (250000, 250000),
+    (12.5, 12.5),
+    ('100,000', 100000.0),
+    ('$250_000', 250000.0),
+    (' 5 ', 5.0),
+])
+def test_numbers_from_form_input(raw, coerced):
+    assert validate({'amount': raw})['amount'] == coerced
+
+
+def test_integers_accept_whole_floats_only():
+    assert validate({'amount': 1, 'count': '7'})['count'] == 7
+    assert validate({'amount': 1, 'count': 3.0})['count'] == 3
+    assert errors_for({'amount': 1, 'count': 2.5}).errors[0]['code'] == 'type'
+
+
+def test_enum_is_matched_case_insensitively():
+    assert validate({'amount': 1, 'tolerance': ' moderate '})['tolerance'] == 'Moderate'
+    assert errors_for({'amount': 1, 'tolerance': 'reckless'}).errors[0]['code'] == 'enum'
+
+
+def test_bare_string_becomes_a_one_item_array():
+    assert validate({'amount': 1, 'goals': 'Retirement'})['goals'] == ['Retirement']
+    assert validate({'amount': 1, 'goals': ('Retirement', 'Education')})['goals'] == ['Retirement', 'Education']
+
+
+def test_boolean_strings():
+    assert validate({'amount': 1, 'notify': 'TRUE'})['notify'] is True
+    assert validate({'amount': 1, 'notify': 'false'})['notify'] is False
+    assert errors_for({'amount': 1, 'notify': 'yes'}).errors[0]['code'] == 'type'
+
+
+def test_json_encoded_objects_are_decoded():
+    assert validate('{"amount": 3, "profile": "{\\"age\\": 40}"}') == {'amount': 3, 'profile': {'age': 40}}
+
+
+def test_nulls_and_untyped_properties():
+    assert validate({'amount': 1, 'count': None, 'extra': [1, 'a']}) == {'amount': 1, 'extra': [1, 'a']}
+    assert validate({'amount': 1, 'other': 'kept'})['other'] == 'kept'
+
+
+def test_every_error_is_reported_with_path_code_and_message():
+    error = errors_for({
+        'amount': -5, 'count': 11, 'notify': True,
+        'goals': ['Retirement', 3], 'profile': {'age': 'forty', 'name': 'x'}
+    })
+
+    assert error.tool == 'plan'
+    assert error.errors == [
+        {'path': 'amount', 'code': 'minimum', 'message': 'must be >= 0'},
+        {'path': 'count', 'code': 'maximum', 'message': 'must be <= 10'},
+        {'path': 'goals.1', 'code': 'type', 'message': 'expected string, got int'},
+        {'path': 'profile.age', 'code': 'type', 'message': "expected integer, got 'forty'"},
+        {'path': 'profile.name', 'code': 'unexpected', 'message': 'is not an allowed property'},
+    ]
+    assert error.to_dict() == {'error': 'invalid_arguments', 'tool': 'plan', 'errors': error.errors}
+    assert str(error).startswith('Invalid arguments for plan: amount: must be >= 0; count: must be <= 10')
+    assert isinstance(error, ValueError)
+
+
+@pytest.mark.parametrize('arguments, path, code', [
+    (None, 'amount', 'required'),
+    ({}, 'amount', 'required'),
+    ({'amount': True}, 'amount', 'type'),
+    ({'amount': float('inf')}, 'amount', 'type'),
+    ({'amount': 'plenty'}, 'amount', 'type'),
+    ({'amount': [1]}, 'amount', 'type'),
+    ({'amount': 1, 'goals': {'a': 1}}, 'goals', 'type'),
+    ({'amount': 1, 'profile': 'not json'}, 'profile', 'type'),
+])
+def test_rejected_values(arguments, path, code):
+    error = errors_for(arguments)
+
+    assert [(e['path'], e['code']) for e in error.errors] == [(path, code)]
+
+
+def test_root_that_is_not_an_object():
+    error = errors_for([1, 2])
+
+    assert error.errors == [{'path': '', 'code': 'type', 'message': 'expected object, got list'}]
+    assert str(error) == 'Invalid arguments for plan: <root>: expected object, got list'
@@ -0,0 +1,172 @@
+import io
+import json
+import os
+import queue
+import threading
+import time
+
+import pytest
+
+from worker_pool import MAX_JOB_RETRIES, MAX_WORKER_RESTARTS, WorkerPool, _heartbeat_loop
+
+ANALYZE = {'name': 'analyze_investment',
+           'arguments': {'investment_amount': 100000, 'risk_tolerance': 'moderate', 'time_horizon': '10 years'}}
+
+
+class OfflineClient:
+    """bedrock-runtime stand-in; with ``crash_marker`` the first call anywhere kills its worker process"""
+
+    def __init__(self, crash_marker=None):
+        self.crash_marker = crash_marker
+
+    def invoke_model(self, modelId, body):
+        if self.crash_marker and not os.path.exists(self.crash_marker):
+            open(self.crash_marker, 'w').close()
+            os._exit(1)
+        payload = {'output': {'message': {'content': [{'text': 'Offline narrative.'}]}}}
+        return {'body': io.BytesIO(json.dumps(payload).encode('utf-8'))}
+
+
+class ClientFactory:
+    def __init__(self, crash_marker=None):
+        self.crash_marker = crash_marker
+
+    def __call__(self):
+        return OfflineClient(self.crash_marker)
+
+
+class FakeProcess:
+    def __init__(self, target=None, args=(), name=None, daemon=None):
+        self.alive = True
+        self.pid = 1000
+        self.terminated = False
+
+    def start(self):
+        pass
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.terminated = True
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+
+class FakeContext:
+    Queue = queue.Queue
+    Process = FakeProcess
+
+
+@pytest.fixture
+def fake_pool():
+    """Pool whose workers are in-process fakes: events are fed to its result queue by hand"""
+    pool = WorkerPool(2, heartbeat_interval=0.01, heartbeat_timeout=5.0)
+    pool.context = FakeContext()
+    pool.result_queue = queue.Queue()
+    pool.start()
+    return pool
+
+
+def test_heartbeat_loop_reports_until_stopped():
+    events, stop = queue.Queue(), threading.Event()
+    thread = threading.Thread(target=_heartbeat_loop, args=(3, events, stop, 0.01))
+    thread.start()
+    time.sleep(0.1)
+    stop.set()
+    thread.join(timeout=1)
+
+    beats = list(events.queue)
+    assert not thread.is_alive() and len(beats) >= 2
+    assert all(beat[:3] == ('heartbeat', 3, None) for beat in beats)
+
+
+def test_results_dispatch_jobs_to_ready_workers(fake_pool):
+    first, second = fake_pool.submit('tool', {'n': 1}), fake_pool.submit('tool', {'n': 2})
+    assert fake_pool.in_flight == {}  # nobody ready yet
+
+    # Each worker is handed the next job as it comes up
+    for event in [('ready', 0, None, 1), ('ready', 1, None, 2), ('started', 1, second, time.time()),
+                  ('done', 1, second, 'second text'), ('done', None, 99, 'not ours'), ('failed', 0, first, 'boom')]:
+        fake_pool.result_queue.put(event)
+    results = list(fake_pool.results([first, second]))
+
+    assert [(r['id'], r['worker'], r['status'], r['result']) for r in results] == [
+        (second, 1, 'ok', 'second text'), (first, 0, 'error', 'boom')
+    ]
+    assert results[0]['name'] == 'tool' and results[0]['elapsed'] >= 0
+    report = fake_pool.health_report()
+    assert (report[0]['failed'], report[1]['processed']) == (1, 1)
+    assert report[0]['ready'] and report[0]['current_job'] is None
+    assert fake_pool.in_flight == {} and sorted(fake_pool.idle) == [0, 1]
+
+
+def test_stale_worker_is_replaced_and_its_job_requeued(fake_pool):
+    fake_pool.idle.extend([0, 1])
+    job = fake_pool.submit('tool', {})
+    worker = next(iter(fake_pool.in_flight))
+    stale_process = fake_pool.processes[worker]
+    fake_pool.health[worker]['last_heartbeat'] -= 60
+
+    fake_pool.check_health()
+
+    assert stale_process.terminated
+    assert fake_pool.processes[worker] is not stale_process
+    assert fake_pool.health[worker]['restarts'] == 1 and not fake_pool.health[worker]['ready']
+    # Requeued and handed to the other, healthy worker
+    assert fake_pool.in_flight == {1 - worker: job} and fake_pool.attempts[job] == 1
+
+
+def test_exited_worker_is_restarted_until_the_limit(fake_pool):
+    for restart in range(1, MAX_WORKER_RESTARTS + 1):
+        fake_pool.processes[0].alive = False
+        fake_pool.check_health()
+        assert fake_pool.health[0]['restarts'] == restart
+
+    fake_pool.processes[0].alive = False
+    with pytest.raises(RuntimeError, match='restarted'):
+        fake_pool.check_health()
+
+
+def test_retry_gives_up_after_max_retries(fake_pool):
+    job = fake_pool.submit('tool', {})
+    fake_pool.pending.clear()
+    for attempt in range(MAX_JOB_RETRIES):
+        fake_pool._retry(job, 'worker died')
+        assert list(fake_pool.pending) == [job]
+        fake_pool.pending.clear()
+
+    fake_pool._retry(job, 'worker died')
+    assert not fake_pool.pending
+    result = next(fake_pool.results([job]))
+    assert result['status'] == 'error' and result['worker'] is None
+    assert result['result'] == 'Gave up after retries: worker died'
+
+
+def test_pool_rejects_zero_workers():
+    with pytest.raises(ValueError):
+        WorkerPool(0)
+
+
+def test_worker_processes_run_tool_calls():
+    with WorkerPool(2, client_factory=ClientFactory(), heartbeat_interval=0.2) as pool:
+        results = pool.map([ANALYZE] * 3)
+        health = pool.health_report()
+
+    assert [result['status'] for result in results] == ['ok'] * 3
+    assert all('Offline narrative.' in result['result'] for result in results)
+    assert sum(status['processed'] for status in health.values()) == 3
+
+
+def test_worker_dying_mid_task_is_replaced_and_the_job_retried(tmp_path):
+    factory = ClientFactory(crash_marker=str(tmp_path / 'crashed'))
+    with WorkerPool(1, client_factory=factory, heartbeat_interval=0.2) as pool:
+        results = pool.map([ANALYZE])
+        health = pool.health_report()
+
+    assert os.path.exists(factory.crash_marker)
+    assert results[0]['status'] == 'ok' and 'Offline narrative.' in results[0]['result']
+    assert health[0]['restarts'] == 1 and health[0]['processed'] == 1
+    assert pool.attempts[results[0]['id']] == 1
@@ -0,0 +1,174 @@
+"""
+Argument Validation
+Compiles tool input JSON schemas once into validator closures that coerce
+common client mistakes and report structured errors
+"""
+
+import json
+import math
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+# A compiled node: (value, path, errors) -> coerced value
+Node = Callable[[Any, str, List[Dict[str, str]]], Any]
+
+_NUMBER_NOISE = re.compile(r"[\s$,_]")
+_MISSING = object()
+
+
+class ArgumentError(ValueError):
+    """Tool arguments that do not match the tool's input schema"""
+
+    def __init__(self, tool: str, errors: List[Dict[str, str]]):
+        self.tool = tool
+        self.errors = errors
+        summary = "; ".join(f"{error['path'] or '<root>'}: {error['message']}" for error in errors)
+        super().__init__(f"Invalid arguments for {tool}: {summary}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'error': 'invalid_arguments', 'tool': self.tool, 'errors': self.errors}
+
+
+def _error(errors: List[Dict[str, str]], path: str, code: str, message: str):
+    errors.append({'path': path, 'code': code, 'message': message})
+    return _MISSING
+
+
+def _join(path: str, key: Any) -> str:
+    return f"{path}.{key}" if path else str(key)
+
+
+def _number(integer: bool) -> Node:
+    kind = 'integer' if integer else 'number'
+
+    def check(value, path, errors):
+        if isinstance(value, bool):
+            return _error(errors, path, 'type', f"expected {kind}, got boolean")
+        if isinstance(value, str):
+            # "100,000", "$250000", " 5 " are common from form inputs
+            cleaned = _NUMBER_NOISE.sub('', value)
+            try:
+                value = float(cleaned)
+            except ValueError:
+                return _error(errors, path, 'type', f"expected {kind}, got {value!r}")
+        if not isinstance(value, (int, float)):
+            return _error(errors, path, 'type', f"expected {kind}, got {type(value).__name__}")
+        if not math.isfinite(value):
+            return _error(errors, path, 'type', f"expected a finite {kind}")
+        if integer:
+            if float(value) != int(value):
+                return _error(errors, path, 'type', f"expected integer, got {value}")
+            return int(value)
+        return value
+    return check
+
+
+def _string(value, path, errors):
+    if isinstance(value, str):
+        return value
+    return _error(errors, path, 'type', f"expected string, got {type(value).__name__}")
+
+
+def _boolean(value, path, errors):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+        return value.strip().lower() == 'true'
+    return _error(errors, path, 'type', f"expected boolean, got {type(value).__name__}")
+
+
+def _array(items: Node) -> Node:
+    def check(value, path, errors):
+        if isinstance(value, str):
+            value = [value]  # a single goal/objective sent as a bare string
+        if not isinstance(value, (list, tuple)):
+            return _error(errors, path, 'type', f"expected array, got {type(value).__name__}")
+        if items is None:
+            return list(value)
+        return [items(item, _join(path, index), errors) for index, item in enumerate(value)]
+    return check
+
+
+def _object(properties: Dict[str, Node], required: Tuple[str, ...], additional: bool) -> Node:
+    def check(value, path, errors):
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)  # JSON-encoded object
+            except ValueError:
+                pass
+        if not isinstance(value, dict):
+            return _error(errors, path, 'type', f"expected object, got {type(value).__name__}")
+
+        result = {}
+        for key in required:
+            if value.get(key) is None:
+                _error(errors, _join(path, key), 'required', "is required")
+        for key, item in value.items():
+            node = properties.get(key)
+            if node is not None:
+                if item is not None:
+                    result[key] = node(item, _join(path, key), errors)
+            elif additional:
+                result[key] = item
+            else:
+                _error(errors, _join(path, key), 'unexpected', "is not an allowed property")
+        return result
+    return check
+
+
+def _constrained(node: Node, schema: Dict[str, Any]) -> Node:
+    """Wrap a type check with enum and range constraints"""
+    enum = schema.get('enum')
+    minimum, maximum = schema.get('minimum'), schema.get('maximum')
+    if enum is None and minimum is None and maximum is None:
+        return node
+
+    folded = {str(option).lower(): option for option in enum} if enum else {}
+
+    def check(value, path, errors):
+        value = node(value, path, errors)
+        if value is _MISSING:
+            return value
+        if enum is not None and value not in enum:
+            canonical = folded.get(str(value).strip().lower()) if isinstance(value, str) else None
+            if canonical is None:
+                return _error(errors, path, 'enum', f"must be one of {', '.join(map(str, enum))}")
+            value = canonical
+        if minimum is not None and value < minimum:
+            return _error(errors, path, 'minimum', f"must be >= {minimum}")
+        if maximum is not None and value > maximum:
+            return _error(errors, path, 'maximum', f"must be <= {maximum}")
+        return value
+    return check
+
+
+def compile_schema(schema: Dict[str, Any]) -> Node:
+    """Compile the JSON-schema subset used by the tool definitions into a validator"""
+    kind = schema.get('type')
+    if kind == 'object':
+        properties = {key: compile_schema(sub) for key, sub in schema.get('properties', {}).items()}
+        node = _object(properties, tuple(schema.get('required', ())), schema.get('additionalProperties', True) is not False)
+    elif kind == 'array':
+        node = _array(compile_schema(schema['items']) if 'items' in schema else None)
+    elif kind in ('number', 'integer'):
+        node = _number(kind == 'integer')
+    elif kind == 'string':
+        node = _string
+    elif kind == 'boolean':
+        node = _boolean
+    else:
+        node = lambda value, path, errors: value  # noqa: E731 (untyped: accept anything)
+    return _constrained(node, schema)
+
+
+def compile_validator(tool: str, schema: Dict[str, Any]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Validator returning coerced arguments or raising ArgumentError"""
+    node = compile_schema(schema)
+
+    def validate(arguments: Dict[str, Any]) -> Dict[str, Any]:
+        errors: List[Dict[str, str]] = []
+        result = node(arguments if arguments is not None else {}, '', errors)
+        if errors:
+            raise ArgumentError(tool, errors)
+        return result
+    return validate
@@ -0,0 +1,299 @@
+"""
+Worker Pool Supervisor for the Bedrock MCP Server
+Fans bulk tool calls out to N worker processes for nightly batch runs
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 2.0
+HEARTBEAT_TIMEOUT = 30.0
+MAX_JOB_RETRIES = 2
+MAX_WORKER_RESTARTS = 5
+
+
+def _heartbeat_loop(worker_id: int, result_queue, stop_event: threading.Event, interval: float):
+    """Report liveness to the supervisor until the worker stops"""
+    while not stop_event.wait(interval):
+        result_queue.put(('heartbeat', worker_id, None, time.time()))
+
+
+def _worker_main(worker_id: int, task_queue, result_queue, cache_dir: Optional[str],
+                 client_factory: Optional[Callable[[], Any]], heartbeat_interval: float):
+    """Worker process entry point: one server and Bedrock client per process"""
+    from mcp_server_bedrock import BedrockMCPServer
+    from response_cache import ResponseCache
+
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    client = client_factory() if client_factory else None
+    server = BedrockMCPServer(bedrock_client=client, cache=cache)
+    # Bulk results go to a file, not over MCP: always return reports in full
+    server.inline_limit = sys.maxsize
+    loop = asyncio.new_event_loop()
+
+    stop_event = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat_loop,
+        args=(worker_id, result_queue, stop_event, heartbeat_interval),
+        daemon=True
+    )
+    heartbeat.start()
+    result_queue.put(('ready', worker_id, None, os.getpid()))
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            job_id, name, arguments = task
+            result_queue.put(('started', worker_id, job_id, time.time()))
+            try:
+                contents = loop.run_until_complete(server.call_tool(name, arguments))
+                text = "\n".join(content.text for content in contents if content.type == "text")
+                result_queue.put(('done', worker_id, job_id, text))
+            except Exception as e:
+                result_queue.put(('failed', worker_id, job_id, str(e)))
+    finally:
+        stop_event.set()
+        loop.close()
+
+
+class WorkerPool:
+    """Supervisor that distributes tool calls across worker processes.
+
+    The supervisor hands each idle worker one job at a time on that worker's
+    own task queue, so it always knows which job a worker holds, even before
+    the worker reports it ``started``. Workers report ``done``/``failed``
+    events and periodic heartbeats on a shared result queue. Workers that
+    exit or stop heartbeating are replaced and their assigned job is requeued.
+    """
+
+    def __init__(self, num_workers: int, cache_dir: Optional[str] = None,
+                 client_factory: Optional[Callable[[], Any]] = None,
+                 heartbeat_interval: float = HEARTBEAT_INTERVAL,
+                 heartbeat_timeout: float = HEARTBEAT_TIMEOUT):
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+
+        # spawn avoids forking a process that already holds boto3 threads/sockets
+        self.context = mp.get_context('spawn')
+        self.num_workers = num_workers
+        self.cache_dir = cache_dir
+        self.client_factory = client_factory
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+
+        self.result_queue = self.context.Queue()
+        self.task_queues: Dict[int, Any] = {}
+        self.processes: Dict[int, Any] = {}
+        self.health: Dict[int, Dict[str, Any]] = {}
+        self.in_flight: Dict[int, int] = {}
+        self.idle: List[int] = []
+        self.pending = deque()
+        self.tasks: Dict[int, tuple] = {}
+        self.attempts: Dict[int, int] = {}
+        self.next_job_id = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    def start(self):
+        """Start all worker processes"""
+        for worker_id in range(self.num_workers):
+            self._spawn(worker_id)
+
+    def _spawn(self, worker_id: int):
+        # A fresh queue: anything left on the old one belonged to the dead worker
+        self.task_queues[worker_id] = self.context.Queue()
+        process = self.context.Process(
+            target=_worker_main,
+            args=(worker_id, self.task_queues[worker_id], self.result_queue, self.cache_dir,
+                  self.client_factory, self.heartbeat_interval),
+            name=f"bedrock-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self.processes[worker_id] = process
+
+        previous = self.health.get(worker_id, {})
+        self.health[worker_id] = {
+            'pid': process.pid,
+            'alive': True,
+            'ready': False,
+            'processed': previous.get('processed', 0),
+            'failed': previous.get('failed', 0),
+            'restarts': previous.get('restarts', -1) + 1,
+            'last_heartbeat': time.time(),
+            'current_job': None
+        }
+
+    def submit(self, name: str, arguments: Dict[str, Any]) -> int:
+        """Queue a tool call and return its job id"""
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        self.tasks[job_id] = (job_id, name, arguments)
+        self.attempts[job_id] = 0
+        self.pending.append(job_id)
+        self._dispatch()
+        return job_id
+
+    def _dispatch(self):
+        """Assign pending jobs to idle workers"""
+        while self.pending and self.idle:
+            worker_id = self.idle.pop()
+            job_id = self.pending.popleft()
+            self.in_flight[worker_id] = job_id
+            self.health[worker_id]['current_job'] = job_id
+            self.task_queues[worker_id].put(self.tasks[job_id])
+
+    def check_health(self):
+        """Replace dead or unresponsive workers and requeue their jobs"""
+        now = time.time()
+        for worker_id, process in list(self.processes.items()):
+            status = self.health[worker_id]
+            stale = now - status['last_heartbeat'] > self.heartbeat_timeout
+            if process.is_alive() and not stale:
+                continue
+
+            logger.warning(
+                f"Worker {worker_id} (pid {process.pid}) "
+                f"{'unresponsive' if process.is_alive() else 'exited'}; restarting"
+            )
+            if process.is_alive():
+                process.terminate()
+            process.join(timeout=5)
+            status['alive'] = False
+            if worker_id in self.idle:
+                self.idle.remove(worker_id)
+
+            job_id = self.in_flight.pop(worker_id, None)
+            if job_id is not None:
+                self._retry(job_id, f"worker {worker_id} died")
+
+            if status['restarts'] >= MAX_WORKER_RESTARTS:
+                raise RuntimeError(
+                    f"Worker {worker_id} restarted {status['restarts']} times; check worker logs"
+                )
+            self._spawn(worker_id)
+        self._dispatch()
+
+    def _retry(self, job_id: int, reason: str):
+        self.attempts[job_id] += 1
+        if self.attempts[job_id] > MAX_JOB_RETRIES:
+            self.result_queue.put(('failed', None, job_id, f"Gave up after retries: {reason}"))
+        else:
+            self.pending.append(job_id)
+
+    def health_report(self) -> Dict[int, Dict[str, Any]]:
+        """Snapshot of per-worker health"""
+        now = time.time()
+        report = {}
+        for worker_id, status in self.health.items():
+            report[worker_id] = dict(status)
+            report[worker_id]['alive'] = self.processes[worker_id].is_alive()
+            report[worker_id]['heartbeat_age'] = round(now - status['last_heartbeat'], 2)
+        return report
+
+    def results(self, job_ids: Iterable[int]) -> Iterable[Dict[str, Any]]:
+        """Yield results for the given jobs in completion order"""
+        remaining = set(job_ids)
+        started_at: Dict[int, float] = {}
+        last_check = time.time()
+
+        while remaining:
+            if time.time() - last_check > self.heartbeat_interval:
+                self.check_health()
+                last_check = time.time()
+            try:
+                event, worker_id, job_id, payload = self.result_queue.get(timeout=self.heartbeat_interval)
+            except queue.Empty:
+                continue
+
+            if worker_id is not None:
+                self.health[worker_id]['last_heartbeat'] = time.time()
+
+            if event == 'ready':
+                self.health[worker_id]['ready'] = True
+                self.idle.append(worker_id)
+                self._dispatch()
+            elif event == 'started':
+                started_at[job_id] = payload
+            elif event in ('done', 'failed'):
+                if worker_id is not None and self.in_flight.get(worker_id) == job_id:
+                    del self.in_flight[worker_id]
+                    self.health[worker_id]['current_job'] = None
+                    self.health[worker_id]['processed' if event == 'done' else 'failed'] += 1
+                    self.idle.append(worker_id)
+                    self._dispatch()
+                if job_id not in remaining:
+                    continue
+                remaining.discard(job_id)
+                name = self.tasks[job_id][1]
+                yield {
+                    'id': job_id,
+                    'name': name,
+                    'status': 'ok' if event == 'done' else 'error',
+                    'worker': worker_id,
+                    'elapsed': round(time.time() - started_at.get(job_id, time.time()), 4),
+                    'result': payload
+                }
+
+    def map(self, calls: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run a batch of ``{"name", "arguments"}`` calls and return results in submission order"""
+        job_ids = [self.submit(call['name'], call.get('arguments', {})) for call in calls]
+        results = {result['id']: result for result in self.results(job_ids)}
+        return [results[job_id] for job_id in job_ids]
+
+    def shutdown(self, timeout: float = 10.0):
+        """Stop all workers after they drain their current job"""
+        for task_queue in self.task_queues.values():
+            task_queue.put(None)
+        for process in self.processes.values():
+            process.join(timeout=timeout)
+            if process.is_alive():
+                process.terminate()
+
+
+def run_bulk(input_path: Optional[str], output_path: Optional[str], num_workers: int,
+             cache_dir: Optional[str] = None):
+    """Supervisor mode: process a JSONL file of tool calls with N workers"""
+    if input_path:
+        with open(input_path, 'r', encoding='utf-8') as source:
+            calls = [json.loads(line) for line in source if line.strip()]
+    else:
+        calls = [json.loads(line) for line in sys.stdin if line.strip()]
+
+    start = time.perf_counter()
+    with WorkerPool(num_workers, cache_dir=cache_dir) as pool:
+        job_ids = [pool.submit(call['name'], call.get('arguments', {})) for call in calls]
+        sink = open(output_path, 'w', encoding='utf-8') if output_path else sys.stdout
+        try:
+            for result in pool.results(job_ids):
+                sink.write(json.dumps(result) + "\n")
+        finally:
+            if output_path:
+                sink.close()
+        health = pool.health_report()
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Processed {len(calls)} calls with {num_workers} workers in {elapsed:.2f}s "
+                f"({len(calls) / elapsed if elapsed else 0:.1f} calls/s)")
+    for worker_id, status in sorted(health.items()):
+        logger.info(f"Worker {worker_id}: processed={status['processed']} failed={status['failed']} "
+                    f"restarts={status['restarts']}")
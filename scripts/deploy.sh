@@ -159,7 +159,7 @@ build_docker_images() {
         
         # Build Streamlit image
         cd streamlit-app
-        docker build -t $PROJECT_NAME-streamlit:latest .
+        docker build --build-context advisor-core=../advisor-core -t $PROJECT_NAME-streamlit:latest .
         docker tag $PROJECT_NAME-streamlit:latest $ECR_REPO:latest
         docker push $ECR_REPO:latest
         cd ..
@@ -183,6 +183,7 @@ setup_mcp_servers() {
     # Install custom MCP servers
     cd bedrock-mcp
     pip install -r requirements.txt
+    pip install ../../advisor-core
     cd ..
     
     cd ..
@@ -29,6 +29,13 @@ source venv/bin/activate
 # Install/update requirements
 echo -e "${BLUE}📚 Installing requirements...${NC}"
 pip install -r requirements.txt
+pip install -e ../advisor-core
+
+# Precompute the efficient-frontier table once instead of on the first page load
+if [ ! -f data/frontier/frontier.npz ]; then
+    echo -e "${BLUE}📈 Building frontier table...${NC}"
+    python -m components.portfolio_optimizer
+fi
 
 # Set environment variables for local development
 export AWS_REGION=us-east-1
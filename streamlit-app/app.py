@@ -4,23 +4,26 @@ Main application entry point with multi-page navigation
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import boto3
+import numpy as np
 import json
-import os
-from typing import Dict, List, Optional
+from typing import Dict
+from plotly.colors import qualitative
 
 # Import custom components
-from components.portfolio_optimizer import PortfolioOptimizer
-from components.risk_analyzer import RiskAnalyzer
-from components.market_data import MarketDataProvider
-from utils.aws_client import AWSClient
+from components.advisor import ai_recommendations
+from components.backtester import REBALANCE_PERIODS
+from components.charts import fan_chart, line_chart, pie_chart
+from components.engine import AdvisorEngine, goal_table
+from components.sensitivity import METRICS as SWEEP_METRICS
+from utils.jobs import FAILED, JobQueue
 from utils.mcp_client import MCPClient
+from utils.sessions import (INVESTMENT_GOALS, RISK_TOLERANCES, TIME_HORIZONS, SessionRegistry,
+                            current_session_id, process_rss)
 from config.settings import Settings
 
+# Seconds between reruns of the AI panel, which shows a running job's status
+AI_POLL_INTERVAL = Settings().ai_poll_interval
+
 # Page configuration
 st.set_page_config(
     page_title="Investment Advisor AI",
@@ -235,20 +238,46 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_engine() -> AdvisorEngine:
+    """Shared compute core; frontier table, return history and simulated paths load once per process"""
+    return AdvisorEngine()
+
+@st.cache_resource
+def get_mcp_client() -> MCPClient:
+    return MCPClient()
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """Background AI jobs, shared by every session in this process"""
+    return JobQueue(max_workers=Settings().ai_job_workers)
+
+@st.cache_resource
+def get_sessions() -> SessionRegistry:
+    """Compact per-session records for every session in this process; idle records are dropped"""
+    settings = Settings()
+    return SessionRegistry(settings.session_idle_ttl, settings.session_sweep_interval)
+
+@st.cache_data(ttl=Settings().status_check_ttl, show_spinner=False)
+def get_system_status() -> Dict[str, object]:
+    """AWS, MCP and Bedrock checks; network calls, so reused across reruns and sessions"""
+    from utils.aws_client import AWSClient  # boto3 loads with the first check, not at import
+    
+    aws_client = AWSClient()
+    return {
+        'aws': aws_client.check_connection(),
+        'mcp': MCPClient().check_servers(),
+        'bedrock': aws_client.check_bedrock_access(),
+    }
+
 class InvestmentAdvisorApp:
     def __init__(self):
-        self.settings = Settings()
-        self.aws_client = AWSClient()
-        self.mcp_client = MCPClient()
-        self.portfolio_optimizer = PortfolioOptimizer()
-        self.risk_analyzer = RiskAnalyzer()
-        self.market_data = MarketDataProvider()
-        
-        # Initialize session state
-        if 'user_profile' not in st.session_state:
-            st.session_state.user_profile = {}
-        if 'portfolio_data' not in st.session_state:
-            st.session_state.portfolio_data = {}
+        self.mcp_client = get_mcp_client()
+        self.engine = get_engine()
+        self.settings = self.engine.settings
+        
+        # Per-session state lives in one compact record, not in st.session_state
+        self.session = get_sessions().session(current_session_id())
     
     def render_header(self):
         """Render the main application header"""
@@ -284,27 +313,27 @@ class InvestmentAdvisorApp:
                 
                 risk_tolerance = st.select_slider(
                     "Risk Tolerance",
-                    options=["Conservative", "Moderate", "Aggressive"],
+                    options=RISK_TOLERANCES,
                     value="Moderate"
                 )
                 
                 time_horizon = st.selectbox(
                     "Investment Time Horizon",
-                    ["1-3 years", "3-5 years", "5-10 years", "10+ years"]
+                    TIME_HORIZONS
                 )
                 
                 investment_goals = st.multiselect(
                     "Investment Goals",
-                    ["Retirement", "Education", "Home Purchase", "Wealth Building", "Income Generation"]
+                    INVESTMENT_GOALS
                 )
             
-            # Update session state
-            st.session_state.user_profile = {
+            # Update the session record
+            self.session.update({
                 'investment_amount': investment_amount,
                 'risk_tolerance': risk_tolerance,
                 'time_horizon': time_horizon,
                 'investment_goals': investment_goals
-            }
+            })
             
             st.markdown("---")
             
@@ -317,26 +346,35 @@ class InvestmentAdvisorApp:
     def render_system_status(self):
         """Render system status indicators"""
         try:
-            # Check AWS connectivity
-            aws_status = self.aws_client.check_connection()
-            st.success("✅ AWS Connected") if aws_status else st.error("❌ AWS Disconnected")
-            
-            # Check MCP servers
-            mcp_status = self.mcp_client.check_servers()
-            st.success(f"✅ MCP Servers: {len(mcp_status)} active") if mcp_status else st.warning("⚠️ MCP Servers: Limited")
-            
-            # Check Bedrock access
-            bedrock_status = self.aws_client.check_bedrock_access()
-            st.success("✅ Bedrock Available") if bedrock_status else st.warning("⚠️ Bedrock Limited")
+            status = get_system_status()
+            st.success("✅ AWS Connected") if status['aws'] else st.error("❌ AWS Disconnected")
+            st.success(f"✅ MCP Servers: {len(status['mcp'])} active") if status['mcp'] else st.warning("⚠️ MCP Servers: Limited")
+            st.success("✅ Bedrock Available") if status['bedrock'] else st.warning("⚠️ Bedrock Limited")
             
         except Exception as e:
             st.error(f"❌ System Check Failed: {str(e)}")
     
     def render_dashboard(self):
-        """Render the main dashboard"""
+        """Render the main dashboard as independent panels.
+        
+        Panels with widgets are fragments: a widget inside one reruns only that
+        panel, while sidebar changes rerun the page and every panel with the new profile.
+        """
         st.markdown("## 📊 Investment Dashboard")
         
-        # Key Metrics Row
+        # Get optimized portfolio
+        portfolio = self.engine.allocation(self.session.profile)
+        
+        self.render_metrics(portfolio)
+        self.render_allocation_chart(portfolio)
+        self.render_performance(portfolio)
+        self.render_goal_planning(portfolio)
+        self.render_ai_recommendations()
+    
+    def render_metrics(self, portfolio: Dict[str, float]):
+        """Key metric cards for the optimized portfolio"""
+        profile = self.session.profile
+        metrics = self.engine.metrics(profile, portfolio) if portfolio else None
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
@@ -344,140 +382,213 @@ class InvestmentAdvisorApp:
             <div class="metric-card">
                 <h3>Portfolio Value</h3>
                 <h2>${:,}</h2>
-                <p style="color: green;">+5.2% this month</p>
+                <p style="color: gray;">Amount to invest</p>
             </div>
-            """.format(st.session_state.user_profile.get('investment_amount', 0)), unsafe_allow_html=True)
+            """.format(profile['investment_amount']), unsafe_allow_html=True)
         
         with col2:
             st.markdown("""
             <div class="metric-card">
                 <h3>Expected Return</h3>
-                <h2>7.8%</h2>
+                <h2>{}</h2>
                 <p style="color: blue;">Annual projection</p>
             </div>
-            """, unsafe_allow_html=True)
+            """.format(f"{metrics['expected_return']:.1f}%" if metrics else '-'), unsafe_allow_html=True)
         
         with col3:
             st.markdown("""
             <div class="metric-card">
                 <h3>Risk Score</h3>
-                <h2>6.2/10</h2>
-                <p style="color: orange;">Moderate risk</p>
+                <h2>{}/10</h2>
+                <p style="color: orange;">{} risk</p>
             </div>
-            """, unsafe_allow_html=True)
+            """.format(
+                metrics['risk_score'] if metrics else '-',
+                profile['risk_tolerance']
+            ), unsafe_allow_html=True)
         
         with col4:
             st.markdown("""
             <div class="metric-card">
                 <h3>Diversification</h3>
-                <h2>85%</h2>
-                <p style="color: green;">Well diversified</p>
+                <h2>{:.0%}</h2>
+                <p style="color: green;">Effective asset classes: {:.1f}</p>
             </div>
-            """, unsafe_allow_html=True)
-        
-        # Portfolio Allocation Chart
+            """.format(
+                metrics['diversification'] if metrics else 0,
+                metrics['effective_assets'] if metrics else 0
+            ), unsafe_allow_html=True)
+    
+    def render_allocation_chart(self, portfolio: Dict[str, float]):
+        """Pie chart of the optimized allocation"""
         st.markdown("### 🥧 Current Portfolio Allocation")
         
-        # Get optimized portfolio
-        if st.session_state.user_profile:
-            portfolio = self.portfolio_optimizer.optimize(st.session_state.user_profile)
-            
-            # Create pie chart
-            fig = px.pie(
-                values=list(portfolio.values()),
-                names=list(portfolio.keys()),
-                title="Optimized Asset Allocation",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig.update_traces(textposition='inside', textinfo='percent+label')
+        if portfolio:
+            fig = pie_chart(portfolio, title="Optimized Asset Allocation", palette=qualitative.Set3)
             st.plotly_chart(fig, use_container_width=True)
-        
-        # Performance Chart
+    
+    @st.fragment
+    def render_performance(self, portfolio: Dict[str, float]):
+        """Backtest chart; its period and rebalancing inputs rerun only this panel"""
+        self.session.touch()  # fragment reruns skip __init__, so mark the session active here
         st.markdown("### 📈 Portfolio Performance")
         
-        # Generate sample performance data
-        dates = pd.date_range(start=datetime.now() - timedelta(days=365), end=datetime.now(), freq='D')
-        performance_data = pd.DataFrame({
-            'Date': dates,
-            'Portfolio Value': [100000 * (1 + 0.08 * (i / 365) + 0.02 * (i % 30 - 15) / 30) for i in range(len(dates))],
-            'S&P 500': [100000 * (1 + 0.10 * (i / 365) + 0.03 * (i % 20 - 10) / 20) for i in range(len(dates))]
-        })
-        
-        fig = px.line(
-            performance_data,
-            x='Date',
-            y=['Portfolio Value', 'S&P 500'],
-            title="Portfolio vs Benchmark Performance"
+        if not portfolio:
+            return
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            years = st.select_slider("Backtest Period (years)", options=[1, 3, 5], value=1)
+        with col2:
+            policy = st.selectbox("Rebalancing", list(REBALANCE_PERIODS), index=1)
+        
+        performance = self.engine.performance(
+            portfolio, self.session.amount, years, policy
+        )
+        # WebGL traces, each capped at the chart's pixel budget
+        fig = line_chart(
+            performance['dates'],
+            {'Portfolio Value': performance['portfolio'], 'S&P 500': performance['benchmark']},
+            title="Portfolio vs Benchmark Performance ({})".format(
+                'Simulated' if self.engine.simulated else 'Historical'
+            )
         )
         st.plotly_chart(fig, use_container_width=True)
+        st.caption(
+            "Max drawdown {:.1%} · volatility {:.1%} · annual turnover {:.1%}".format(
+                performance['stats']['max_drawdown'],
+                performance['stats']['volatility'],
+                performance['stats']['turnover']
+            )
+        )
+    
+    @st.fragment
+    def render_ai_recommendations(self):
+        """Submit the analysis as a background job and show its result.
         
-        # AI Recommendations
+        Only while the job is queued or running does the panel render the
+        timed poller below, so idle dashboards never rerun on a timer.
+        """
+        self.session.touch()
         st.markdown("### 🤖 AI-Powered Recommendations")
         
+        queue = get_job_queue()
         if st.button("Get AI Analysis", type="primary"):
-            with st.spinner("Analyzing your portfolio with AI..."):
-                try:
-                    recommendations = self.get_ai_recommendations()
-                    st.success("Analysis complete!")
-                    
-                    for i, rec in enumerate(recommendations, 1):
-                        st.markdown(f"**{i}. {rec['title']}**")
-                        st.markdown(f"   {rec['description']}")
-                        st.markdown(f"   *Confidence: {rec['confidence']}%*")
-                        st.markdown("---")
-                        
-                except Exception as e:
-                    st.error(f"AI analysis failed: {str(e)}")
-                    # Fallback recommendations
-                    st.markdown("**Fallback Recommendations:**")
-                    st.markdown("1. **Rebalance Portfolio**: Consider rebalancing to maintain target allocation")
-                    st.markdown("2. **Diversify Holdings**: Add international exposure for better diversification")
-                    st.markdown("3. **Review Risk Level**: Current allocation matches your risk tolerance")
-    
-    def get_ai_recommendations(self) -> List[Dict]:
-        """Get AI-powered investment recommendations"""
-        try:
-            # Use MCP client to get Bedrock recommendations
-            prompt = f"""
-            Analyze this investment profile and provide 3 specific recommendations:
-            - Investment Amount: ${st.session_state.user_profile.get('investment_amount', 0):,}
-            - Risk Tolerance: {st.session_state.user_profile.get('risk_tolerance', 'Moderate')}
-            - Time Horizon: {st.session_state.user_profile.get('time_horizon', '5-10 years')}
-            - Goals: {', '.join(st.session_state.user_profile.get('investment_goals', []))}
-            
-            Provide actionable, specific recommendations with confidence scores.
-            """
-            
-            response = self.mcp_client.call_bedrock(prompt)
-            
-            # Parse AI response (simplified)
-            return [
-                {
-                    'title': 'Increase International Exposure',
-                    'description': 'Consider adding 15-20% international equity exposure for better diversification.',
-                    'confidence': 85
-                },
-                {
-                    'title': 'Optimize Tax Efficiency',
-                    'description': 'Move tax-inefficient investments to tax-advantaged accounts.',
-                    'confidence': 92
-                },
-                {
-                    'title': 'Rebalance Quarterly',
-                    'description': 'Set up automatic rebalancing to maintain target allocation.',
-                    'confidence': 78
-                }
-            ]
-            
-        except Exception as e:
-            st.error(f"AI recommendation error: {str(e)}")
-            return []
+            # Returns at once; the model call runs on the shared job pool
+            profile = self.session.profile
+            self.session.ai_job = queue.submit(
+                ai_recommendations, self.mcp_client, self.engine.advisor, profile,
+                key=json.dumps(profile, sort_keys=True, default=str)
+            )
+        
+        if self.session.ai_job is None:
+            return
+        job = queue.get(self.session.ai_job)
+        if job is None:
+            st.info("This analysis has expired; run it again.")
+            return
+        if not job.done:
+            self.render_ai_progress(self.session.ai_job)
+            return
+        
+        if job.state == FAILED:
+            st.error(f"AI analysis failed: {job.error}")
+            return
+        result = job.result
+        if result['source'] == 'ai':
+            st.success(f"Analysis complete in {job.elapsed:.1f}s")
+        else:
+            # Degraded mode: same profile, computed locally in a few milliseconds
+            st.info(f"AI service unavailable ({result['error']}); showing locally computed recommendations.")
+        
+        for i, rec in enumerate(result['recommendations'], 1):
+            st.markdown(f"**{i}. {rec['title']}**")
+            st.markdown(f"   {rec['description']}")
+            st.markdown(f"   *Confidence: {rec['confidence']}%*")
+            st.markdown("---")
+    
+    @st.fragment(run_every=AI_POLL_INTERVAL)
+    def render_ai_progress(self, job_id: str):
+        """Status of a queued or running analysis, refreshed every poll interval.
+        
+        Leaves the session's activity time alone, so an open tab waiting on a
+        job can still go idle. Once the job is over, one full page run shows
+        the result and clears this timer.
+        """
+        job = get_job_queue().get(job_id)
+        if job is None or job.done:
+            st.rerun()
+        st.info(f"⏳ Analyzing your portfolio with AI... {job.elapsed:.0f}s. The rest of the page stays usable.")
+    
+    @st.fragment
+    def render_goal_planning(self, portfolio: Dict[str, float]):
+        """Success probability and required contribution for each selected goal"""
+        self.session.touch()
+        st.markdown("### 🎯 Goal Planning")
+        
+        profile = self.session.profile
+        if not profile['investment_goals']:
+            st.info("Select investment goals in the sidebar to see funding probabilities.")
+            return
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            contribution = st.number_input("Annual Contribution ($)", min_value=0, max_value=1000000,
+                                           value=10000, step=1000)
+        with col2:
+            target_probability = st.slider("Target Success Probability", min_value=0.5, max_value=0.99,
+                                           value=0.8, step=0.01)
+        
+        plan = self.engine.goal_plan(profile, portfolio, contribution, target_probability)
+        st.dataframe(goal_table(plan['rows']), use_container_width=True, hide_index=True)
+        
+        wealth = plan['wealth']
+        st.plotly_chart(fan_chart(np.arange(len(wealth)), wealth, title="Projected Wealth",
+                                  yaxis_title="Portfolio Value ($)", xaxis_title="Year"),
+                        use_container_width=True)
     
     def render_portfolio_analysis(self):
         """Render portfolio analysis page"""
         st.markdown("## 📊 Portfolio Analysis")
         
-        # Portfolio input section
+        self.render_holdings_analysis()
+        self.render_sensitivity()
+    
+    def render_risk_assessment(self):
+        """Risk across the stored client book, plus one client's metrics"""
+        st.markdown("## ⚠️ Risk Assessment")
+        
+        dates = self.engine.book_dates()
+        if not dates:
+            st.info("No portfolio snapshots found; compact client data into snapshots to see book-wide risk.")
+            return
+        
+        snapshot_date = st.selectbox("Snapshot date", dates)
+        book = self.engine.book_risk(snapshot_date)
+        levels = book['risk_levels']
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Clients", f"{book['clients']:,}")
+        col2.metric("Low Risk", f"{levels['Low']:,}")
+        col3.metric("Medium Risk", f"{levels['Medium']:,}")
+        col4.metric("High Risk", f"{levels['High']:,}")
+        st.dataframe(book['percentiles'], use_container_width=True, hide_index=True)
+        
+        user_id = st.text_input("Client ID")
+        if user_id:
+            risk = self.engine.client_risk(snapshot_date, user_id.strip())
+            if risk is None:
+                st.warning(f"No portfolio for {user_id} in the {snapshot_date} snapshot.")
+            else:
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Risk Score", f"{risk['risk_score']:.1f}/10")
+                col2.metric("Volatility", f"{risk['volatility']:.1%}")
+                col3.metric("VaR 95% (daily)", f"{risk['var_95_daily']:.2%}")
+                col4.metric("Max Drawdown", f"{risk['max_drawdown']:.1%}")
+    
+    @st.fragment
+    def render_holdings_analysis(self):
+        """Holdings sliders and analysis; moving a slider reruns only this panel"""
+        self.session.touch()
         st.markdown("### Current Holdings")
         
         col1, col2 = st.columns(2)
@@ -495,14 +606,70 @@ class InvestmentAdvisorApp:
         with col2:
             st.markdown("#### Analysis Results")
             if st.button("Analyze Portfolio"):
-                analysis = self.portfolio_optimizer.analyze({
+                analysis = self.engine.analyze_holdings({
                     'stocks': stocks_pct,
                     'bonds': bonds_pct,
                     'alternatives': alternatives_pct
-                })
+                }, self.session.profile['time_horizon'])
                 
                 st.json(analysis)
     
+    @st.fragment
+    def render_sensitivity(self):
+        """Heatmap of outcomes across amount x horizon x risk"""
+        self.session.touch()
+        import plotly.express as px  # only this page needs plotly.express
+        
+        st.markdown("### 🔥 Sensitivity Analysis")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            metric = st.selectbox("Metric", list(SWEEP_METRICS), format_func=SWEEP_METRICS.get)
+        with col2:
+            view = st.selectbox("View", ["Horizon × Risk", "Amount × Risk"])
+        with col3:
+            contribution = st.number_input("Annual Contribution ($)", min_value=0, max_value=1000000,
+                                           value=0, step=1000, key="sweep_contribution")
+        
+        amount = self.session.amount
+        result, amounts, horizons, risk_scores = self.engine.sensitivity(amount, contribution)
+        
+        if view == "Horizon × Risk":
+            values, rows, row_label = result.slice(metric, amount=amount), [f"{h}y" for h in horizons], "Horizon"
+        else:
+            horizon = st.select_slider("Horizon (years)", options=list(horizons), value=10)
+            values, rows, row_label = result.slice(metric, horizon=horizon), [f"${a:,.0f}" for a in amounts], "Amount"
+        
+        percent = metric in ('probability_of_loss', 'expected_return', 'volatility', 'stocks_weight')
+        fig = px.imshow(
+            values * (100 if percent else 1),
+            x=[f"{score:.0f}" for score in risk_scores],
+            y=rows,
+            labels={'x': "Risk Score", 'y': row_label, 'color': '%' if percent else '$'},
+            color_continuous_scale='RdYlGn_r' if metric in ('probability_of_loss', 'volatility') else 'RdYlGn',
+            text_auto='.0f',
+            aspect='auto',
+            title=SWEEP_METRICS[metric]
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    def render_memory_report(self):
+        """Process memory, the data shared by all sessions, and what each session adds"""
+        st.markdown("### 🧠 Memory")
+        self.session.measure(st.session_state.to_dict())
+        sessions = get_sessions()
+        report = sessions.report()
+        per_session = [row['record_bytes'] + row['state_bytes'] for row in report]
+        
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Process RSS", f"{process_rss() / 2**20:,.0f} MB")
+        col2.metric("Shared Data", f"{self.engine.shared_bytes() / 2**20:,.1f} MB")
+        col3.metric("Active Sessions", len(report))
+        col4.metric("Avg. per Session", f"{sum(per_session) / max(len(per_session), 1) / 1024:,.1f} KB")
+        st.caption(f"Records of sessions idle for {sessions.idle_ttl / 60:.0f} minutes are dropped; "
+                   "state size is measured when a session opens this page.")
+        st.dataframe(report, use_container_width=True, hide_index=True)
+    
     def run(self):
         """Main application runner"""
         self.render_header()
@@ -516,14 +683,13 @@ class InvestmentAdvisorApp:
         elif current_page == "Portfolio Analysis":
             self.render_portfolio_analysis()
         elif current_page == "Risk Assessment":
-            st.markdown("## ⚠️ Risk Assessment")
-            st.info("Risk assessment features coming soon...")
+            self.render_risk_assessment()
         elif current_page == "Market Insights":
             st.markdown("## 📈 Market Insights")
             st.info("Market insights features coming soon...")
         elif current_page == "Settings":
             st.markdown("## ⚙️ Settings")
-            st.info("Settings page coming soon...")
+            self.render_memory_report()
 
 # Application entry point
 if __name__ == "__main__":
@@ -3,12 +3,25 @@ Investment Advisor - Simple Local Version
 A simplified version for local testing
 """
 
+import json
+
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+
+from components.advisor import ai_recommendations
+from components.backtester import REBALANCE_PERIODS
+from components.charts import fan_chart, line_chart, pie_chart
+from components.engine import AdvisorEngine, goal_table
+from components.portfolio_optimizer import RISK_TOLERANCE_SCORES
+from components.sensitivity import METRICS as SWEEP_METRICS
+from config.settings import Settings
+from utils.jobs import FAILED, JobQueue
+from utils.mcp_client import MCPClient
+from utils.sessions import (INVESTMENT_GOALS, RISK_TOLERANCES, TIME_HORIZONS, SessionRegistry,
+                            current_session_id, process_rss)
+
+# Seconds between reruns of the AI panel, which shows a running job's status
+AI_POLL_INTERVAL = Settings().ai_poll_interval
 
 # Page configuration
 st.set_page_config(
@@ -167,18 +180,26 @@ def render_sidebar():
             
             risk_tolerance = st.select_slider(
                 "Risk Tolerance",
-                options=["Conservative", "Moderate", "Aggressive"],
+                options=RISK_TOLERANCES,
                 value="Moderate"
             )
             
+            risk_score = st.slider(
+                "Risk Score (fine-tune)",
+                min_value=1.0,
+                max_value=10.0,
+                value=RISK_TOLERANCE_SCORES[risk_tolerance],
+                step=0.1
+            )
+            
             time_horizon = st.selectbox(
                 "Investment Time Horizon",
-                ["1-3 years", "3-5 years", "5-10 years", "10+ years"]
+                TIME_HORIZONS
             )
             
             investment_goals = st.multiselect(
                 "Investment Goals",
-                ["Retirement", "Education", "Home Purchase", "Wealth Building", "Income Generation"]
+                INVESTMENT_GOALS
             )
         
         # System Status
@@ -198,24 +219,73 @@ def render_sidebar():
             'page': page,
             'investment_amount': investment_amount,
             'risk_tolerance': risk_tolerance,
+            'risk_score': risk_score,
             'time_horizon': time_horizon,
             'investment_goals': investment_goals
         }
 
-def get_portfolio_allocation(risk_tolerance):
-    """Get portfolio allocation based on risk tolerance"""
-    allocations = {
-        'Conservative': {'Stocks': 30, 'Bonds': 60, 'Alternatives': 10},
-        'Moderate': {'Stocks': 60, 'Bonds': 30, 'Alternatives': 10},
-        'Aggressive': {'Stocks': 80, 'Bonds': 15, 'Alternatives': 5}
-    }
-    return allocations.get(risk_tolerance, allocations['Moderate'])
+@st.cache_resource
+def get_engine():
+    """Shared compute core; frontier table, return history and simulated paths load once per process"""
+    return AdvisorEngine()
+
+@st.cache_resource
+def get_sessions():
+    """Compact per-session records for every session in this process; idle records are dropped"""
+    settings = Settings()
+    return SessionRegistry(settings.session_idle_ttl, settings.session_sweep_interval)
+
+def get_session():
+    """This browser session's record, marked as active (fragment reruns call it too)"""
+    return get_sessions().session(current_session_id())
+
+@st.fragment
+def render_goal_planning(user_profile, portfolio):
+    """Success probability and required contribution for each selected goal"""
+    get_session()
+    st.markdown("### 🎯 Goal Planning")
+    
+    if not user_profile['investment_goals']:
+        st.info("Select investment goals in the sidebar to see funding probabilities.")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        contribution = st.number_input("Annual Contribution ($)", min_value=0, max_value=1000000,
+                                       value=10000, step=1000)
+    with col2:
+        target_probability = st.slider("Target Success Probability", min_value=0.5, max_value=0.99,
+                                       value=0.8, step=0.01)
+    
+    plan = get_engine().goal_plan(user_profile, portfolio, contribution, target_probability)
+    st.dataframe(goal_table(plan['rows']), use_container_width=True, hide_index=True)
+    st.caption(f"{plan['paths']:,} simulated paths at {plan['expected_return']}% expected return "
+               f"and {plan['volatility']}% volatility; goals are funded in the order selected.")
+    
+    wealth = plan['wealth']
+    st.plotly_chart(fan_chart(np.arange(len(wealth)), wealth, title="Projected Wealth",
+                              yaxis_title="Portfolio Value ($)", xaxis_title="Year"),
+                    use_container_width=True)
 
 def render_dashboard(user_profile):
-    """Render the main dashboard"""
+    """Render the main dashboard as independent panels.
+    
+    Panels with widgets are fragments: a widget inside one reruns only that
+    panel, while sidebar changes rerun the page and every panel with the new profile.
+    """
     st.markdown("## 📊 Investment Dashboard")
     
-    # Key Metrics Row
+    portfolio = get_engine().allocation(user_profile)
+    
+    render_metrics(user_profile, portfolio)
+    render_allocation_chart(user_profile['risk_tolerance'], portfolio)
+    render_performance(portfolio, user_profile['investment_amount'])
+    render_goal_planning(user_profile, portfolio)
+    render_ai_recommendations(user_profile)
+
+def render_metrics(user_profile, portfolio):
+    """Key metric cards for the recommended allocation"""
+    metrics = get_engine().metrics(user_profile, portfolio)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
@@ -223,135 +293,181 @@ def render_dashboard(user_profile):
         <div class="metric-card">
             <h3>Portfolio Value</h3>
             <h2>${user_profile['investment_amount']:,}</h2>
-            <p style="color: green;">+5.2% this month</p>
+            <p style="color: gray;">Amount to invest</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col2:
-        expected_return = {"Conservative": 5.5, "Moderate": 7.8, "Aggressive": 9.2}
         st.markdown(f"""
         <div class="metric-card">
             <h3>Expected Return</h3>
-            <h2>{expected_return[user_profile['risk_tolerance']]}%</h2>
+            <h2>{metrics['expected_return']:.1f}%</h2>
             <p style="color: blue;">Annual projection</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col3:
-        risk_scores = {"Conservative": 3.1, "Moderate": 6.2, "Aggressive": 8.7}
         st.markdown(f"""
         <div class="metric-card">
             <h3>Risk Score</h3>
-            <h2>{risk_scores[user_profile['risk_tolerance']]}/10</h2>
+            <h2>{metrics['risk_score']}/10</h2>
             <p style="color: orange;">{user_profile['risk_tolerance']} risk</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col4:
-        st.markdown("""
+        well_diversified = metrics['diversification'] >= 0.5
+        st.markdown(f"""
         <div class="metric-card">
             <h3>Diversification</h3>
-            <h2>85%</h2>
-            <p style="color: green;">Well diversified</p>
+            <h2>{metrics['diversification']:.0%}</h2>
+            <p style="color: {'green' if well_diversified else 'orange'};">{'Well diversified' if well_diversified else 'Concentrated'}</p>
         </div>
         """, unsafe_allow_html=True)
-    
-    # Portfolio Allocation Chart
+
+def render_allocation_chart(risk_tolerance, portfolio):
+    """Pie chart of the recommended allocation"""
     st.markdown("### 🥧 Recommended Portfolio Allocation")
     
-    portfolio = get_portfolio_allocation(user_profile['risk_tolerance'])
-    
-    # Create pie chart
-    fig = px.pie(
-        values=list(portfolio.values()),
-        names=list(portfolio.keys()),
-        title=f"Optimized Asset Allocation - {user_profile['risk_tolerance']} Risk",
-        color_discrete_sequence=['#e74c3c', '#3498db', '#f39c12']
+    fig = pie_chart(
+        portfolio,
+        title=f"Optimized Asset Allocation - {risk_tolerance} Risk",
+        colors={'Stocks': '#e74c3c', 'Bonds': '#3498db', 'Alternatives': '#f39c12', 'Cash': '#2ecc71'}
     )
-    fig.update_traces(textposition='inside', textinfo='percent+label')
     fig.update_layout(
         font=dict(size=14),
         title_font_size=18,
         showlegend=True
     )
     st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def render_performance(portfolio, investment_amount):
+    """Backtest chart and statistics; its period and rebalancing inputs rerun only this panel"""
+    get_session()
+    engine = get_engine()
+    st.markdown("### 📈 Portfolio Performance Backtest")
     
-    # Performance Chart
-    st.markdown("### 📈 Portfolio Performance Simulation")
-    
-    # Generate sample performance data
-    dates = pd.date_range(start=datetime.now() - timedelta(days=365), end=datetime.now(), freq='D')
-    base_return = expected_return[user_profile['risk_tolerance']] / 100
-    
-    # Simulate portfolio performance
-    np.random.seed(42)  # For consistent results
-    daily_returns = np.random.normal(base_return/365, 0.01, len(dates))
-    portfolio_values = [user_profile['investment_amount']]
-    
-    for daily_return in daily_returns[1:]:
-        portfolio_values.append(portfolio_values[-1] * (1 + daily_return))
-    
-    # Create benchmark (S&P 500 simulation)
-    benchmark_returns = np.random.normal(0.10/365, 0.012, len(dates))
-    benchmark_values = [user_profile['investment_amount']]
-    
-    for daily_return in benchmark_returns[1:]:
-        benchmark_values.append(benchmark_values[-1] * (1 + daily_return))
-    
-    performance_data = pd.DataFrame({
-        'Date': dates,
-        'Your Portfolio': portfolio_values,
-        'S&P 500 Benchmark': benchmark_values
-    })
-    
-    fig = px.line(
-        performance_data,
-        x='Date',
-        y=['Your Portfolio', 'S&P 500 Benchmark'],
-        title="Portfolio vs Benchmark Performance (Simulated)"
-    )
-    fig.update_layout(
+    col1, col2 = st.columns(2)
+    with col1:
+        years = st.select_slider("Backtest Period (years)", options=[1, 3, 5], value=1)
+    with col2:
+        policy = st.selectbox("Rebalancing", list(REBALANCE_PERIODS), index=1)
+    
+    performance = engine.performance(portfolio, investment_amount, years, policy)
+    rebalanced = 'never rebalanced' if policy == 'never' else f'rebalanced {policy}'
+    # WebGL traces, each capped at the chart's pixel budget
+    fig = line_chart(
+        performance['dates'],
+        {'Your Portfolio': performance['portfolio'], 'S&P 500 Benchmark': performance['benchmark']},
+        title=f"Portfolio vs Benchmark Performance ({'Simulated' if engine.simulated else 'Historical'}, {rebalanced})",
         yaxis_title="Portfolio Value ($)",
-        xaxis_title="Date",
-        font=dict(size=12),
-        title_font_size=16
+        xaxis_title="Date"
     )
+    fig.update_layout(font=dict(size=12), title_font_size=16)
     st.plotly_chart(fig, use_container_width=True)
     
-    # AI Recommendations
+    stats = performance['stats']
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Return", f"{stats['total_return']:.1%}")
+    col2.metric("Volatility", f"{stats['volatility']:.1%}")
+    col3.metric("Max Drawdown", f"{stats['max_drawdown']:.1%}")
+    col4.metric("Annual Turnover", f"{stats['turnover']:.1%}")
+
+@st.cache_resource
+def get_job_queue():
+    """Background AI jobs, shared by every session in this process"""
+    return JobQueue(max_workers=Settings().ai_job_workers)
+
+@st.cache_resource
+def get_mcp_client():
+    return MCPClient()
+
+@st.fragment(run_every=AI_POLL_INTERVAL)
+def render_ai_progress(job_id):
+    """Status of a queued or running analysis, refreshed every poll interval; one full run shows the result"""
+    job = get_job_queue().get(job_id)
+    if job is None or job.done:
+        st.rerun()
+    st.info(f"⏳ Analyzing your portfolio with AI... {job.elapsed:.0f}s. The rest of the page stays usable.")
+
+@st.fragment
+def render_ai_recommendations(user_profile):
+    """Submit the analysis as a background job; a timed poller runs only while it is queued or running"""
     st.markdown("### 🤖 AI-Powered Recommendations")
     
+    session = get_session()
+    queue = get_job_queue()
     if st.button("Get AI Analysis", type="primary"):
-        with st.spinner("Analyzing your portfolio with AI..."):
-            # Simulate AI analysis
-            import time
-            time.sleep(2)
-            
-            st.success("Analysis complete!")
-            
-            recommendations = [
-                {
-                    'title': 'Optimize Asset Allocation',
-                    'description': f'Based on your {user_profile["risk_tolerance"].lower()} risk tolerance, consider adjusting your allocation to maximize returns.',
-                    'confidence': 92
-                },
-                {
-                    'title': 'Diversify Internationally',
-                    'description': 'Add 15-20% international exposure to reduce portfolio correlation risk.',
-                    'confidence': 85
-                },
-                {
-                    'title': 'Tax-Loss Harvesting',
-                    'description': 'Implement tax-loss harvesting strategies to improve after-tax returns.',
-                    'confidence': 78
-                }
-            ]
-            
-            for i, rec in enumerate(recommendations, 1):
-                st.markdown(f"**{i}. {rec['title']}**")
-                st.markdown(f"   {rec['description']}")
-                st.markdown(f"   *Confidence: {rec['confidence']}%*")
-                st.markdown("---")
+        profile = dict(user_profile)
+        session.ai_job = queue.submit(
+            ai_recommendations, get_mcp_client(), get_engine().advisor, profile,
+            key=json.dumps(profile, sort_keys=True, default=str)
+        )
+    
+    if session.ai_job is None:
+        return
+    job = queue.get(session.ai_job)
+    if job is None:
+        st.info("This analysis has expired; run it again.")
+        return
+    if not job.done:
+        render_ai_progress(session.ai_job)
+        return
+    
+    result = job.result
+    if job.state == FAILED:
+        st.error(f"AI analysis failed: {job.error}")
+        return
+    if result['source'] == 'ai':
+        st.success(f"Analysis complete in {job.elapsed:.1f}s")
+    else:
+        st.info(f"AI service unavailable ({result['error']}); showing locally computed recommendations.")
+    
+    for i, rec in enumerate(result['recommendations'], 1):
+        st.markdown(f"**{i}. {rec['title']}**")
+        st.markdown(f"   {rec['description']}")
+        st.markdown(f"   *Confidence: {rec['confidence']}%*")
+        st.markdown("---")
+
+@st.fragment
+def render_sensitivity(user_profile):
+    """Heatmap of outcomes across amount x horizon x risk"""
+    import plotly.express as px  # only this page needs plotly.express
+    get_session()
+    
+    st.markdown("### 🔥 Sensitivity Analysis")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        metric = st.selectbox("Metric", list(SWEEP_METRICS), format_func=SWEEP_METRICS.get)
+    with col2:
+        view = st.selectbox("View", ["Horizon × Risk", "Amount × Risk"])
+    with col3:
+        contribution = st.number_input("Annual Contribution ($)", min_value=0, max_value=1000000,
+                                       value=0, step=1000, key="sweep_contribution")
+    
+    amount = user_profile['investment_amount']
+    result, amounts, horizons, risk_scores = get_engine().sensitivity(amount, contribution)
+    
+    if view == "Horizon × Risk":
+        values, rows, row_label = result.slice(metric, amount=amount), [f"{h}y" for h in horizons], "Horizon"
+    else:
+        horizon = st.select_slider("Horizon (years)", options=list(horizons), value=10)
+        values, rows, row_label = result.slice(metric, horizon=horizon), [f"${a:,.0f}" for a in amounts], "Amount"
+    
+    percent = metric in ('probability_of_loss', 'expected_return', 'volatility', 'stocks_weight')
+    fig = px.imshow(
+        values * (100 if percent else 1),
+        x=[f"{score:.0f}" for score in risk_scores],
+        y=rows,
+        labels={'x': "Risk Score", 'y': row_label, 'color': '%' if percent else '$'},
+        color_continuous_scale='RdYlGn_r' if metric in ('probability_of_loss', 'volatility') else 'RdYlGn',
+        text_auto='.0f',
+        aspect='auto',
+        title=SWEEP_METRICS[metric]
+    )
+    st.plotly_chart(fig, use_container_width=True)
 
 def render_portfolio_analysis(user_profile):
     """Render portfolio analysis page"""
@@ -375,22 +491,76 @@ def render_portfolio_analysis(user_profile):
             ]
         }
         
+        import pandas as pd  # page-specific; kept off the dashboard's cold start
         holdings_df = pd.DataFrame(holdings_data)
         st.dataframe(holdings_df, use_container_width=True)
     
     with col2:
         st.markdown("#### Performance Metrics")
         
+        # Sample holdings by asset class: VTSAX + VTIAX, VBTLX, VNQ, cash
+        holdings = get_engine().holdings_metrics({'Stocks': 60, 'Bonds': 25, 'Alternatives': 10, 'Cash': 5})
         metrics = {
-            'Total Return (1Y)': '+12.4%',
-            'Volatility': '14.2%',
-            'Sharpe Ratio': '0.87',
-            'Max Drawdown': '-8.3%',
-            'Beta': '0.92'
+            'Total Return (1Y)': f"{holdings['total_return']:+.1%}",
+            'Volatility': f"{holdings['volatility']:.1%}",
+            'Sharpe Ratio': f"{holdings['sharpe']:.2f}",
+            'Max Drawdown': f"{-holdings['max_drawdown']:.1%}",
+            'Beta': f"{holdings['beta']:.2f}"
         }
         
         for metric, value in metrics.items():
             st.metric(metric, value)
+    
+    render_sensitivity(user_profile)
+
+def render_risk_assessment():
+    """Risk across the stored client book, plus one client's metrics"""
+    st.markdown("## ⚠️ Risk Assessment")
+    
+    engine = get_engine()
+    dates = engine.book_dates()
+    if not dates:
+        st.info("No portfolio snapshots found; compact client data into snapshots to see book-wide risk.")
+        return
+    
+    snapshot_date = st.selectbox("Snapshot date", dates)
+    book = engine.book_risk(snapshot_date)
+    levels = book['risk_levels']
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Clients", f"{book['clients']:,}")
+    col2.metric("Low Risk", f"{levels['Low']:,}")
+    col3.metric("Medium Risk", f"{levels['Medium']:,}")
+    col4.metric("High Risk", f"{levels['High']:,}")
+    st.dataframe(book['percentiles'], use_container_width=True, hide_index=True)
+    
+    user_id = st.text_input("Client ID")
+    if user_id:
+        risk = engine.client_risk(snapshot_date, user_id.strip())
+        if risk is None:
+            st.warning(f"No portfolio for {user_id} in the {snapshot_date} snapshot.")
+        else:
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Risk Score", f"{risk['risk_score']:.1f}/10")
+            col2.metric("Volatility", f"{risk['volatility']:.1%}")
+            col3.metric("VaR 95% (daily)", f"{risk['var_95_daily']:.2%}")
+            col4.metric("Max Drawdown", f"{risk['max_drawdown']:.1%}")
+
+def render_memory_report():
+    """Process memory, the data shared by all sessions, and what each session adds"""
+    st.markdown("### 🧠 Memory")
+    get_session().measure(st.session_state.to_dict())
+    sessions = get_sessions()
+    report = sessions.report()
+    per_session = [row['record_bytes'] + row['state_bytes'] for row in report]
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Process RSS", f"{process_rss() / 2**20:,.0f} MB")
+    col2.metric("Shared Data", f"{get_engine().shared_bytes() / 2**20:,.1f} MB")
+    col3.metric("Active Sessions", len(report))
+    col4.metric("Avg. per Session", f"{sum(per_session) / max(len(per_session), 1) / 1024:,.1f} KB")
+    st.caption(f"Records of sessions idle for {sessions.idle_ttl / 60:.0f} minutes are dropped; "
+               "state size is measured when a session opens this page.")
+    st.dataframe(report, use_container_width=True, hide_index=True)
 
 def main():
     """Main application"""
@@ -398,6 +568,8 @@ def main():
     
     # Sidebar navigation
     user_profile = render_sidebar()
+    session = get_session()
+    session.update(user_profile)
     
     # Main content area
     if user_profile['page'] == "Dashboard":
@@ -405,14 +577,13 @@ def main():
     elif user_profile['page'] == "Portfolio Analysis":
         render_portfolio_analysis(user_profile)
     elif user_profile['page'] == "Risk Assessment":
-        st.markdown("## ⚠️ Risk Assessment")
-        st.info("Risk assessment features coming soon...")
+        render_risk_assessment()
     elif user_profile['page'] == "Market Insights":
         st.markdown("## 📈 Market Insights")
         st.info("Market insights features coming soon...")
     elif user_profile['page'] == "Settings":
         st.markdown("## ⚙️ Settings")
-        st.info("Settings page coming soon...")
+        render_memory_report()
 
 if __name__ == "__main__":
     main()
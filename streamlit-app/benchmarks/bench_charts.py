@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Chart Payload Benchmark
+Serialized figure size and build time of raw px.line charts against the
+downsampled WebGL line and percentile-band fan charts
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.charts import fan_chart, line_chart
+from components.estimators import TRADING_DAYS
+
+
+def measure(build, repeat: int):
+    """(serialized bytes, mean build + serialize ms)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        payload = build().to_json()
+    return len(payload), (time.perf_counter() - start) / repeat * 1000
+
+
+def performance_case(years: int, rng: np.random.Generator):
+    days = years * TRADING_DAYS
+    dates = np.busday_offset(np.datetime64('2024-12-31'), np.arange(-days, 1), roll='backward')
+    portfolio = 100000 * np.cumprod(1 + rng.normal(0.0003, 0.008, days + 1))
+    benchmark = 100000 * np.cumprod(1 + rng.normal(0.0004, 0.011, days + 1))
+
+    def raw():
+        frame = pd.DataFrame({'Date': dates, 'Your Portfolio': portfolio, 'S&P 500 Benchmark': benchmark})
+        return px.line(frame, x='Date', y=['Your Portfolio', 'S&P 500 Benchmark'], title="Performance")
+
+    def pipeline():
+        return line_chart(dates, {'Your Portfolio': portfolio, 'S&P 500 Benchmark': benchmark},
+                          title="Performance")
+
+    return f"performance {years}y daily x 2", raw, pipeline
+
+
+def fan_case(years: int, paths: int, rng: np.random.Generator):
+    months = years * 12
+    growth = np.exp(rng.normal(0.005, 0.04, (months, paths)))
+    wealth = np.vstack([np.full(paths, 100000.0), 100000 * np.cumprod(growth, axis=0)])
+    steps = np.arange(months + 1) / 12
+
+    def raw():
+        frame = pd.DataFrame(wealth, columns=[f"path {i}" for i in range(paths)])
+        frame['Year'] = steps
+        return px.line(frame, x='Year', y=[f"path {i}" for i in range(paths)], title="Projected Wealth")
+
+    def pipeline():
+        return fan_chart(steps, wealth, title="Projected Wealth")
+
+    return f"fan {years}y monthly x {paths} paths", raw, pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--paths', type=int, default=200, help="raw paths drawn in the fan-chart baseline")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    cases = [performance_case(years, rng) for years in (1, 5, 30)] + [fan_case(30, args.paths, rng)]
+
+    print(f"{'case':<34}{'raw KB':>10}{'raw ms':>10}{'new KB':>10}{'new ms':>10}{'size':>8}")
+    for name, raw, pipeline in cases:
+        raw_bytes, raw_ms = measure(raw, args.repeat)
+        new_bytes, new_ms = measure(pipeline, args.repeat)
+        print(f"{name:<34}{raw_bytes / 1024:>10.1f}{raw_ms:>10.1f}{new_bytes / 1024:>10.1f}{new_ms:>10.1f}"
+              f"{raw_bytes / new_bytes:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Engine Micro-Benchmarks
+Per-call latency of the shared compute core behind both Streamlit apps
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.backtester import Backtester
+from components.engine import AdvisorEngine
+from components.market_data import MarketDataProvider
+from components.portfolio_optimizer import PortfolioOptimizer
+from components.risk_analyzer import RiskAnalyzer
+
+PROFILE = {
+    'investment_amount': 250000,
+    'risk_tolerance': 'Moderate',
+    'time_horizon': '10+ years',
+    'investment_goals': ['Retirement', 'Education'],
+}
+HOLDINGS = {'Stocks': 60, 'Bonds': 25, 'Alternatives': 10, 'Cash': 5}
+
+
+def timed(fn, repeat: int):
+    """(first call ms, median ms of the following calls)"""
+    start = time.perf_counter()
+    fn()
+    first = (time.perf_counter() - start) * 1000
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return first, statistics.median(samples)
+
+
+def per_rerun_setup():
+    """What app.py used to construct on every script run before the shared engine"""
+    optimizer = PortfolioOptimizer()
+    RiskAnalyzer()
+    market_data = MarketDataProvider()
+    Backtester.from_market_data(market_data) if market_data.has_history() else Backtester()
+    return optimizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engine = AdvisorEngine()
+    print(f"{'engine construction':<32}{(time.perf_counter() - start) * 1000:>10.2f} ms (once per process)")
+
+    allocation = engine.allocation(PROFILE)
+    cases = [
+        ('per-rerun setup (old app.py)', per_rerun_setup),
+        ('allocation', lambda: engine.allocation(PROFILE)),
+        ('metrics', lambda: engine.metrics(PROFILE, allocation)),
+        ('performance 1y', lambda: engine.performance(allocation, 250000, 1)),
+        ('performance 5y', lambda: engine.performance(allocation, 250000, 5)),
+        ('holdings_metrics', lambda: engine.holdings_metrics(HOLDINGS)),
+        ('goal_plan', lambda: engine.goal_plan(PROFILE, allocation, 10000)),
+        ('sensitivity', lambda: engine.sensitivity(250000, 5000)),
+        ('recommendations', lambda: engine.recommendations(PROFILE)),
+        ('analyze_holdings', lambda: engine.analyze_holdings(HOLDINGS)),
+    ]
+    print(f"{'call':<32}{'first ms':>10}{'median ms':>12}")
+    for name, fn in cases:
+        first, median = timed(fn, args.repeat)
+        print(f"{name:<32}{first:>10.2f}{median:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
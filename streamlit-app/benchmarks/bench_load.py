@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Multi-Session Load Test
+Drives N simulated users through an entry point headlessly (AppTest) against
+an offline MCP/Bedrock stub, reporting rerun latency percentiles, CPU and RSS
+"""
+
+import argparse
+import heapq
+import io
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from streamlit.testing.v1 import AppTest
+
+import utils.sessions as sessions
+from advisor_core.aws_clients import register_client
+from utils.sessions import INVESTMENT_GOALS, RISK_TOLERANCES, TIME_HORIZONS, process_rss
+
+# Relative frequency of each user action; 'load' (first page load) is not drawn
+ACTIONS = {
+    'amount': 3,
+    'risk': 2,
+    'horizon': 2,
+    'goals': 2,
+    'period': 2,
+    'page': 1,
+    'ai': 1,
+}
+AMOUNTS = (25000, 50000, 100000, 250000, 500000, 1000000)
+PAGES = ("Dashboard", "Portfolio Analysis")
+STUB_ANSWER = (
+    "1. Rebalance quarterly | Bring the allocation back to target each quarter. | 80\n"
+    "2. Raise contributions | Add to the portfolio each year to fund the selected goals. | 75\n"
+    "3. Keep a cash buffer | Hold six months of expenses outside the portfolio. | 70"
+)
+
+
+class StubAWSClient:
+    """Stands in for bedrock-runtime, bedrock and sts: no network, fixed model latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke_model(self, modelId, body):
+        time.sleep(self.latency)
+        payload = {'results': [{'outputText': STUB_ANSWER}]}
+        return {'body': io.BytesIO(json.dumps(payload).encode('utf-8'))}
+
+    def get_caller_identity(self):
+        return {'Account': '000000000000', 'Arn': 'arn:aws:iam::000000000000:user/load-test'}
+
+    def list_foundation_models(self, **kwargs):
+        return {'modelSummaries': []}
+
+
+def install_stub(latency: float):
+    stub = StubAWSClient(latency)
+    for service_name in ('bedrock-runtime', 'bedrock', 'sts'):
+        register_client(service_name, stub)
+
+
+def widget(elements, label: str):
+    """First element with this label, or None when the current page does not show it"""
+    return next((element for element in elements if element.label == label), None)
+
+
+class SimulatedUser:
+    """One browser session: its own AppTest, page and random stream"""
+
+    current: Optional['SimulatedUser'] = None  # the user whose rerun is executing
+
+    def __init__(self, index: int, script: str, seed: int, timeout: float):
+        self.session_id = f"load-{index:04d}"
+        self.app = AppTest.from_file(script, default_timeout=timeout)
+        self.rng = random.Random(seed + index)
+        self.page = PAGES[0]
+
+    def prepare(self, action: str) -> str:
+        """Set the widget for an action; returns the action actually performed"""
+        at, rng = self.app, self.rng
+        if action == 'load':
+            return action
+        if action == 'period':
+            period = widget(at.select_slider, "Backtest Period (years)")
+            if period is None:
+                return self.prepare('page')
+            period.set_value(rng.choice([1, 3, 5]))
+        elif action == 'ai':
+            button = widget(at.button, "Get AI Analysis")
+            if button is None:
+                return self.prepare('page')
+            button.click()
+        elif action == 'page':
+            self.page = PAGES[1] if self.page == PAGES[0] else PAGES[0]
+            widget(at.sidebar.selectbox, "Choose a page:").set_value(self.page)
+        elif action == 'amount':
+            widget(at.sidebar.number_input, "Investment Amount ($)").set_value(rng.choice(AMOUNTS))
+        elif action == 'risk':
+            widget(at.sidebar.select_slider, "Risk Tolerance").set_value(rng.choice(RISK_TOLERANCES))
+        elif action == 'horizon':
+            widget(at.sidebar.selectbox, "Investment Time Horizon").set_value(rng.choice(TIME_HORIZONS))
+        elif action == 'goals':
+            widget(at.sidebar.multiselect, "Investment Goals").set_value(
+                rng.sample(INVESTMENT_GOALS, rng.randint(0, 3)))
+        return action
+
+    def rerun(self) -> bool:
+        """Run the script once for this session; False if it raised"""
+        SimulatedUser.current = self
+        try:
+            self.app.run()
+        finally:
+            SimulatedUser.current = None
+        return not self.app.exception
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {'count': 0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'count': len(values), 'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+            'max': float(max(values))}
+
+
+def run_level(users: int, script: str, args) -> Dict[str, object]:
+    """Simulate ``users`` sessions for ``args.duration`` seconds.
+
+    Reruns execute one at a time, as script threads of one server process
+    largely do under the GIL. Each user acts after an exponential think
+    time; an action that comes due while another rerun is executing waits,
+    and that wait counts toward its response time.
+    """
+    population = [SimulatedUser(index, script, args.seed, args.timeout) for index in range(users)]
+    kinds, weights = list(ACTIONS), list(ACTIONS.values())
+    # First page loads arrive spread over one think time
+    start = time.perf_counter()
+    due = [(start + args.think * index / users, index, 'load') for index in range(users)]
+    heapq.heapify(due)
+
+    responses: Dict[str, List[float]] = {}
+    service: List[float] = []
+    errors = 0
+    rss_before = process_rss()
+    cpu_before = os.times()
+    end = start + args.duration
+    while due and due[0][0] < end:
+        when, index, action = heapq.heappop(due)
+        delay = when - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        user = population[index]
+        action = user.prepare(action)
+        began = time.perf_counter()
+        if not user.rerun():
+            errors += 1
+            print(f"    {user.session_id} {action}: {user.app.exception[0].message}", file=sys.stderr)
+        finished = time.perf_counter()
+        service.append(finished - began)
+        responses.setdefault(action, []).append(finished - when)
+        next_action = user.rng.choices(kinds, weights)[0]
+        heapq.heappush(due, (finished + user.rng.expovariate(1.0 / args.think), index, next_action))
+    wall = time.perf_counter() - start
+    cpu_after = os.times()
+    rss_after = process_rss()
+
+    cpu = (cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)
+    interactions = [value for action, values in responses.items() if action != 'load' for value in values]
+    result = {
+        'users': users,
+        'reruns': len(service),
+        'errors': errors,
+        'wall_seconds': wall,
+        'reruns_per_second': len(service) / wall,
+        'cpu_cores': cpu / wall,
+        'cpu_ms_per_rerun': cpu / max(len(service), 1) * 1000,
+        'service_ms_mean': float(np.mean(service)) * 1000 if service else 0.0,
+        'rss_mb': rss_after / 2**20,
+        'rss_per_user_kb': (rss_after - rss_before) / max(users, 1) / 1024,
+        'interaction': percentiles(interactions),
+        'actions': {action: percentiles(values) for action, values in responses.items()},
+    }
+    # One process serves about think / service reruns in parallel before requests queue up
+    result['estimated_users'] = args.utilization * args.think / max(result['service_ms_mean'] / 1000, 1e-9)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--script', default='app.py')
+    parser.add_argument('--users', type=int, nargs='+', default=[5, 10, 20],
+                        help="simulated session counts, one load level each")
+    parser.add_argument('--duration', type=float, default=30.0, help="seconds per load level")
+    parser.add_argument('--think', type=float, default=5.0, help="mean seconds between one user's actions")
+    parser.add_argument('--ai-latency', type=float, default=2.0, help="seconds the stubbed model takes")
+    parser.add_argument('--utilization', type=float, default=0.7,
+                        help="target busy fraction for the estimated users per process")
+    parser.add_argument('--timeout', type=float, default=60.0, help="AppTest seconds per rerun")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--p95-budget-ms', type=float, default=None,
+                        help="fail if any level's interaction p95 exceeds this")
+    parser.add_argument('--max-rss-mb', type=float, default=None, help="fail if RSS exceeds this")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    install_stub(args.ai_latency)
+    # AppTest gives every session the same id; report each simulated user as its own session
+    sessions.current_session_id = lambda: SimulatedUser.current.session_id
+    script = os.path.join(APP_DIR, args.script)
+    # The first run in a process builds the shared engine and caches; keep it out of every level
+    if not SimulatedUser(0, script, args.seed, args.timeout).rerun():
+        sys.exit(f"{args.script} failed on its first run")
+
+    print(f"{'users':>6}{'reruns/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'load p95':>10}"
+          f"{'cpu':>6}{'cpu ms/run':>11}{'rss MB':>8}{'KB/user':>9}{'est users':>10}{'errors':>7}")
+    results, failed = [], []
+    for users in args.users:
+        result = run_level(users, script, args)
+        results.append(result)
+        interaction = result['interaction']
+        load = result['actions'].get('load', percentiles([]))
+        print(f"{users:>6}{result['reruns_per_second']:>10.1f}{interaction['p50'] * 1000:>9.0f}"
+              f"{interaction['p95'] * 1000:>9.0f}{interaction['p99'] * 1000:>9.0f}{load['p95'] * 1000:>10.0f}"
+              f"{result['cpu_cores']:>6.2f}{result['cpu_ms_per_rerun']:>11.1f}{result['rss_mb']:>8.0f}"
+              f"{result['rss_per_user_kb']:>9.0f}{result['estimated_users']:>10.0f}{result['errors']:>7}")
+        if result['errors']:
+            failed.append(f"{users} users: {result['errors']} script errors")
+        if args.p95_budget_ms is not None and interaction['p95'] * 1000 > args.p95_budget_ms:
+            failed.append(f"{users} users: p95 {interaction['p95'] * 1000:.0f} ms > {args.p95_budget_ms:.0f} ms")
+        if args.max_rss_mb is not None and result['rss_mb'] > args.max_rss_mb:
+            failed.append(f"{users} users: RSS {result['rss_mb']:.0f} MB > {args.max_rss_mb:.0f} MB")
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({'script': args.script, 'think': args.think, 'ai_latency': args.ai_latency,
+                       'levels': results}, handle, indent=2)
+    for failure in failed:
+        print(f"FAILED {failure}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
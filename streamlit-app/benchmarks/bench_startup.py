@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Import cost the Streamlit entry points add on top of Streamlit itself
+(python -X importtime), optional first page load time, and a budget check
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded by the Streamlit server before it runs a script, so not charged to the app
+PRELOADED = "import streamlit, streamlit.delta_generator, streamlit.runtime.scriptrunner"
+
+FIRST_RUN = """
+import time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+AppTest.from_file({path!r}, default_timeout=120).run()
+print(time.perf_counter() - start)
+"""
+
+
+def import_times(statement: str) -> Dict[str, Tuple[int, int, int]]:
+    """module -> (self us, cumulative us, nesting depth) from one fresh interpreter"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=APP_DIR,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        times[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return times
+
+
+def entry_import_cost(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """(ms of imports the entry point adds to a preloaded server, heaviest added top-level imports)"""
+    baseline = import_times(PRELOADED)
+    loaded = import_times(f"{PRELOADED}; import {module}")
+    added = {name: times for name, times in loaded.items() if name not in baseline}
+    total = sum(self_us for self_us, _, _ in added.values()) / 1000
+    # Direct imports of the entry module are nested one level below it
+    heaviest = sorted(((name, cumulative / 1000) for name, (_, cumulative, depth) in added.items()
+                       if depth == 1), key=lambda item: -item[1])
+    return total, heaviest
+
+
+def first_run_seconds(script: str) -> float:
+    result = subprocess.run([sys.executable, '-c', FIRST_RUN.format(path=os.path.join(APP_DIR, script))],
+                            cwd=APP_DIR, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--modules', nargs='+', default=['app_simple', 'app'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=250.0,
+                        help="fail if an entry point's median added import time exceeds this")
+    parser.add_argument('--first-run', action='store_true',
+                        help="also time the first full script run (cold process) with AppTest")
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    failed = []
+    for module in args.modules:
+        runs = [entry_import_cost(module) for _ in range(args.repeat)]
+        median = statistics.median(total for total, _ in runs)
+        status = 'ok' if median <= args.budget_ms else 'OVER BUDGET'
+        print(f"{module}: {median:.0f} ms added imports (budget {args.budget_ms:.0f} ms) {status}")
+        for name, ms in runs[-1][1][:args.top]:
+            print(f"    {name:<40}{ms:>8.1f} ms")
+        if args.first_run:
+            seconds = statistics.median(first_run_seconds(f"{module}.py") for _ in range(args.repeat))
+            print(f"    first page load (cold process): {seconds * 1000:.0f} ms")
+        if median > args.budget_ms:
+            failed.append(module)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+Local Advisor
+Deterministic rule-based recommendations computed from the frontier
+allocation and risk engine; used whenever the AI service is unavailable
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from advisor_core.allocation import VEHICLES, Z_95, format_allocation
+from components.portfolio_optimizer import (
+    HORIZON_BUCKETS, HORIZON_UPPER_BOUNDS, RISK_TOLERANCE_SCORES, PortfolioOptimizer, score_to_volatility
+)
+from components.risk_analyzer import RiskAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# Rebalancing band in percentage points, matching the backtester's quarterly default
+REBALANCE_BAND = 5.0
+
+GOAL_GUIDANCE = {
+    'Retirement': ('Use Tax-Advantaged Accounts',
+                   'Fill 401(k)/IRA allowances first and hold the bond sleeve there, where its income is sheltered.'),
+    'Education': ('Fund Education Through a 529 Plan',
+                  'A 529 plan grows tax-free for qualified costs; glide its equity share down as enrolment nears.'),
+    'Home Purchase': ('Ring-Fence the Down Payment',
+                      'Money needed within about five years belongs in bonds and cash, not the equity sleeve.'),
+    'Income Generation': ('Plan a Sustainable Withdrawal Rate',
+                          'Draw income from rebalancing and bond coupons, keeping withdrawals near 4% a year.'),
+    'Wealth Building': ('Automate Contributions',
+                        'Regular contributions bought at the target weights double as free rebalancing.'),
+}
+
+
+# "1. Title | description | 85"
+RECOMMENDATION_LINE = re.compile(
+    r"^\s*\d+[.)]\s*\**(?P<title>[^|*]+?)\**\s*\|\s*(?P<description>[^|]+?)\s*(?:\|\s*(?P<confidence>\d{1,3})\s*%?\s*)?$"
+)
+
+
+class LocalAdvisor:
+    """Recommendations from real portfolio computations, no model call.
+
+    Every rule reads numbers the app already computes (frontier allocation,
+    frontier gap, volatility, drawdown, diversification), so the output is
+    specific to the profile, identical for identical inputs, and takes a few
+    milliseconds.
+    """
+
+    def __init__(self, optimizer: PortfolioOptimizer, risk_analyzer: RiskAnalyzer):
+        self.optimizer = optimizer
+        self.risk_analyzer = risk_analyzer
+
+    def recommend(self, user_profile: Dict[str, Any], holdings: Optional[Dict[str, float]] = None,
+                  limit: int = 3) -> Dict[str, Any]:
+        """Target allocation, its risk figures and the ``limit`` highest-confidence recommendations"""
+        horizon = user_profile.get('time_horizon', '5-10 years')
+        amount = float(user_profile.get('investment_amount', 100000))
+        target = self.optimizer.optimize(user_profile)
+        portfolio = holdings or target
+
+        target_analysis = self.optimizer.analyze(target, horizon)
+        analysis = self.optimizer.analyze(holdings, horizon) if holdings else target_analysis
+        risk = self.risk_analyzer.assess(portfolio)
+        expected, volatility = analysis['expected_return'] / 100, analysis['volatility'] / 100
+        one_year_loss = max(Z_95 * volatility - expected, 0.0)
+        capped = self._horizon_cap(horizon, target)
+
+        candidates = [self._allocation(user_profile, target, target_analysis), capped]
+        if holdings:
+            candidates.append(self._drift(holdings, target))
+            candidates.append(self._efficiency(analysis))
+        candidates.append(self._risk_fit(user_profile, volatility, capped is not None))
+        candidates.append(self._downside(one_year_loss, amount, risk['max_drawdown']))
+        candidates.append(self._diversification(risk))
+        candidates.extend(self._goals(user_profile.get('investment_goals', [])))
+        candidates.append({
+            'title': 'Rebalance Quarterly',
+            'description': f'Review quarterly and trade back to target when any asset class drifts more than '
+                           f'{REBALANCE_BAND:g} points; this keeps risk at plan with modest turnover.',
+            'confidence': 75,
+        })
+
+        recommendations = sorted((c for c in candidates if c), key=lambda c: -c['confidence'])[:limit]
+        return {
+            'source': 'local',
+            'target_allocation': target,
+            'expected_return': analysis['expected_return'],
+            'volatility': analysis['volatility'],
+            'one_year_var_95': round(one_year_loss * 100, 2),
+            'max_drawdown': round(risk['max_drawdown'] * 100, 2),
+            'recommendations': recommendations,
+        }
+
+    def _allocation(self, user_profile: Dict[str, Any], target: Dict[str, float],
+                    analysis: Dict[str, Any]) -> Dict[str, Any]:
+        vehicles = "; ".join(f"{label.lower()} via {VEHICLES[label]}" for label in target if label in VEHICLES)
+        return {
+            'title': f"Adopt the {user_profile.get('risk_tolerance', 'Moderate')} Frontier Allocation",
+            'description': f"{format_allocation(target)} — expected return {analysis['expected_return']:.1f}% "
+                           f"at {analysis['volatility']:.1f}% volatility. Implement with {vehicles}.",
+            'confidence': 90,
+        }
+
+    def _drift(self, holdings: Dict[str, float], target: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        total = sum(float(v) for v in holdings.values()) or 1.0
+        current = {label: float(holdings.get(label, 0)) * 100.0 / total for label in set(holdings) | set(target)}
+        trades = {label: target.get(label, 0.0) - pct for label, pct in current.items()}
+        drift = max(abs(change) for change in trades.values())
+        if drift < REBALANCE_BAND:
+            return None
+        moves = ", ".join(f"{'add' if change > 0 else 'trim'} {label} {abs(change):.0f} pts"
+                          for label, change in sorted(trades.items(), key=lambda item: -abs(item[1]))
+                          if abs(change) >= 1.0)
+        return {
+            'title': 'Rebalance to Target',
+            'description': f"Holdings are up to {drift:.0f} points away from target: {moves}.",
+            'confidence': int(min(95, 70 + drift)),
+        }
+
+    def _efficiency(self, analysis: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        gap = analysis['return_gap']
+        if gap < 0.25:
+            return None
+        return {
+            'title': 'Move Onto the Efficient Frontier',
+            'description': f"At the same {analysis['volatility']:.1f}% volatility, "
+                           f"{format_allocation(analysis['suggested_allocation'])} is expected to earn "
+                           f"{gap:.2f} points more per year.",
+            'confidence': int(min(92, 70 + gap * 20)),
+        }
+
+    def _risk_fit(self, user_profile: Dict[str, Any], volatility: float,
+                  capped: bool) -> Optional[Dict[str, Any]]:
+        score = user_profile.get('risk_score')
+        if score is None:
+            score = RISK_TOLERANCE_SCORES.get(user_profile.get('risk_tolerance', 'Moderate'), 5.5)
+        target = score_to_volatility(score)
+        gap = volatility - target
+        if abs(gap) < 0.02 or (gap < 0 and capped):
+            return None  # within tolerance, or held down by the horizon cap (explained separately)
+        direction = 'above' if gap > 0 else 'below'
+        return {
+            'title': 'Reduce Portfolio Risk' if gap > 0 else 'Consider Taking More Risk',
+            'description': f"Volatility of {volatility:.1%} is {direction} the {target:.1%} implied by a "
+                           f"risk score of {score:g}/10.",
+            'confidence': int(min(90, 65 + abs(gap) * 200)),
+        }
+
+    def _horizon_cap(self, horizon: str, target: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        bucket = HORIZON_BUCKETS.index(horizon) if horizon in HORIZON_BUCKETS else len(HORIZON_BUCKETS) - 1
+        cap = float(HORIZON_UPPER_BOUNDS[bucket][0]) * 100
+        if target.get('Stocks', 0.0) < cap - 0.5:
+            return None
+        return {
+            'title': 'Equity Share Limited by Horizon',
+            'description': f"A {horizon} horizon caps stocks at {cap:.0f}%; a longer horizon would allow more "
+                           f"growth assets if your timeline can flex.",
+            'confidence': 85,
+        }
+
+    def _downside(self, one_year_loss: float, amount: float, max_drawdown: float) -> Dict[str, Any]:
+        return {
+            'title': 'Plan for a Bad Year',
+            'description': f"In a one-in-twenty year the portfolio could lose about {one_year_loss:.1%} "
+                           f"(${one_year_loss * amount:,.0f}); the worst historical drawdown of this mix was "
+                           f"{max_drawdown:.1%}. Keep spending needs for the next year outside the portfolio.",
+            'confidence': 80,
+        }
+
+    def _diversification(self, risk: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        if risk['diversification'] >= 0.5:
+            return None
+        return {
+            'title': 'Diversify Across Asset Classes',
+            'description': f"The portfolio behaves like {risk['effective_assets']:.1f} equal holdings; adding "
+                           f"bonds or alternatives would spread risk more evenly.",
+            'confidence': int(min(88, 60 + (0.5 - risk['diversification']) * 100)),
+        }
+
+    def _goals(self, goals: List[str]) -> List[Dict[str, Any]]:
+        return [
+            {'title': GOAL_GUIDANCE[goal][0], 'description': GOAL_GUIDANCE[goal][1], 'confidence': 72}
+            for goal in goals if goal in GOAL_GUIDANCE
+        ]
+
+
+def recommendation_prompt(user_profile: Dict[str, Any], local: Dict[str, Any]) -> str:
+    """Model prompt carrying the locally computed allocation and risk figures"""
+    figures = {key: local[key] for key in ('target_allocation', 'expected_return', 'volatility',
+                                           'one_year_var_95', 'max_drawdown')}
+    return (
+        "You are an expert investment advisor. Give 3 specific recommendations for this client.\n"
+        f"Profile: ${user_profile.get('investment_amount', 0):,} to invest, "
+        f"{user_profile.get('risk_tolerance', 'Moderate')} risk tolerance, "
+        f"{user_profile.get('time_horizon', '5-10 years')} horizon, "
+        f"goals: {', '.join(user_profile.get('investment_goals', [])) or 'not specified'}.\n"
+        f"Computed figures (quote, do not change): {json.dumps(figures, sort_keys=True)}\n"
+        "Answer with exactly 3 lines formatted as: <n>. <title> | <one-sentence description> | <confidence 0-100>"
+    )
+
+
+def parse_recommendations(text: str) -> List[Dict[str, Any]]:
+    """Recommendation dicts from the model's numbered lines (unparseable lines are skipped)"""
+    recommendations = []
+    for line in text.splitlines():
+        match = RECOMMENDATION_LINE.match(line)
+        if match:
+            confidence = int(match.group('confidence') or 70)
+            recommendations.append({
+                'title': match.group('title').strip(),
+                'description': match.group('description').strip(),
+                'confidence': min(max(confidence, 0), 100),
+            })
+    return recommendations
+
+
+def ai_recommendations(client, advisor: LocalAdvisor, user_profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Model recommendations around the local figures, or the local ones if the model fails.
+
+    Meant to run as a background job: takes a plain profile dict and never
+    touches Streamlit state. AWS service, credential and timeout errors fall
+    back to the local result and count against the client's circuit breaker,
+    which skips the model call altogether while it is open; anything else is
+    a bug and fails the job.
+    """
+    from botocore.exceptions import BotoCoreError, ClientError  # in the job thread, not at app startup
+
+    local = advisor.recommend(user_profile)
+    breaker = client.breaker
+    if not breaker.allow():
+        error = f"AI service paused after {breaker.failures} consecutive failures"
+    else:
+        try:
+            text = client.call_bedrock(recommendation_prompt(user_profile, local))
+        except (BotoCoreError, ClientError, TimeoutError) as e:
+            breaker.record_failure()
+            error = str(e)
+        else:
+            breaker.record_success()
+            recommendations = parse_recommendations(text)
+            if recommendations:
+                return {**local, 'source': 'ai', 'recommendations': recommendations}
+            error = 'the AI response could not be parsed'
+    logger.warning(f"Using local recommendations: {error}")
+    return {**local, 'error': error}
@@ -0,0 +1,182 @@
+"""
+Backtester
+Vectorized historical backtests of allocations under calendar rebalancing
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from components.risk_analyzer import (
+    ASSET_CLASSES, CAPITAL_MARKET_ASSUMPTIONS, TRADING_DAYS, assumption_returns, normalize_weights
+)
+
+REBALANCE_PERIODS = {
+    'monthly': 21,
+    'quarterly': 63,
+    'semiannual': 126,
+    'annual': 252,
+    'never': 0,
+}
+
+
+class BacktestResult:
+    """Equity curves and summary statistics for (policies x allocations) combinations"""
+
+    def __init__(self, policies: Sequence[str], equity: np.ndarray, turnover: np.ndarray,
+                 costs: np.ndarray):
+        self.policies = list(policies)
+        self.equity = equity          # (policies, days + 1, allocations), starts at 1.0
+        self.turnover = turnover      # (policies, allocations), annualized one-way
+        self.costs = costs            # (policies, allocations), total cost drag
+
+    @property
+    def drawdown(self) -> np.ndarray:
+        peak = np.maximum.accumulate(self.equity, axis=1)
+        return self.equity / peak - 1.0
+
+    def summary(self) -> Dict[str, np.ndarray]:
+        """Per-combination statistics, each (policies, allocations)"""
+        days = self.equity.shape[1] - 1
+        years = max(days / TRADING_DAYS, 1e-9)
+        daily = self.equity[:, 1:, :] / self.equity[:, :-1, :] - 1.0
+        volatility = daily.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS)
+        cagr = self.equity[:, -1, :] ** (1.0 / years) - 1.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = np.where(volatility > 0, cagr / volatility, 0.0)
+        return {
+            'total_return': self.equity[:, -1, :] - 1.0,
+            'cagr': cagr,
+            'volatility': volatility,
+            'sharpe': sharpe,
+            'max_drawdown': -self.drawdown.min(axis=1),
+            'turnover': self.turnover,
+            'costs': self.costs,
+        }
+
+
+def backtest(asset_returns: np.ndarray, allocations: np.ndarray,
+             policies: Sequence[str] = ('quarterly',), cost_bps: float = 0.0) -> BacktestResult:
+    """Backtest every allocation under every rebalancing policy.
+
+    Between rebalances each holding grows with its asset, so the value of
+    a period is the target weights dotted with the assets' growth since the
+    period started. That turns the whole backtest into a cumulative product,
+    one gather and one matrix product per policy, with no per-day loop.
+
+    asset_returns: (days, assets) simple daily returns
+    allocations: (allocations, assets) target weights (rows are normalized)
+    """
+    returns = np.asarray(asset_returns, dtype=np.float64)
+    weights = normalize_weights(allocations)
+    days, _ = returns.shape
+    count = weights.shape[0]
+
+    # Asset growth index with a leading 1.0 row for the start date
+    growth = np.vstack([np.ones(returns.shape[1]), np.cumprod(1.0 + returns, axis=0)])
+    steps = np.arange(days + 1)
+    years = max(days / TRADING_DAYS, 1e-9)
+
+    equity = np.empty((len(policies), days + 1, count))
+    turnover = np.zeros((len(policies), count))
+    costs = np.zeros((len(policies), count))
+
+    for p, policy in enumerate(policies):
+        period = REBALANCE_PERIODS[policy] if isinstance(policy, str) else int(policy)
+        period = period if period > 0 else days + 1
+
+        # Growth since the start of each day's rebalancing period
+        anchor = (steps - 1).clip(min=0) // period * period
+        relative = growth / growth[anchor]
+        period_value = relative @ weights.T                         # (days + 1, allocations)
+
+        # Rebalance dates: last day of each period before the end
+        ends = np.arange(period, days + 1, period)
+        ends = ends[ends < days]
+        drifted = weights[None, :, :] * relative[ends][:, None, :] / period_value[ends][:, :, None]
+        trades = np.abs(drifted - weights[None, :, :]).sum(axis=2)   # (rebalances, allocations)
+        friction = 1.0 - cost_bps / 1e4 * trades
+
+        # Chain period returns: value entering each period is the product of
+        # previous period-end values, net of trading costs
+        chained = np.ones((len(ends) + 1, count))
+        if len(ends):
+            chained[1:] = np.cumprod(period_value[ends] * friction, axis=0)
+        period_index = np.searchsorted(ends, steps, side='left')
+        equity[p] = chained[period_index] * period_value
+
+        turnover[p] = trades.sum(axis=0) / 2.0 / years
+        costs[p] = 1.0 - friction.prod(axis=0) if len(ends) else 0.0
+
+    return BacktestResult(policies, equity, turnover, costs)
+
+
+def benchmark_curve(benchmark_returns: np.ndarray, initial_value: float = 1.0) -> np.ndarray:
+    """Buy-and-hold value path for a single return series"""
+    return initial_value * np.concatenate([[1.0], np.cumprod(1.0 + np.asarray(benchmark_returns))])
+
+
+class Backtester:
+    """Historical backtests on the asset-class return matrix.
+
+    Uses stored price history when available (see components.market_data);
+    otherwise returns are drawn from the capital market assumptions and
+    ``simulated`` is set so the UI can label the chart accordingly.
+    """
+
+    def __init__(self, asset_returns: Optional[np.ndarray] = None,
+                 benchmark_returns: Optional[np.ndarray] = None,
+                 dates: Optional[np.ndarray] = None,
+                 assets: Sequence[str] = ASSET_CLASSES):
+        self.assets = list(assets)
+        self.simulated = asset_returns is None
+        self.asset_returns = assumption_returns() if asset_returns is None else np.asarray(asset_returns, dtype=np.float64)
+        if benchmark_returns is None:
+            benchmark_returns = self.asset_returns @ CAPITAL_MARKET_ASSUMPTIONS['benchmark_weights'][:len(self.assets)]
+        self.benchmark_returns = np.asarray(benchmark_returns, dtype=np.float64)
+        if dates is None:
+            end = np.busday_offset(np.datetime64('today', 'D'), 0, roll='backward')
+            dates = np.busday_offset(end, np.arange(-len(self.asset_returns) + 1, 1), roll='backward')
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+
+    @classmethod
+    def from_market_data(cls, provider, start: Optional[str] = None, end: Optional[str] = None,
+                         **kwargs) -> 'Backtester':
+        dates, asset_returns, benchmark_returns = provider.asset_class_returns(start, end)
+        return cls(asset_returns, benchmark_returns, dates, **kwargs)
+
+    def weights_from_allocations(self, allocations: Sequence[Dict[str, float]]) -> np.ndarray:
+        """Build a weight matrix from ``{'Stocks': 60, ...}`` style dicts"""
+        rows = []
+        for allocation in allocations:
+            lowered = {str(k).lower(): v for k, v in allocation.items()}
+            rows.append([float(lowered.get(asset, 0)) for asset in self.assets])
+        return normalize_weights(np.array(rows))
+
+    def window(self, days: Optional[int] = None):
+        """(dates, asset returns, benchmark returns) for the trailing ``days``"""
+        start = 0 if days is None else max(len(self.dates) - days, 0)
+        return self.dates[start:], self.asset_returns[start:], self.benchmark_returns[start:]
+
+    def run(self, weights: np.ndarray, policies: Sequence[str] = ('quarterly',),
+            cost_bps: float = 0.0, days: Optional[int] = None) -> BacktestResult:
+        """Backtest a (portfolios x assets) weight matrix under each policy"""
+        _, asset_returns, _ = self.window(days)
+        return backtest(asset_returns, weights, policies, cost_bps)
+
+    def performance(self, allocation: Dict[str, float], initial_value: float = 1.0,
+                    policy: str = 'quarterly', cost_bps: float = 5.0,
+                    days: Optional[int] = TRADING_DAYS) -> Dict[str, object]:
+        """Value paths and statistics of one allocation against the benchmark"""
+        dates, asset_returns, benchmark_returns = self.window(days)
+        result = backtest(asset_returns, self.weights_from_allocations([allocation]), (policy,), cost_bps)
+        # Curves start one bar before the first return
+        start = np.busday_offset(dates[0], -1, roll='backward') if len(dates) else np.datetime64('today', 'D')
+        stats = {name: float(values[0, 0]) for name, values in result.summary().items()}
+        return {
+            'dates': np.concatenate([[start], dates]),
+            'portfolio': initial_value * result.equity[0, :, 0],
+            'benchmark': benchmark_curve(benchmark_returns, initial_value),
+            'drawdown': result.drawdown[0, :, 0],
+            'stats': stats,
+        }
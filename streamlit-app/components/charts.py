@@ -0,0 +1,129 @@
+"""
+Charts
+Plotly figure builders that keep browser payloads bounded: WebGL traces,
+LTTB downsampling to a pixel budget, and percentile bands for simulations
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Typical rendered chart width in CSS pixels; more than one point per pixel is invisible
+DEFAULT_WIDTH_PX = 1000
+
+FAN_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def point_budget(width_px: int = DEFAULT_WIDTH_PX, points_per_px: float = 1.0) -> int:
+    """Largest point count per series worth sending for a chart ``width_px`` wide"""
+    return max(int(width_px * points_per_px), 3)
+
+
+def _numeric(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[D]').astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the Largest-Triangle-Three-Buckets downsample of (x, y) to ``threshold`` points.
+
+    Keeps the first and last points and, from each of ``threshold - 2``
+    equal buckets in between, the point forming the largest triangle with
+    the previously kept point and the next bucket's average. Peaks and
+    drawdowns survive, unlike plain striding.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = _numeric(x)
+
+    # Bucket i spans edges[i]:edges[i + 1]; the last point is its own bucket
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(np.append(edges, n))
+    mean_x = np.add.reduceat(x, edges) / counts
+    mean_y = np.add.reduceat(y, edges) / counts
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((x[a] - mean_x[i + 1]) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (mean_y[i + 1] - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def percentile_bands(paths: np.ndarray, percentiles: Sequence[float] = FAN_PERCENTILES) -> np.ndarray:
+    """(len(percentiles), steps) summary of a (steps, paths) simulation"""
+    return np.percentile(paths, percentiles, axis=1)
+
+
+def _x_values(x: np.ndarray):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[D]').astype(str)
+    return x
+
+
+def pie_chart(allocation: Dict[str, float], title: str, colors: Optional[Dict[str, str]] = None,
+              palette: Optional[Sequence[str]] = None) -> go.Figure:
+    """Allocation pie with percent and label drawn inside each slice"""
+    labels = list(allocation)
+    marker = {}
+    if colors:
+        marker['colors'] = [colors.get(label) for label in labels]
+    elif palette:
+        marker['colors'] = [palette[i % len(palette)] for i in range(len(labels))]
+    fig = go.Figure(go.Pie(labels=labels, values=list(allocation.values()), marker=marker,
+                           textposition='inside', textinfo='percent+label'))
+    fig.update_layout(title=title)
+    return fig
+
+
+def line_chart(x: np.ndarray, series: Dict[str, np.ndarray], title: str, yaxis_title: str = "",
+               xaxis_title: str = "", max_points: Optional[int] = None, decimals: int = 2) -> go.Figure:
+    """WebGL line chart with each series downsampled to ``max_points`` (default: the pixel budget)"""
+    max_points = max_points or point_budget()
+    fig = go.Figure()
+    for name, values in series.items():
+        keep = lttb(x, values, max_points)
+        fig.add_trace(go.Scattergl(
+            x=_x_values(np.asarray(x)[keep]),
+            y=np.round(np.asarray(values, dtype=np.float64)[keep], decimals),
+            mode='lines',
+            name=name
+        ))
+    fig.update_layout(title=title, yaxis_title=yaxis_title, xaxis_title=xaxis_title,
+                      legend_title_text="", hovermode='x unified')
+    return fig
+
+
+def fan_chart(x: np.ndarray, paths: np.ndarray, title: str, yaxis_title: str = "", xaxis_title: str = "",
+              color: str = '52, 152, 219', max_points: Optional[int] = None, decimals: int = 0) -> go.Figure:
+    """Median line with 25-75 and 5-95 percentile bands of a (steps, paths) simulation.
+
+    Sends five lines however many paths were simulated; long horizons are
+    downsampled on the median so the bands stay aligned.
+    """
+    bands = percentile_bands(paths)
+    keep = lttb(x, bands[2], max_points or point_budget())
+    xs = _x_values(np.asarray(x)[keep])
+    bands = np.round(bands[:, keep], decimals)
+
+    fig = go.Figure()
+    for (low, high), label, alpha in (((0, 4), "5th-95th percentile", 0.15), ((1, 3), "25th-75th percentile", 0.3)):
+        fig.add_trace(go.Scattergl(x=xs, y=bands[low], mode='lines', line=dict(width=0),
+                                   showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scattergl(x=xs, y=bands[high], mode='lines', line=dict(width=0), fill='tonexty',
+                                   fillcolor=f'rgba({color}, {alpha})', name=label))
+    fig.add_trace(go.Scattergl(x=xs, y=bands[2], mode='lines', line=dict(color=f'rgb({color})'), name="Median"))
+    fig.update_layout(title=title, yaxis_title=yaxis_title, xaxis_title=xaxis_title, hovermode='x unified')
+    return fig
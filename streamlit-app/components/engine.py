@@ -0,0 +1,246 @@
+"""
+Advisor Engine
+UI-agnostic compute core shared by app.py and app_simple.py: profiles,
+allocation, metrics, backtests, goal plans, sweeps and recommendations
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from components.advisor import LocalAdvisor
+from components.backtester import Backtester
+from components.goal_planner import Goal, GoalPlanner, shocks_nbytes
+from components.market_data import MarketDataProvider
+from components.portfolio_optimizer import RISK_TOLERANCE_SCORES, PortfolioOptimizer
+from components.risk_analyzer import TRADING_DAYS, RiskAnalyzer, risk_score
+from components.sensitivity import SensitivitySweep, SweepResult
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DEFAULTS = {
+    'investment_amount': 100000,
+    'risk_tolerance': 'Moderate',
+    'time_horizon': '5-10 years',
+    'investment_goals': [],
+}
+
+# Sensitivity grid: amount multiples of the profile amount, horizons in years, 1-10 risk scores
+SWEEP_AMOUNT_FACTORS = (0.25, 0.5, 1, 2, 4)
+SWEEP_HORIZONS = (1, 2, 3, 5, 7, 10, 15, 20, 30)
+SWEEP_RISK_SCORES = tuple(float(score) for score in range(1, 11))
+
+# Client-book summary: (metric, label) shown as percentiles, and risk-score bands
+BOOK_METRICS = (
+    ('volatility', 'Volatility (annual)'),
+    ('expected_return', 'Expected Return (annual)'),
+    ('var_95_daily', 'VaR 95% (daily)'),
+    ('cvar_95_daily', 'CVaR 95% (daily)'),
+    ('max_drawdown', 'Max Drawdown'),
+)
+BOOK_PERCENTILES = (10, 50, 90)
+RISK_LEVELS = (('Low', 1.0, 4.0), ('Medium', 4.0, 7.0), ('High', 7.0, 10.01))
+
+
+def normalize_profile(profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sidebar profile with defaults filled in and a numeric ``risk_score``"""
+    normalized = {**PROFILE_DEFAULTS, **(profile or {})}
+    if normalized.get('risk_score') is None:
+        normalized['risk_score'] = RISK_TOLERANCE_SCORES.get(normalized['risk_tolerance'], 5.5)
+    normalized['investment_goals'] = list(normalized['investment_goals'])
+    return normalized
+
+
+def goal_table(plan: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Display rows for a goal plan (amounts in today's dollars)"""
+    return [{
+        'Goal': row['goal'],
+        'Amount (today $)': f"${row['amount']:,.0f}" + ('/yr' if '-' in row['years'] else ''),
+        'Years': row['years'],
+        'Success Probability': f"{row['success_probability']:.0%}",
+        'Required Contribution ($/yr)': (
+            f"${row['required_contribution']:,.0f}" if row['required_contribution'] is not None else 'Not reachable'
+        )
+    } for row in plan]
+
+
+class AdvisorEngine:
+    """Every number either app displays, from one set of shared engines.
+
+    Built once per process: the frontier table, return history, asset
+    moments and simulated paths are loaded or computed in the constructor
+    or on first use and reused by every session. Those arrays are marked
+    read-only, so a stray in-place write fails loudly instead of leaking
+    into other sessions. Methods take and return plain dicts and arrays,
+    never touch Streamlit, and are safe to call from several script threads.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None, market_data: Optional[MarketDataProvider] = None,
+                 planner_cache_size: int = 64):
+        self.settings = settings or Settings()
+        market_data = market_data or MarketDataProvider(settings=self.settings)
+        history = market_data.has_history()
+        self.optimizer = PortfolioOptimizer(settings=self.settings)
+        self.risk_analyzer = RiskAnalyzer.from_market_data(market_data) if history else RiskAnalyzer()
+        self.backtester = Backtester.from_market_data(market_data) if history else Backtester()
+        self.advisor = LocalAdvisor(self.optimizer, self.risk_analyzer)
+        self.sweep = SensitivitySweep(self.optimizer)
+        self.planner_cache_size = planner_cache_size
+        self._planners: 'OrderedDict[Tuple[float, float], GoalPlanner]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._storage = None
+        for array in self.shared_arrays().values():
+            array.setflags(write=False)
+
+    def shared_arrays(self) -> Dict[str, np.ndarray]:
+        """Process-wide datasets by ``component.attribute`` (simulation shocks are counted by shared_bytes)"""
+        owners = {
+            'frontier': self.optimizer.table,
+            'risk_analyzer': self.risk_analyzer,
+            'backtester': self.backtester,
+        }
+        return {f"{owner}.{name}": value for owner, component in owners.items()
+                for name, value in vars(component).items() if isinstance(value, np.ndarray)}
+
+    def shared_bytes(self) -> int:
+        """Bytes held once per process for every session: datasets plus cached simulation paths"""
+        datasets = sum(array.nbytes for array in self.shared_arrays().values())
+        return datasets + shocks_nbytes() + self.sweep.cached_bytes()
+
+    @property
+    def simulated(self) -> bool:
+        """True when backtests run on returns drawn from the capital market assumptions"""
+        return self.backtester.simulated
+
+    def allocation(self, profile: Dict[str, Any]) -> Dict[str, float]:
+        """Frontier allocation in percentages for the profile's risk score and horizon"""
+        return self.optimizer.optimize(normalize_profile(profile))
+
+    def metrics(self, profile: Dict[str, Any], allocation: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Dashboard card figures for an allocation (default: the profile's frontier allocation)"""
+        profile = normalize_profile(profile)
+        allocation = allocation or self.allocation(profile)
+        analysis = self.optimizer.analyze(allocation, profile['time_horizon'])
+        risk = self.risk_analyzer.assess(allocation)
+        return {
+            'portfolio_value': float(profile['investment_amount']),
+            'expected_return': analysis['expected_return'],
+            'volatility': analysis['volatility'],
+            'risk_score': risk['risk_score'],
+            'diversification': risk['diversification'],
+            'effective_assets': risk['effective_assets'],
+            'max_drawdown': risk['max_drawdown'],
+            'beta': risk['beta'],
+        }
+
+    def performance(self, allocation: Dict[str, float], investment_amount: float, years: int = 1,
+                    policy: str = 'quarterly') -> Dict[str, Any]:
+        """Trailing backtest of an allocation against the benchmark"""
+        return self.backtester.performance(allocation, initial_value=investment_amount, policy=policy,
+                                           days=years * TRADING_DAYS)
+
+    def holdings_metrics(self, allocation: Dict[str, float], years: int = 1) -> Dict[str, float]:
+        """Trailing return, volatility, Sharpe, drawdown and beta of a holdings allocation"""
+        stats = self.backtester.performance(allocation, days=years * TRADING_DAYS)['stats']
+        risk = self.risk_analyzer.assess(allocation)
+        return {
+            'total_return': stats['total_return'],
+            'volatility': stats['volatility'],
+            'sharpe': stats['sharpe'],
+            'max_drawdown': stats['max_drawdown'],
+            'beta': risk['beta'],
+        }
+
+    def planner(self, expected_return: float, volatility: float) -> GoalPlanner:
+        """Goal planner per portfolio risk/return; recently used planners keep their simulated paths"""
+        key = (round(expected_return, 6), round(volatility, 6))
+        with self._lock:
+            planner = self._planners.get(key)
+            if planner is None:
+                planner = GoalPlanner(expected_return, volatility)
+                self._planners[key] = planner
+                while len(self._planners) > self.planner_cache_size:
+                    self._planners.popitem(last=False)
+            else:
+                self._planners.move_to_end(key)
+        return planner
+
+    def goal_plan(self, profile: Dict[str, Any], allocation: Dict[str, float], contribution: float,
+                  target_probability: float = 0.8) -> Optional[Dict[str, Any]]:
+        """Per-goal plan and simulated wealth paths, or None when the profile has no goals"""
+        profile = normalize_profile(profile)
+        if not profile['investment_goals']:
+            return None
+        analysis = self.optimizer.analyze(allocation, profile['time_horizon'])
+        planner = self.planner(analysis['expected_return'] / 100, analysis['volatility'] / 100)
+        goals = [Goal.from_template(name) for name in profile['investment_goals']]
+        amount = profile['investment_amount']
+        return {
+            'rows': planner.plan(amount, contribution, goals, target_probability),
+            'wealth': planner.simulate(amount, contribution, goals)['wealth'],
+            'paths': planner.paths,
+            'expected_return': analysis['expected_return'],
+            'volatility': analysis['volatility'],
+        }
+
+    def sensitivity(self, investment_amount: float,
+                    contribution: float = 0.0) -> Tuple[SweepResult, List[float], Sequence[int], Sequence[float]]:
+        """(sweep result, amounts, horizons, risk scores) over the standard grid around the amount"""
+        amounts = [investment_amount * factor for factor in SWEEP_AMOUNT_FACTORS]
+        result = self.sweep.run(amounts, SWEEP_HORIZONS, SWEEP_RISK_SCORES, contribution)
+        return result, amounts, SWEEP_HORIZONS, SWEEP_RISK_SCORES
+
+    def recommendations(self, profile: Dict[str, Any], holdings: Optional[Dict[str, float]] = None,
+                        limit: int = 3) -> Dict[str, Any]:
+        """Rule-based recommendations (see components.advisor)"""
+        return self.advisor.recommend(normalize_profile(profile), holdings, limit)
+
+    def analyze_holdings(self, allocation: Dict[str, float], time_horizon: str = '10+ years') -> Dict[str, Any]:
+        """Frontier comparison plus risk metrics for a user-entered allocation"""
+        analysis = self.optimizer.analyze(allocation, time_horizon)
+        risk = self.risk_analyzer.assess(allocation)
+        analysis.update({
+            'risk_score': round(risk['risk_score'], 1),
+            'max_drawdown': round(risk['max_drawdown'] * 100, 2),
+            'var_95_daily': round(risk['var_95_daily'] * 100, 2),
+            'beta': round(risk['beta'], 2),
+        })
+        return analysis
+
+    @property
+    def storage(self):
+        """Client data store (S3 bucket or ``STORAGE_LOCAL_ROOT``), or None when neither is configured"""
+        if self._storage is None and (self.settings.storage_local_root or self.settings.data_bucket):
+            from utils.storage import get_storage
+            self._storage = get_storage(self.settings.data_bucket, self.settings)
+        return self._storage
+
+    def book_dates(self) -> List[str]:
+        """Stored portfolio snapshot dates, newest first"""
+        if self.storage is None:
+            return []
+        from utils.snapshots import snapshot_dates
+        return snapshot_dates(self.storage)
+
+    def book_risk(self, snapshot_date: str) -> Dict[str, Any]:
+        """Risk distribution across every client portfolio in a stored snapshot"""
+        book = self.risk_analyzer.load_book(self.storage, snapshot_date)
+        scores = risk_score(book.metrics['volatility'])
+        return {
+            'snapshot_date': snapshot_date,
+            'clients': len(book),
+            'percentiles': [
+                {'Metric': label, **{f"P{p}": f"{value:.2%}" for p, value in
+                                     zip(BOOK_PERCENTILES, np.percentile(book.metrics[name], BOOK_PERCENTILES))}}
+                for name, label in BOOK_METRICS
+            ] if len(book) else [],
+            'risk_levels': {name: int(((scores >= low) & (scores < high)).sum()) for name, low, high in RISK_LEVELS},
+        }
+
+    def client_risk(self, snapshot_date: str, user_id: str) -> Optional[Dict[str, float]]:
+        """One client's metrics from the snapshot's book, or None if the client is not in it"""
+        return self.risk_analyzer.load_book(self.storage, snapshot_date).lookup(user_id)
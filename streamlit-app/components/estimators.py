@@ -0,0 +1,161 @@
+"""
+Return and Covariance Estimators
+Exponentially weighted mean/covariance updated one bar at a time, with
+Ledoit-Wolf style shrinkage and on-disk persistence
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+
+
+class EWMAEstimator:
+    """Exponentially weighted return mean and covariance.
+
+    Each new bar costs O(N^2): the mean, covariance and the second moment
+    of the centered cross-products (used for the shrinkage intensity) are
+    updated in place of a full O(T * N^2) recomputation.
+
+    Readers call ``snapshot()`` and get arrays that are never mutated
+    afterwards (updates build new arrays and swap them in under a lock),
+    so the Streamlit app can query while a background job updates. Other
+    processes share state through ``save()``/``load()``, which write the
+    file atomically.
+    """
+
+    def __init__(self, assets: Sequence[str], halflife: float = 63.0):
+        self.assets = list(assets)
+        self.halflife = float(halflife)
+        self.decay = 0.5 ** (1.0 / self.halflife)
+        size = len(self.assets)
+        self.mean = np.zeros(size)
+        self.covariance = np.zeros((size, size))
+        self.fourth_moment = np.zeros((size, size))
+        self.observations = 0
+        self.last_date: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def update(self, returns: np.ndarray, bar_date: Optional[str] = None):
+        """Fold one bar of asset returns into the estimates"""
+        returns = np.asarray(returns, dtype=np.float64)
+        with self._lock:
+            if self.observations == 0:
+                mean = returns.copy()
+                covariance = np.zeros_like(self.covariance)
+                fourth_moment = np.zeros_like(self.fourth_moment)
+            else:
+                alpha = 1.0 - self.decay
+                delta = returns - self.mean
+                mean = self.mean + alpha * delta
+                outer = np.outer(delta, delta)
+                covariance = self.decay * (self.covariance + alpha * outer)
+                fourth_moment = self.decay * self.fourth_moment + alpha * outer ** 2
+            self.mean, self.covariance, self.fourth_moment = mean, covariance, fourth_moment
+            self.observations += 1
+            if bar_date is not None:
+                self.last_date = str(bar_date)
+
+    def update_many(self, returns: np.ndarray, dates: Optional[Sequence] = None):
+        """Fold a (bars x assets) block of returns, oldest first"""
+        for row, values in enumerate(np.atleast_2d(returns)):
+            self.update(values, None if dates is None else dates[row])
+
+    def effective_observations(self) -> float:
+        """Effective sample size of the exponential weights"""
+        if self.observations == 0:
+            return 0.0
+        weights = self.decay ** np.arange(min(self.observations, 10 * int(self.halflife) + 1))
+        return float(weights.sum() ** 2 / (weights ** 2).sum())
+
+    def shrinkage_intensity(self, covariance: np.ndarray, fourth_moment: np.ndarray) -> Tuple[float, np.ndarray]:
+        """Ledoit-Wolf intensity toward a scaled identity target"""
+        size = covariance.shape[0]
+        target = np.eye(size) * np.trace(covariance) / size
+        distance = np.sum((covariance - target) ** 2)
+        if distance == 0.0:
+            return 0.0, target
+        estimation_error = np.sum(np.maximum(fourth_moment - covariance ** 2, 0.0)) / max(self.effective_observations(), 1.0)
+        return float(np.clip(estimation_error / distance, 0.0, 1.0)), target
+
+    def snapshot(self, shrink: bool = True, annualize: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """Current (expected returns, covariance), optionally shrunk and annualized"""
+        with self._lock:
+            mean, covariance, fourth_moment = self.mean, self.covariance, self.fourth_moment
+
+        if shrink and self.observations > 1:
+            intensity, target = self.shrinkage_intensity(covariance, fourth_moment)
+            covariance = intensity * target + (1.0 - intensity) * covariance
+
+        if annualize:
+            return mean * TRADING_DAYS, covariance * TRADING_DAYS
+        return mean, covariance
+
+    def save(self, path: str):
+        """Persist state atomically"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            state = {
+                'assets': np.array(self.assets),
+                'halflife': np.array(self.halflife),
+                'mean': self.mean,
+                'covariance': self.covariance,
+                'fourth_moment': self.fourth_moment,
+                'observations': np.array(self.observations),
+                'last_date': np.array(self.last_date or ''),
+            }
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz')
+        with os.fdopen(fd, 'wb') as handle:
+            np.savez(handle, **state)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'EWMAEstimator':
+        with np.load(path, allow_pickle=False) as state:
+            estimator = cls(state['assets'].tolist(), float(state['halflife']))
+            estimator.mean = state['mean']
+            estimator.covariance = state['covariance']
+            estimator.fourth_moment = state['fourth_moment']
+            estimator.observations = int(state['observations'])
+            estimator.last_date = str(state['last_date']) or None
+        return estimator
+
+    @classmethod
+    def from_market_data(cls, provider, assets: Optional[Sequence[str]] = None,
+                         halflife: float = 63.0, path: Optional[str] = None) -> 'EWMAEstimator':
+        """Load persisted state if present and fold in any newer bars from the price store.
+
+        Saved state is reused only if it was built for the same assets, in
+        the same order, and the same half-life; otherwise it is rebuilt
+        from the full history.
+        """
+        from components.market_data import ASSET_CLASS_PROXIES
+
+        assets = list(assets or ASSET_CLASS_PROXIES)
+        estimator = None
+        if path and os.path.exists(path):
+            estimator = cls.load(path)
+            if estimator.assets != assets or estimator.halflife != float(halflife):
+                logger.warning(f"Ignoring saved estimator state in {path}: built for {estimator.assets} "
+                               f"(halflife {estimator.halflife:g}), need {assets} (halflife {float(halflife):g})")
+                estimator = None
+        if estimator is None:
+            estimator = cls(assets, halflife)
+
+        dates, returns, _ = provider.asset_class_returns(assets=assets)
+        if estimator.last_date:
+            newer = dates > np.datetime64(estimator.last_date, 'D')
+            dates, returns = dates[newer], returns[newer]
+        if len(dates):
+            estimator.update_many(returns, dates)
+            if path:
+                estimator.save(path)
+        return estimator
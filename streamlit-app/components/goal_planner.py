@@ -0,0 +1,247 @@
+"""
+Goal Planner
+Monte Carlo funding analysis for several investment goals drawn from one
+portfolio, with contribution solving over cached return paths
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Years of shocks drawn up front; longer horizons extend the same draws
+MAX_YEARS = 60
+
+# Default cash-flow schedules for the sidebar goals, in today's dollars:
+# (kind, amount, first year, number of years)
+GOAL_TEMPLATES = {
+    'Home Purchase': ('withdrawal', 60000.0, 5, 1),
+    'Education': ('withdrawal', 25000.0, 10, 4),
+    'Retirement': ('withdrawal', 40000.0, 25, 25),
+    'Income Generation': ('withdrawal', 4000.0, 1, 20),
+    'Wealth Building': ('target', 250000.0, 15, 1),
+}
+
+
+def lognormal_parameters(expected_return, volatility):
+    """(mu, sigma) of log gross returns matching an arithmetic mean and volatility"""
+    expected_return = np.asarray(expected_return, dtype=np.float64)
+    sigma2 = np.log1p(np.asarray(volatility, dtype=np.float64) ** 2 / (1.0 + expected_return) ** 2)
+    return np.log1p(expected_return) - sigma2 / 2.0, np.sqrt(sigma2)
+
+
+_shocks: Dict[Tuple[int, int], np.ndarray] = {}
+_shocks_lock = threading.Lock()
+
+
+def standard_shocks(paths: int, years: int, seed: int = 42) -> np.ndarray:
+    """Read-only (years x paths) standard-normal draws, shared per (paths, seed) across the process.
+
+    Drawn once for at least ``MAX_YEARS`` years. Rows are filled in order, so
+    a longer request redraws to the same prefix: year ``t`` of a path never
+    depends on how many years were asked for.
+    """
+    key = (paths, seed)
+    with _shocks_lock:
+        shocks = _shocks.get(key)
+        if shocks is None or len(shocks) < years:
+            shocks = np.random.default_rng(seed).standard_normal((max(years, MAX_YEARS), paths))
+            shocks.setflags(write=False)
+            _shocks[key] = shocks
+    return shocks[:years]
+
+
+def shocks_nbytes() -> int:
+    """Bytes held by the shared shock matrices"""
+    with _shocks_lock:
+        return sum(shocks.nbytes for shocks in _shocks.values())
+
+
+class Goal:
+    """A withdrawal schedule, or a wealth target to hold at a given year"""
+
+    def __init__(self, name: str, amount: float, start_year: int, years: int = 1,
+                 kind: str = 'withdrawal'):
+        if kind not in ('withdrawal', 'target'):
+            raise ValueError(f"Unknown goal kind: {kind}")
+        self.name = name
+        self.amount = float(amount)
+        self.start_year = max(int(start_year), 1)
+        self.years = max(int(years), 1)
+        self.kind = kind
+
+    @property
+    def end_year(self) -> int:
+        return self.start_year + self.years - 1
+
+    @property
+    def key(self) -> Tuple:
+        return (self.name, self.amount, self.start_year, self.years, self.kind)
+
+    @classmethod
+    def from_template(cls, name: str, amount: Optional[float] = None,
+                      start_year: Optional[int] = None) -> 'Goal':
+        kind, default_amount, default_start, years = GOAL_TEMPLATES[name]
+        return cls(name, default_amount if amount is None else amount,
+                   default_start if start_year is None else start_year, years, kind)
+
+
+class GoalPlanner:
+    """Simulates one portfolio funding several goals across many paths.
+
+    Annual returns scale the process-wide ``standard_shocks`` by this
+    portfolio's moments, so every evaluation (a different contribution, a
+    different set of goals, a longer horizon) runs on identical paths. That
+    makes success probability monotone in the contribution, which the
+    bisection in ``required_contribution`` relies on. Each year is one
+    vectorized step over all paths; goals are paid in list order (earlier
+    goals first). Planners hold no path arrays of their own and are safe to
+    share between script threads.
+    """
+
+    def __init__(self, expected_return: float, volatility: float, paths: int = 10000,
+                 inflation: float = 0.025, seed: int = 42, cache_size: int = 32):
+        self.expected_return = float(expected_return)
+        self.volatility = float(volatility)
+        self.paths = paths
+        self.inflation = float(inflation)
+        self.seed = seed
+        self.cache_size = cache_size
+        self._mu, self._sigma = (float(value) for value in lognormal_parameters(self.expected_return,
+                                                                                 self.volatility))
+        self._required: 'OrderedDict[Tuple, List[Optional[float]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def growth(self, year: int, shocks: np.ndarray) -> np.ndarray:
+        """Gross returns of every path in one year (0-based), lognormal with the given moments"""
+        return np.exp(self._mu + self._sigma * shocks[year])
+
+    def schedule(self, goals: Sequence[Goal], years: int) -> np.ndarray:
+        """Nominal (goals x years) cash-flow amounts, inflated from today's dollars"""
+        inflation = (1.0 + self.inflation) ** np.arange(1, years + 1)
+        flows = np.zeros((len(goals), years))
+        for row, goal in enumerate(goals):
+            flows[row, goal.start_year - 1:goal.end_year] = goal.amount
+        return flows * inflation
+
+    def simulate(self, initial: float, contribution, goals: Sequence[Goal],
+                 contribution_years: Optional[int] = None, history: bool = True) -> Dict[str, np.ndarray]:
+        """Wealth paths and per-goal shortfalls for annual (inflation-indexed) contributions.
+
+        ``contribution`` may be a scalar or a 1-D array of candidates, which
+        are simulated side by side: arrays gain a leading candidate axis.
+        """
+        scalar = np.ndim(contribution) == 0
+        candidates = np.atleast_1d(np.asarray(contribution, dtype=np.float64))[:, None]
+        years = max([goal.end_year for goal in goals] + [1])
+        shocks = standard_shocks(self.paths, years, self.seed)
+        flows = self.schedule(goals, years)
+        inflation = (1.0 + self.inflation) ** np.arange(1, years + 1)
+        # By default contributions continue until the last goal starts
+        if contribution_years is None:
+            contribution_years = max([goal.start_year for goal in goals] + [1])
+        contributing = np.arange(1, years + 1) <= contribution_years
+
+        wealth = np.full((len(candidates), self.paths), float(initial))
+        shortfall = np.zeros((len(candidates), len(goals), self.paths))
+        paths = np.empty((years + 1, len(candidates), self.paths)) if history else None
+        if history:
+            paths[0] = wealth
+        gap = np.empty_like(wealth)
+        for year in range(years):
+            wealth *= self.growth(year, shocks)
+            if contributing[year]:
+                wealth += candidates * inflation[year]
+            for row, goal in enumerate(goals):
+                due = flows[row, year]
+                if due == 0.0:
+                    continue
+                # gap = unfunded part of this year's amount
+                np.subtract(due, wealth, out=gap)
+                np.maximum(gap, 0.0, out=gap)
+                shortfall[:, row] += gap
+                if goal.kind == 'withdrawal':
+                    wealth -= due
+                    wealth += gap
+            if history:
+                paths[year + 1] = wealth
+
+        if scalar:
+            paths = paths[:, 0] if history else None
+            shortfall = shortfall[0]
+        return {'wealth': paths, 'shortfall': shortfall, 'needed': flows.sum(axis=1)}
+
+    def success_probability(self, initial: float, contribution, goals: Sequence[Goal],
+                            tolerance: float = 0.01) -> np.ndarray:
+        """Per-goal probability of funding at least ``1 - tolerance`` of the goal"""
+        result = self.simulate(initial, contribution, goals, history=False)
+        allowed = tolerance * result['needed'][:, None]
+        return (result['shortfall'] <= allowed).mean(axis=-1)
+
+    def required_contributions(self, initial: float, goals: Sequence[Goal], target_probability: float = 0.8,
+                               upper: Optional[float] = None, precision: float = 50.0) -> List[Optional[float]]:
+        """Smallest annual contribution giving ``target_probability`` for each goal, plus all goals jointly.
+
+        One bisection per goal (the last entry is the joint one) runs in
+        lockstep: every step simulates all candidates in a single batch on
+        the shared paths. Entries are None when even ``upper`` per year is
+        not enough; with no goals the result is ``[0.0]``. Results are cached
+        per (initial, goals, target), so changing only the contribution does
+        not re-run the bisection.
+        """
+        if not goals:
+            return [0.0]  # nothing to fund
+        key = (float(initial), tuple(goal.key for goal in goals), float(target_probability), upper, float(precision))
+        with self._lock:
+            cached = self._required.get(key)
+            if cached is not None:
+                self._required.move_to_end(key)
+                return list(cached)
+        count = len(goals) + 1
+
+        def probabilities(candidates: np.ndarray) -> np.ndarray:
+            per_goal = self.success_probability(initial, candidates, goals)      # (candidates, goals)
+            per_goal = np.column_stack([per_goal, per_goal.min(axis=1)])
+            return per_goal[np.arange(count), np.arange(count)]
+
+        upper = upper or max(sum(goal.amount * goal.years for goal in goals), 1000.0)
+        low, high = np.zeros(count), np.full(count, upper)
+        funded_at_zero = probabilities(low) >= target_probability
+        reachable = probabilities(high) >= target_probability
+        high[funded_at_zero] = 0.0
+
+        while np.any(high - low > precision):
+            middle = (low + high) / 2.0
+            enough = probabilities(middle) >= target_probability
+            high = np.where(enough, middle, high)
+            low = np.where(enough, low, middle)
+        required = [float(h) if ok else None for h, ok in zip(high, reachable | funded_at_zero)]
+        with self._lock:
+            self._required[key] = required
+            while len(self._required) > self.cache_size:
+                self._required.popitem(last=False)
+        return list(required)
+
+    def required_contribution(self, initial: float, goals: Sequence[Goal], target_probability: float = 0.8,
+                              goal_index: Optional[int] = None, **kwargs) -> Optional[float]:
+        """Contribution one goal (or, by default, all goals together) needs"""
+        required = self.required_contributions(initial, goals, target_probability, **kwargs)
+        return required[-1 if goal_index is None else goal_index]
+
+    def plan(self, initial: float, contribution: float, goals: Sequence[Goal],
+             target_probability: float = 0.8) -> List[Dict[str, object]]:
+        """Per-goal success probability and the contribution each goal needs on its own"""
+        probabilities = self.success_probability(initial, contribution, goals)
+        required = self.required_contributions(initial, goals, target_probability)
+        return [
+            {
+                'goal': goal.name,
+                'kind': goal.kind,
+                'amount': goal.amount,
+                'years': f"{goal.start_year}-{goal.end_year}" if goal.years > 1 else str(goal.start_year),
+                'success_probability': float(probabilities[row]),
+                'required_contribution': required[row],
+            }
+            for row, goal in enumerate(goals)
+        ]
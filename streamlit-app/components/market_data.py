@@ -0,0 +1,232 @@
+"""
+Market Data
+Local price-history store with memory-mapped per-ticker arrays and
+incremental updates from yfinance
+"""
+
+import csv
+import json
+import logging
+import os
+import tempfile
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Tradable proxies for the app's asset classes (see components.risk_analyzer)
+ASSET_CLASS_PROXIES = {
+    'stocks': 'VTI',
+    'bonds': 'BND',
+    'alternatives': 'VNQ',
+    'cash': 'BIL',
+}
+BENCHMARK_TICKER = 'SPY'
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'data', 'fixtures', 'synthetic_prices.csv')
+
+DATE_DTYPE = np.dtype('datetime64[D]')
+CLOSE_DTYPE = np.dtype('<f8')
+
+# fetcher(ticker, start) -> (dates as datetime64[D], adjusted closes)
+Fetcher = Callable[[str, Optional[date]], Tuple[np.ndarray, np.ndarray]]
+
+
+def yfinance_fetcher(ticker: str, start: Optional[date]) -> Tuple[np.ndarray, np.ndarray]:
+    """Fetch adjusted daily closes from yfinance, starting at ``start``"""
+    import yfinance as yf
+
+    history = yf.download(ticker, start=start.isoformat() if start else None,
+                          auto_adjust=True, progress=False)
+    if history.empty:
+        return np.array([], dtype=DATE_DTYPE), np.array([], dtype=CLOSE_DTYPE)
+    closes = history['Close'].to_numpy(dtype=CLOSE_DTYPE).reshape(-1)
+    return history.index.values.astype(DATE_DTYPE), closes
+
+
+class PriceStore:
+    """Per-ticker adjusted-close history as raw little-endian files.
+
+    Each ticker has ``<T>.dates`` (int64 days since epoch) and ``<T>.close``
+    (float64) files opened with ``np.memmap``; ``index.json`` records the
+    row count and date range. New bars are appended to the files and the
+    index is replaced atomically afterwards, so readers never see rows the
+    index does not cover.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.index_path = os.path.join(directory, 'index.json')
+        self.index: Dict[str, Dict[str, object]] = self._read_index()
+        self._maps: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _read_index(self) -> Dict[str, Dict[str, object]]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+            json.dump(self.index, handle, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _paths(self, ticker: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, ticker.upper())
+        return f"{base}.dates", f"{base}.close"
+
+    def tickers(self) -> List[str]:
+        return sorted(self.index)
+
+    def date_range(self, ticker: str) -> Optional[Tuple[np.datetime64, np.datetime64]]:
+        entry = self.index.get(ticker.upper())
+        if not entry:
+            return None
+        return np.datetime64(entry['start'], 'D'), np.datetime64(entry['end'], 'D')
+
+    def arrays(self, ticker: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Read-only memory-mapped (dates, closes) for a ticker"""
+        ticker = ticker.upper()
+        entry = self.index.get(ticker)
+        if not entry or not entry['rows']:
+            return np.array([], dtype=DATE_DTYPE), np.array([], dtype=CLOSE_DTYPE)
+
+        cached = self._maps.get(ticker)
+        if cached is not None and len(cached[0]) == entry['rows']:
+            return cached
+
+        dates_path, close_path = self._paths(ticker)
+        rows = int(entry['rows'])
+        dates = np.memmap(dates_path, dtype=DATE_DTYPE, mode='r', shape=(rows,))
+        closes = np.memmap(close_path, dtype=CLOSE_DTYPE, mode='r', shape=(rows,))
+        self._maps[ticker] = (dates, closes)
+        return dates, closes
+
+    def slice(self, ticker: str, start: Optional[str] = None, end: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Zero-copy views of the bars in ``[start, end]``"""
+        dates, closes = self.arrays(ticker)
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, 'D'), side='left'))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(end, 'D'), side='right'))
+        return dates[lo:hi], closes[lo:hi]
+
+    def append(self, ticker: str, dates: np.ndarray, closes: np.ndarray) -> int:
+        """Append bars newer than the stored history; returns rows added"""
+        ticker = ticker.upper()
+        dates = np.asarray(dates, dtype=DATE_DTYPE)
+        closes = np.asarray(closes, dtype=CLOSE_DTYPE)
+        order = np.argsort(dates, kind='stable')
+        dates, closes = dates[order], closes[order]
+
+        entry = self.index.get(ticker)
+        if entry and entry['rows']:
+            keep = dates > np.datetime64(entry['end'], 'D')
+            dates, closes = dates[keep], closes[keep]
+        if not len(dates):
+            return 0
+
+        dates_path, close_path = self._paths(ticker)
+        rows = int(entry['rows']) if entry else 0
+        # Truncate any bytes past the indexed rows left by an interrupted append
+        for path, dtype, values in ((dates_path, DATE_DTYPE, dates), (close_path, CLOSE_DTYPE, closes)):
+            with open(path, 'ab') as handle:
+                handle.truncate(rows * dtype.itemsize)
+                handle.write(values.tobytes())
+
+        self.index[ticker] = {
+            'start': entry['start'] if entry else str(dates[0]),
+            'end': str(dates[-1]),
+            'rows': rows + len(dates),
+        }
+        self._write_index()
+        self._maps.pop(ticker, None)
+        return len(dates)
+
+
+class MarketDataProvider:
+    """Price history and return matrices for the risk and optimizer code"""
+
+    def __init__(self, store_dir: Optional[str] = None, fetcher: Optional[Fetcher] = None,
+                 settings: Optional[Settings] = None):
+        settings = settings or Settings()
+        self.store = PriceStore(store_dir or settings.market_data_dir)
+        self.fetcher = fetcher or yfinance_fetcher
+
+    def update(self, tickers: Sequence[str]) -> Dict[str, int]:
+        """Fetch and append only the bars after each ticker's last stored date"""
+        added = {}
+        for ticker in tickers:
+            stored = self.store.date_range(ticker)
+            start = None
+            if stored:
+                start = (stored[1] + np.timedelta64(1, 'D')).astype(date)
+                if start > date.today():
+                    added[ticker] = 0
+                    continue
+            try:
+                dates, closes = self.fetcher(ticker, start)
+                added[ticker] = self.store.append(ticker, dates, closes)
+            except Exception as e:
+                logger.warning(f"Price update failed for {ticker}: {str(e)}")
+                added[ticker] = 0
+        return added
+
+    def load_csv(self, path: str) -> Dict[str, int]:
+        """Load a wide ``date,TICKER1,TICKER2,...`` CSV of adjusted closes"""
+        with open(path, 'r', encoding='utf-8') as handle:
+            reader = csv.reader(handle)
+            header = next(reader)
+            rows = [row for row in reader if row]
+        dates = np.array([row[0] for row in rows], dtype=DATE_DTYPE)
+        added = {}
+        for column, ticker in enumerate(header[1:], start=1):
+            values = np.array([float(row[column]) if row[column] else np.nan for row in rows])
+            present = ~np.isnan(values)
+            added[ticker] = self.store.append(ticker, dates[present], values[present])
+        return added
+
+    def load_fixture(self) -> Dict[str, int]:
+        """Populate the store from the bundled offline dataset"""
+        return self.load_csv(FIXTURE_PATH)
+
+    def get_prices(self, ticker: str, start: Optional[str] = None, end: Optional[str] = None):
+        """Zero-copy (dates, adjusted closes) views"""
+        return self.store.slice(ticker, start, end)
+
+    def get_returns(self, tickers: Sequence[str], start: Optional[str] = None,
+                    end: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Daily simple returns (days x tickers) on the dates all tickers share"""
+        series = [self.store.slice(ticker, start, end) for ticker in tickers]
+        if not series or any(len(dates) < 2 for dates, _ in series):
+            return np.array([], dtype=DATE_DTYPE), np.empty((0, len(tickers)))
+
+        common = series[0][0]
+        for dates, _ in series[1:]:
+            if len(dates) != len(common) or not np.array_equal(dates, common):
+                common = np.intersect1d(common, dates, assume_unique=True)
+
+        closes = np.empty((len(common), len(tickers)))
+        for column, (dates, values) in enumerate(series):
+            if len(dates) == len(common):
+                closes[:, column] = values
+            else:
+                closes[:, column] = values[np.searchsorted(dates, common)]
+        return common[1:], closes[1:] / closes[:-1] - 1.0
+
+    def asset_class_returns(self, start: Optional[str] = None, end: Optional[str] = None,
+                            assets: Sequence[str] = tuple(ASSET_CLASS_PROXIES)) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(dates, asset-class returns, benchmark returns) from the proxy tickers"""
+        tickers = [ASSET_CLASS_PROXIES[asset] for asset in assets] + [BENCHMARK_TICKER]
+        dates, returns = self.get_returns(tickers, start, end)
+        return dates, returns[:, :-1], returns[:, -1]
+
+    def has_history(self, min_days: int = 60) -> bool:
+        tickers = list(ASSET_CLASS_PROXIES.values()) + [BENCHMARK_TICKER]
+        return all(self.store.index.get(t, {}).get('rows', 0) >= min_days for t in tickers)
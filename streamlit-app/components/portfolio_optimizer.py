@@ -0,0 +1,195 @@
+"""
+Portfolio Optimizer
+Precomputed long-only efficient frontiers per time-horizon bucket, stored as
+compact arrays and queried by binary search and interpolation
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from advisor_core.allocation import (
+    ASSET_CLASSES, ASSET_LABELS, HORIZON_BUCKETS, HORIZON_UPPER_BOUNDS, RISK_TOLERANCE_SCORES,
+    assumption_moments, score_to_volatility, solve_frontier
+)
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class FrontierTable:
+    """Dense frontier (horizons x levels) sorted by volatility for O(log n) lookup"""
+
+    def __init__(self, assets: Sequence[str], horizons: Sequence[str], volatility: np.ndarray,
+                 expected_return: np.ndarray, weights: np.ndarray):
+        self.assets = list(assets)
+        self.horizons = list(horizons)
+        self.volatility = volatility
+        self.expected_return = expected_return
+        self.weights = weights
+
+    @classmethod
+    def build(cls, expected_returns: np.ndarray, covariance: np.ndarray,
+              assets: Sequence[str] = ASSET_CLASSES, horizons: Sequence[str] = HORIZON_BUCKETS,
+              upper_bounds: np.ndarray = HORIZON_UPPER_BOUNDS, levels: int = 256) -> 'FrontierTable':
+        upper = upper_bounds[:len(horizons)]
+        solved = solve_frontier(expected_returns, covariance, np.zeros_like(upper), upper, levels)
+        rows = []
+        for weights in solved:
+            volatility = np.sqrt(np.einsum('la,ab,lb->l', weights, covariance, weights))
+            order = np.argsort(volatility, kind='stable')
+            rows.append((volatility[order], weights[order] @ expected_returns, weights[order]))
+
+        return cls(
+            assets, horizons,
+            np.stack([row[0] for row in rows]).astype(np.float32),
+            np.stack([row[1] for row in rows]).astype(np.float32),
+            np.stack([row[2] for row in rows]).astype(np.float32),
+        )
+
+    def lookup(self, target_volatility: float, horizon: str) -> Tuple[np.ndarray, float, float]:
+        """Interpolated (weights, expected return, volatility) at a target volatility"""
+        bucket = self.horizons.index(horizon) if horizon in self.horizons else len(self.horizons) - 1
+        volatility = self.volatility[bucket]
+        right = int(np.searchsorted(volatility, target_volatility))
+        if right <= 0:
+            row = 0
+            return self.weights[bucket, row], float(self.expected_return[bucket, row]), float(volatility[row])
+        if right >= len(volatility):
+            row = len(volatility) - 1
+            return self.weights[bucket, row], float(self.expected_return[bucket, row]), float(volatility[row])
+
+        left = right - 1
+        span = float(volatility[right] - volatility[left])
+        t = 0.0 if span <= 0 else (target_volatility - float(volatility[left])) / span
+        weights = (1.0 - t) * self.weights[bucket, left] + t * self.weights[bucket, right]
+        expected = (1.0 - t) * self.expected_return[bucket, left] + t * self.expected_return[bucket, right]
+        return weights, float(expected), float(target_volatility)
+
+    def lookup_many(self, target_volatility: np.ndarray, buckets: np.ndarray) -> np.ndarray:
+        """Interpolated weights (n x assets) for arrays of target volatilities and bucket indices"""
+        target_volatility = np.asarray(target_volatility, dtype=np.float64)
+        buckets = np.asarray(buckets, dtype=np.intp)
+        weights = np.empty((len(target_volatility), len(self.assets)))
+        for bucket in np.unique(buckets):
+            rows = buckets == bucket
+            volatility = self.volatility[bucket].astype(np.float64)
+            targets = np.clip(target_volatility[rows], volatility[0], volatility[-1])
+            right = np.clip(np.searchsorted(volatility, targets), 1, len(volatility) - 1)
+            left = right - 1
+            span = volatility[right] - volatility[left]
+            t = np.where(span > 0, (targets - volatility[left]) / np.where(span > 0, span, 1.0), 0.0)[:, None]
+            weights[rows] = (1.0 - t) * self.weights[bucket, left] + t * self.weights[bucket, right]
+        return weights
+
+    def save(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz')
+        with os.fdopen(fd, 'wb') as handle:
+            np.savez(handle, assets=np.array(self.assets), horizons=np.array(self.horizons),
+                     volatility=self.volatility, expected_return=self.expected_return, weights=self.weights)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'FrontierTable':
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['assets'].tolist(), data['horizons'].tolist(), data['volatility'],
+                       data['expected_return'], data['weights'])
+
+
+def market_inputs(settings: Optional[Settings] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Annualized expected returns and covariance: stored history if available, else assumptions"""
+    settings = settings or Settings()
+    from components.market_data import MarketDataProvider
+
+    provider = MarketDataProvider(settings=settings)
+    if provider.has_history():
+        from components.estimators import EWMAEstimator
+        estimator = EWMAEstimator.from_market_data(provider, ASSET_CLASSES, path=settings.estimator_state_path)
+        return estimator.snapshot()
+
+    return assumption_moments()
+
+
+class PortfolioOptimizer:
+    """Risk-calibrated allocations served from the precomputed frontier table"""
+
+    def __init__(self, table: Optional[FrontierTable] = None, settings: Optional[Settings] = None):
+        self.settings = settings or Settings()
+        self.table = table or self.load_table()
+        self._inputs: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def market_inputs(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._inputs is None:
+            self._inputs = market_inputs(self.settings)
+        return self._inputs
+
+    def load_table(self) -> FrontierTable:
+        path = self.settings.frontier_table_path
+        if os.path.exists(path):
+            return FrontierTable.load(path)
+        logger.warning(f"Frontier table not found at {path}; building it in-process. "
+                       f"Run 'python -m components.portfolio_optimizer' at deploy time instead")
+        table = FrontierTable.build(*market_inputs(self.settings))
+        try:
+            table.save(path)
+        except OSError as e:
+            logger.warning(f"Could not save frontier table: {str(e)}")
+        return table
+
+    def allocation(self, risk_score: float, time_horizon: str) -> Dict[str, float]:
+        """Allocation in whole percentages at a continuous 1-10 risk score"""
+        weights, _, _ = self.table.lookup(score_to_volatility(risk_score), time_horizon)
+        percentages = np.round(np.asarray(weights, dtype=np.float64) * 100.0, 1)
+        return {ASSET_LABELS.get(asset, asset): float(pct) for asset, pct in zip(self.table.assets, percentages) if pct > 0}
+
+    def optimize(self, user_profile: Dict) -> Dict[str, float]:
+        """Allocation for a sidebar profile (``risk_score`` overrides the tolerance label)"""
+        score = user_profile.get('risk_score')
+        if score is None:
+            score = RISK_TOLERANCE_SCORES.get(user_profile.get('risk_tolerance', 'Moderate'), 5.5)
+        return self.allocation(score, user_profile.get('time_horizon', '5-10 years'))
+
+    def analyze(self, allocation: Dict[str, float], time_horizon: str = '10+ years') -> Dict[str, float]:
+        """Compare an allocation with the frontier portfolio of the same volatility"""
+        lowered = {str(k).lower(): float(v) for k, v in allocation.items()}
+        weights = np.array([lowered.get(asset, 0.0) for asset in self.table.assets])
+        weights = weights / weights.sum() if weights.sum() else weights
+
+        expected_returns, covariance = self.market_inputs()
+        volatility = float(np.sqrt(weights @ covariance @ weights))
+        expected = float(weights @ expected_returns)
+        frontier_weights, frontier_return, _ = self.table.lookup(volatility, time_horizon)
+        return {
+            'expected_return': round(expected * 100, 2),
+            'volatility': round(volatility * 100, 2),
+            'frontier_return_at_same_risk': round(frontier_return * 100, 2),
+            'return_gap': round((frontier_return - expected) * 100, 2),
+            'suggested_allocation': {
+                ASSET_LABELS.get(asset, asset): round(float(w) * 100, 1)
+                for asset, w in zip(self.table.assets, frontier_weights)
+            }
+        }
+
+
+def main():
+    """Offline job: rebuild the frontier table from current market inputs"""
+    parser = argparse.ArgumentParser(description="Precompute the efficient-frontier lookup table")
+    parser.add_argument("--output", help="Output .npz path (defaults to FRONTIER_TABLE_PATH)")
+    parser.add_argument("--levels", type=int, default=256, help="Risk levels per horizon bucket")
+    args = parser.parse_args()
+
+    settings = Settings()
+    table = FrontierTable.build(*market_inputs(settings), levels=args.levels)
+    output = args.output or settings.frontier_table_path
+    table.save(output)
+    print(f"Wrote {table.weights.shape[0]} x {table.weights.shape[1]} frontier table to {output}")
+
+
+if __name__ == "__main__":
+    main()
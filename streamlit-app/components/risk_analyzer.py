@@ -0,0 +1,265 @@
+"""
+Risk Analyzer
+Vectorized risk metrics for single portfolios and for the whole client book
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from advisor_core.allocation import ASSET_CLASSES, CAPITAL_MARKET_ASSUMPTIONS
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+
+METRICS = (
+    'expected_return', 'volatility', 'var_95_daily', 'cvar_95_daily', 'beta',
+    'max_drawdown', 'diversification_ratio', 'effective_assets'
+)
+
+
+def assumption_returns(days: int = TRADING_DAYS * 5, seed: int = 42) -> np.ndarray:
+    """Daily asset-class returns (days x assets) drawn from the market assumptions"""
+    cma = CAPITAL_MARKET_ASSUMPTIONS
+    daily_mean = cma['expected_return'] / TRADING_DAYS
+    daily_vol = cma['volatility'] / np.sqrt(TRADING_DAYS)
+    covariance = cma['correlation'] * np.outer(daily_vol, daily_vol)
+    rng = np.random.default_rng(seed)
+    return rng.multivariate_normal(daily_mean, covariance, size=days)
+
+
+def normalize_weights(weights: np.ndarray) -> np.ndarray:
+    """Scale each row to sum to one (accepts percentages)"""
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    totals = weights.sum(axis=1, keepdims=True)
+    totals[totals == 0] = 1.0
+    return weights / totals
+
+
+def risk_score(volatility: np.ndarray) -> np.ndarray:
+    """Map annualized volatility onto the dashboard's 1-10 scale (20% vol -> 10)"""
+    return np.round(1.0 + 9.0 * np.clip(np.asarray(volatility) / 0.20, 0.0, 1.0), 1)
+
+
+class BookRisk:
+    """Risk metrics for every portfolio in one snapshot, indexed by user id.
+
+    ``digest`` identifies the user ids, weights and market inputs the
+    metrics were computed from.
+    """
+
+    def __init__(self, snapshot_date: str, user_ids: Sequence[str], metrics: Dict[str, np.ndarray],
+                 digest: str = ''):
+        self.snapshot_date = snapshot_date
+        self.user_ids = list(user_ids)
+        self.metrics = metrics
+        self.digest = digest
+        self.index = {user_id: row for row, user_id in enumerate(self.user_ids)}
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def lookup(self, user_id: str) -> Optional[Dict[str, float]]:
+        """O(1) per-client lookup"""
+        row = self.index.get(user_id)
+        if row is None:
+            return None
+        result = {name: float(values[row]) for name, values in self.metrics.items()}
+        result['risk_score'] = float(risk_score(result['volatility']))
+        return result
+
+    def save(self, path: str):
+        np.savez(path, user_ids=np.array(self.user_ids), **self.metrics)
+
+    @classmethod
+    def load(cls, snapshot_date: str, path: str, digest: str = '') -> 'BookRisk':
+        with np.load(path, allow_pickle=False) as data:
+            metrics = {name: data[name] for name in METRICS}
+            return cls(snapshot_date, data['user_ids'].tolist(), metrics, digest)
+
+
+class RiskAnalyzer:
+    """Computes volatility, VaR/CVaR, beta, drawdown and diversification.
+
+    Portfolios are rows of a weight matrix over ``assets``; all metrics are
+    computed for a chunk of portfolios at once from the asset return matrix,
+    so a 100k-client book is a handful of matrix products rather than a
+    Python loop per client.
+
+    Expected return and volatility are annualized. VaR and CVaR are one-day
+    historical losses (``var_95_daily``, ``cvar_95_daily``) and max drawdown
+    spans the whole return window; all are fractions, not percentages.
+    """
+
+    def __init__(self, asset_returns: Optional[np.ndarray] = None,
+                 benchmark_returns: Optional[np.ndarray] = None,
+                 assets: Sequence[str] = ASSET_CLASSES,
+                 cache_dir: Optional[str] = None,
+                 chunk_size: int = 4096,
+                 book_cache_size: int = 4):
+        self.assets = list(assets)
+        self.asset_returns = assumption_returns() if asset_returns is None else np.asarray(asset_returns, dtype=np.float64)
+        if benchmark_returns is None:
+            benchmark_returns = self.asset_returns @ CAPITAL_MARKET_ASSUMPTIONS['benchmark_weights'][:len(self.assets)]
+        self.benchmark_returns = np.asarray(benchmark_returns, dtype=np.float64)
+        self.cache_dir = cache_dir
+        self.chunk_size = chunk_size
+        # Small LRUs: the latest analyzed book per date, and stored books by (date, snapshot version)
+        self.book_cache_size = book_cache_size
+        self._books: 'OrderedDict[str, BookRisk]' = OrderedDict()
+        self._stored: 'OrderedDict[Tuple[str, str], BookRisk]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Moments shared by every portfolio, computed once
+        self.mean_returns = self.asset_returns.mean(axis=0)
+        self.covariance = np.cov(self.asset_returns, rowvar=False)
+        self.asset_volatility = np.sqrt(np.diag(self.covariance))
+        benchmark_centered = self.benchmark_returns - self.benchmark_returns.mean()
+        asset_centered = self.asset_returns - self.mean_returns
+        self.benchmark_covariance = asset_centered.T @ benchmark_centered / (len(benchmark_centered) - 1)
+        self.benchmark_variance = benchmark_centered @ benchmark_centered / (len(benchmark_centered) - 1)
+
+        # Cached books are only valid for the market inputs they were computed from
+        inputs = hashlib.sha1(np.ascontiguousarray(self.asset_returns).tobytes())
+        inputs.update(np.ascontiguousarray(self.benchmark_returns).tobytes())
+        inputs.update(repr(self.assets).encode('utf-8'))
+        self._inputs_digest = inputs.hexdigest()
+
+    @classmethod
+    def from_market_data(cls, provider, start: Optional[str] = None, end: Optional[str] = None,
+                         **kwargs) -> 'RiskAnalyzer':
+        """Build from stored price history (see components.market_data)"""
+        _, asset_returns, benchmark_returns = provider.asset_class_returns(start, end)
+        return cls(asset_returns=asset_returns, benchmark_returns=benchmark_returns, **kwargs)
+
+    def weights_from_allocations(self, allocations: Iterable[Dict[str, float]]) -> np.ndarray:
+        """Build a weight matrix from ``{'Stocks': 60, ...}`` style dicts"""
+        rows = []
+        for allocation in allocations:
+            lowered = {str(k).lower(): v for k, v in allocation.items()}
+            rows.append([float(lowered.get(asset, 0)) for asset in self.assets])
+        return normalize_weights(np.array(rows))
+
+    def compute(self, weights: np.ndarray, confidence: float = 0.95) -> Dict[str, np.ndarray]:
+        """All metrics for a (portfolios x assets) weight matrix"""
+        weights = normalize_weights(weights)
+        count = weights.shape[0]
+        days = self.asset_returns.shape[0]
+        tail = max(int((1.0 - confidence) * days), 1)
+
+        metrics = {name: np.empty(count) for name in METRICS}
+
+        # Moment-based metrics need only the asset covariance: O(P * A^2)
+        variance = np.einsum('pa,ab,pb->p', weights, self.covariance, weights)
+        volatility = np.sqrt(np.maximum(variance, 0.0))
+        metrics['expected_return'] = weights @ self.mean_returns * TRADING_DAYS
+        metrics['volatility'] = volatility * np.sqrt(TRADING_DAYS)
+        metrics['beta'] = weights @ self.benchmark_covariance / self.benchmark_variance
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics['diversification_ratio'] = np.where(
+                volatility > 0, weights @ self.asset_volatility / volatility, 1.0
+            )
+        metrics['effective_assets'] = 1.0 / np.sum(weights ** 2, axis=1)
+
+        # Path-dependent metrics need the return series, one chunk at a time
+        for start in range(0, count, self.chunk_size):
+            stop = min(start + self.chunk_size, count)
+            returns = weights[start:stop] @ self.asset_returns.T
+
+            worst = np.partition(returns, tail - 1, axis=1)
+            metrics['var_95_daily'][start:stop] = -worst[:, tail - 1]
+            metrics['cvar_95_daily'][start:stop] = -worst[:, :tail].mean(axis=1)
+
+            growth = np.cumsum(np.log1p(returns), axis=1)
+            peak = np.maximum(np.maximum.accumulate(growth, axis=1), 0.0)
+            metrics['max_drawdown'][start:stop] = 1.0 - np.exp((growth - peak).min(axis=1))
+
+        return metrics
+
+    def assess(self, allocation: Dict[str, float]) -> Dict[str, float]:
+        """Metrics for a single allocation, with dashboard-ready score and diversification"""
+        metrics = self.compute(self.weights_from_allocations([allocation]))
+        result = {name: float(values[0]) for name, values in metrics.items()}
+        result['risk_score'] = float(risk_score(result['volatility']))
+        result['diversification'] = result['effective_assets'] / len(self.assets)
+        return result
+
+    def book_digest(self, user_ids: Sequence[str], weights: np.ndarray) -> str:
+        """Content hash of a book's user ids and weights under this analyzer's market inputs"""
+        weights = np.ascontiguousarray(weights, dtype=np.float64)
+        digest = hashlib.sha1(self._inputs_digest.encode('utf-8'))
+        digest.update(repr(weights.shape).encode('utf-8'))
+        digest.update(weights.tobytes())
+        digest.update('\x1f'.join(str(user_id) for user_id in user_ids).encode('utf-8'))
+        return digest.hexdigest()[:20]
+
+    def analyze_book(self, snapshot_date: str, user_ids: Sequence[str], weights: np.ndarray) -> BookRisk:
+        """Compute and cache metrics for every portfolio in a snapshot.
+
+        Cached books, in memory and on disk, are reused only for the same
+        user ids and weights; analyzing different ones for the same date
+        replaces the date's in-memory book.
+        """
+        digest = self.book_digest(user_ids, weights)
+        with self._lock:
+            book = self._books.get(snapshot_date)
+        if book is not None and book.digest == digest:
+            return self._remember(self._books, snapshot_date, book)
+
+        path = self._cache_path(snapshot_date, digest)
+        if path and os.path.exists(path):
+            book = BookRisk.load(snapshot_date, path, digest)
+        else:
+            book = BookRisk(snapshot_date, user_ids, self.compute(weights), digest)
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                book.save(path)
+            logger.info(f"Computed risk for {len(book)} portfolios ({snapshot_date})")
+        return self._remember(self._books, snapshot_date, book)
+
+    def load_book(self, storage, snapshot_date: str) -> BookRisk:
+        """Analyze a stored portfolio snapshot (see utils.snapshots).
+
+        The snapshot is read again only when its partition listing changes,
+        e.g. after the date is recompacted.
+        """
+        from utils.snapshots import read_snapshots, snapshot_version
+
+        key = (snapshot_date, snapshot_version(storage, snapshot_date))
+        with self._lock:
+            book = self._stored.get(key)
+        if book is not None:
+            return self._remember(self._stored, key, book)
+
+        table = read_snapshots(
+            storage,
+            columns=['user_id'] + self.assets,
+            filters=[('snapshot_date', '=', snapshot_date)]
+        )
+        weights = np.column_stack([table.column(asset).to_numpy() for asset in self.assets])
+        book = self.analyze_book(snapshot_date, table.column('user_id').to_pylist(), weights)
+        return self._remember(self._stored, key, book)
+
+    def lookup(self, snapshot_date: str, user_id: str) -> Optional[Dict[str, float]]:
+        with self._lock:
+            book = self._books.get(snapshot_date)
+        return book.lookup(user_id) if book else None
+
+    def _remember(self, cache: OrderedDict, key, book: BookRisk) -> BookRisk:
+        with self._lock:
+            cache[key] = book
+            cache.move_to_end(key)
+            while len(cache) > self.book_cache_size:
+                cache.popitem(last=False)
+        return book
+
+    def _cache_path(self, snapshot_date: str, digest: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"book-risk-{snapshot_date}-{digest}.npz")
@@ -0,0 +1,167 @@
+"""
+Sensitivity Sweeps
+Recommended allocation and simulated outcomes over an amount x horizon x
+risk grid, evaluated as one batched computation
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from advisor_core.allocation import horizon_bucket
+from components.goal_planner import lognormal_parameters, standard_shocks
+from components.portfolio_optimizer import PortfolioOptimizer, score_to_volatility
+
+METRICS = {
+    'median_value': 'Median ending value ($)',
+    'p05_value': '5th percentile ending value ($)',
+    'probability_of_loss': 'Probability of ending below amount invested',
+    'expected_return': 'Expected annual return',
+    'volatility': 'Annual volatility',
+    'stocks_weight': 'Stock allocation',
+}
+
+
+class SweepResult:
+    """Metric arrays over (amounts x horizons x risk scores)"""
+
+    def __init__(self, amounts: Sequence[float], horizons: Sequence[int], risk_scores: Sequence[float],
+                 metrics: Dict[str, np.ndarray], weights: np.ndarray):
+        self.amounts = list(amounts)
+        self.horizons = list(horizons)
+        self.risk_scores = list(risk_scores)
+        self.metrics = metrics
+        self.weights = weights          # (horizons, risk scores, assets)
+
+    def slice(self, metric: str, amount: Optional[float] = None, horizon: Optional[int] = None) -> np.ndarray:
+        """2-D view for a heatmap: fix either the amount (horizons x risk) or the horizon (amounts x risk)"""
+        values = self.metrics[metric]
+        if horizon is not None:
+            return values[:, self.horizons.index(horizon), :]
+        index = self.amounts.index(amount) if amount is not None else 0
+        return values[index]
+
+
+class SensitivitySweep:
+    """Evaluates whole parameter grids against the frontier table and shared return paths.
+
+    Allocations for every (horizon, risk) cell come from one vectorized
+    frontier lookup. Ending value is linear in both the amount and the
+    annual contribution: ``amount * G + contribution * C``, where per cell
+    and path G is the growth of one dollar over the horizon and C the
+    grown sum of one dollar contributed each year. G and C are built once
+    per (horizons, risk scores) grid, a year at a time on the shared
+    ``standard_shocks`` (never as cells x paths x years arrays), and cached;
+    amounts and contributions only rescale them. Safe to share between
+    script threads.
+    """
+
+    def __init__(self, optimizer: Optional[PortfolioOptimizer] = None, paths: int = 4000,
+                 seed: int = 42, cache_size: int = 32, grid_cache_size: int = 4):
+        self.optimizer = optimizer or PortfolioOptimizer()
+        self.paths = paths
+        self.seed = seed
+        self.cache_size = cache_size
+        self.grid_cache_size = grid_cache_size
+        self._cache: 'OrderedDict[Tuple, SweepResult]' = OrderedDict()
+        self._grids: 'OrderedDict[Tuple, Dict[str, np.ndarray]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, amounts: Sequence[float], horizons: Sequence[int], risk_scores: Sequence[float],
+            contribution: float = 0.0) -> SweepResult:
+        grid_key = (tuple(int(h) for h in horizons), tuple(float(r) for r in risk_scores))
+        key = (tuple(float(a) for a in amounts),) + grid_key + (float(contribution),)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        result = self._evaluate(key[0], *grid_key, self._grid(*grid_key), key[-1])
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def cached_bytes(self) -> int:
+        """Bytes held by cached grids"""
+        with self._lock:
+            return sum(array.nbytes for grid in self._grids.values() for array in grid.values())
+
+    def _grid(self, horizons: Tuple[int, ...], risk_scores: Tuple[float, ...]) -> Dict[str, np.ndarray]:
+        """Allocations, moments and per-path growth factors G and C for every (horizon, risk) cell"""
+        key = (horizons, risk_scores)
+        with self._lock:
+            grid = self._grids.get(key)
+            if grid is not None:
+                self._grids.move_to_end(key)
+                return grid
+
+        table = self.optimizer.table
+        expected_returns, covariance = self.optimizer.market_inputs()
+
+        # Allocation per (horizon, risk) cell
+        grid_horizons, grid_scores = np.meshgrid(horizons, risk_scores, indexing='ij')
+        targets = np.array([score_to_volatility(score) for score in grid_scores.ravel()])
+        buckets = np.array([horizon_bucket(years) for years in grid_horizons.ravel()])
+        weights = table.lookup_many(targets, buckets)                                 # (cells, assets)
+        portfolio_return = weights @ expected_returns
+        portfolio_volatility = np.sqrt(np.einsum('ca,ab,cb->c', weights, covariance, weights))
+
+        # G = exp(L_T); C = 1 + exp(L_T) * sum_{t<T} exp(-L_t), with L_t the log growth to the end of
+        # year t (contributions at the end of years 1..T; the last one does not grow)
+        cell_horizons = grid_horizons.ravel()
+        mu, sigma = lognormal_parameters(portfolio_return, portfolio_volatility)
+        shocks = standard_shocks(self.paths, max(horizons), self.seed)
+        log_growth = np.zeros((len(cell_horizons), self.paths))
+        discounted = np.zeros_like(log_growth)
+        growth_of_amount = np.empty_like(log_growth)
+        growth_of_contributions = np.empty_like(log_growth)
+        for year, year_shocks in enumerate(shocks, start=1):
+            log_growth += mu[:, None] + sigma[:, None] * year_shocks
+            ending = cell_horizons == year
+            if ending.any():
+                growth = np.exp(log_growth[ending])
+                growth_of_amount[ending] = growth
+                growth_of_contributions[ending] = 1.0 + growth * discounted[ending]
+            discounted += np.exp(-log_growth)
+
+        grid = {
+            'horizons': cell_horizons,
+            'weights': weights,
+            'expected_return': portfolio_return,
+            'volatility': portfolio_volatility,
+            'growth_of_amount': growth_of_amount,
+            'growth_of_contributions': growth_of_contributions,
+        }
+        with self._lock:
+            self._grids[key] = grid
+            while len(self._grids) > self.grid_cache_size:
+                self._grids.popitem(last=False)
+        return grid
+
+    def _evaluate(self, amounts: Tuple[float, ...], horizons: Tuple[int, ...], risk_scores: Tuple[float, ...],
+                  grid: Dict[str, np.ndarray], contribution: float) -> SweepResult:
+        shape = (len(amounts), len(horizons), len(risk_scores))
+        p05, median, loss = (np.empty((len(amounts), len(grid['horizons']))) for _ in range(3))
+        for row, amount in enumerate(amounts):
+            # One (cells x paths) array per amount
+            ending = amount * grid['growth_of_amount'] + contribution * grid['growth_of_contributions']
+            p05[row], median[row] = np.percentile(ending, [5, 50], axis=1)
+            invested = amount + contribution * grid['horizons']
+            loss[row] = (ending < invested[:, None]).mean(axis=1)
+
+        weights = grid['weights']
+        metrics = {
+            'median_value': median.reshape(shape),
+            'p05_value': p05.reshape(shape),
+            'probability_of_loss': loss.reshape(shape),
+            'expected_return': np.broadcast_to(grid['expected_return'].reshape(shape[1:]), shape),
+            'volatility': np.broadcast_to(grid['volatility'].reshape(shape[1:]), shape),
+            'stocks_weight': np.broadcast_to(
+                weights[:, self.optimizer.table.assets.index('stocks')].reshape(shape[1:]), shape),
+        }
+        return SweepResult(amounts, horizons, risk_scores, metrics, weights.reshape(shape[1:] + (-1,)))
@@ -0,0 +1,61 @@
+"""
+Application Settings
+Environment-driven configuration shared by the Streamlit components
+"""
+
+import os
+
+
+class Settings:
+    """Runtime settings read from environment variables"""
+
+    def __init__(self):
+        # AWS Configuration
+        self.aws_region = os.getenv('AWS_REGION', 'us-east-1')
+        self.bedrock_region = os.getenv('BEDROCK_REGION', self.aws_region)
+        self.data_bucket = os.getenv('S3_BUCKET', '')
+        self.knowledge_base_bucket = os.getenv('KNOWLEDGE_BASE_BUCKET', '')
+
+        # Directory that replaces S3 with the filesystem backend (local development)
+        self.storage_local_root = os.getenv('STORAGE_LOCAL_ROOT', '')
+
+        # AWS client tuning (shared by every boto3 client in the process)
+        self.aws_max_pool_connections = int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '50'))
+        self.aws_connect_timeout = float(os.getenv('AWS_CONNECT_TIMEOUT', '5'))
+        self.aws_read_timeout = float(os.getenv('AWS_READ_TIMEOUT', '120'))
+        self.aws_retry_mode = os.getenv('AWS_RETRY_MODE', 'adaptive')
+        self.aws_max_attempts = int(os.getenv('AWS_MAX_ATTEMPTS', '5'))
+        self.aws_tcp_keepalive = os.getenv('AWS_TCP_KEEPALIVE', 'true').lower() == 'true'
+
+        # App-level Bedrock calls: read timeout and attempts per call (together the
+        # call's deadline), and the circuit breaker that pauses calls after failures
+        self.bedrock_timeout = float(os.getenv('BEDROCK_TIMEOUT', '30'))
+        self.bedrock_max_attempts = int(os.getenv('BEDROCK_MAX_ATTEMPTS', '2'))
+        self.bedrock_circuit_failures = int(os.getenv('BEDROCK_CIRCUIT_FAILURES', '3'))
+        self.bedrock_circuit_reset = float(os.getenv('BEDROCK_CIRCUIT_RESET', '30'))
+
+        # Local market-data store (memory-mapped price history)
+        app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.market_data_dir = os.getenv('MARKET_DATA_DIR', os.path.join(app_dir, 'data', 'market'))
+        self.estimator_state_path = os.getenv(
+            'ESTIMATOR_STATE_PATH', os.path.join(self.market_data_dir, 'ewma-asset-classes.npz')
+        )
+
+        # Precomputed efficient-frontier table (built by components.portfolio_optimizer)
+        self.frontier_table_path = os.getenv(
+            'FRONTIER_TABLE_PATH', os.path.join(app_dir, 'data', 'frontier', 'frontier.npz')
+        )
+
+        # Background AI jobs (shared worker pool) and UI polling interval in seconds
+        self.ai_job_workers = int(os.getenv('AI_JOB_WORKERS', '4'))
+        self.ai_poll_interval = float(os.getenv('AI_POLL_INTERVAL', '1.0'))
+
+        # Seconds the sidebar connectivity checks are reused before being repeated
+        self.status_check_ttl = int(os.getenv('STATUS_CHECK_TTL', '60'))
+
+        # Session records idle this many seconds are dropped; the check runs at most once per interval
+        self.session_idle_ttl = float(os.getenv('SESSION_IDLE_TTL', '1800'))
+        self.session_sweep_interval = float(os.getenv('SESSION_SWEEP_INTERVAL', '60'))
+
+        # MCP Configuration
+        self.mcp_config_path = os.getenv('MCP_CONFIG_PATH', '/app/mcp-config.json')
@@ -0,0 +1,51 @@
+from botocore.exceptions import ClientError
+
+from advisor_core.circuit_breaker import CircuitBreaker
+from components.advisor import ai_recommendations
+
+PROFILE = {'investment_amount': 100000, 'risk_tolerance': 'Moderate', 'time_horizon': '5-10 years',
+           'investment_goals': ['Retirement']}
+LOCAL = {'source': 'local', 'target_allocation': {'Stocks': 60.0, 'Bonds': 40.0}, 'expected_return': 6.5,
+         'volatility': 10.0, 'one_year_var_95': 10.0, 'max_drawdown': 20.0,
+         'recommendations': [{'title': 'Local', 'description': 'computed', 'confidence': 80}]}
+
+
+class StubAdvisor:
+    def recommend(self, user_profile):
+        return dict(LOCAL)
+
+
+class StubClient:
+    def __init__(self, reply=None):
+        self.reply = reply
+        self.calls = 0
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_after=60.0)
+
+    def call_bedrock(self, prompt):
+        self.calls += 1
+        if self.reply is None:
+            raise ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'slow down'}}, 'InvokeModel')
+        return self.reply
+
+
+def test_model_answer_replaces_local_recommendations():
+    client = StubClient("1. Buy Index Funds | Low cost and diversified | 85")
+    result = ai_recommendations(client, StubAdvisor(), PROFILE)
+
+    assert result['source'] == 'ai'
+    assert result['recommendations'] == [
+        {'title': 'Buy Index Funds', 'description': 'Low cost and diversified', 'confidence': 85}
+    ]
+    assert client.breaker.state == 'closed'
+
+
+def test_open_circuit_skips_the_model_call():
+    client = StubClient()
+    for _ in range(2):
+        assert ai_recommendations(client, StubAdvisor(), PROFILE)['source'] == 'local'
+
+    result = ai_recommendations(client, StubAdvisor(), PROFILE)
+
+    assert client.calls == 2 and client.breaker.state == 'open'
+    assert result['source'] == 'local' and 'paused' in result['error']
+    assert result['recommendations'] == LOCAL['recommendations']
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from components.backtester import REBALANCE_PERIODS, TRADING_DAYS, Backtester, backtest, benchmark_curve
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(3)
+    return rng.normal(0.0004, [0.012, 0.004, 0.009, 0.0003], size=(300, 4))
+
+
+def day_by_day(returns, weights, period, cost_bps):
+    """Reference loop: drift holdings daily, rebalance (net of costs) at each period end"""
+    days = len(returns)
+    holdings = weights.copy()
+    equity, trades = [1.0], []
+    for day in range(1, days + 1):
+        holdings = holdings * (1.0 + returns[day - 1])
+        value = holdings.sum()
+        equity.append(value)
+        if period and day % period == 0 and day < days:
+            traded = np.abs(holdings / value - weights).sum()
+            trades.append(traded)
+            holdings = weights * value * (1.0 - cost_bps / 1e4 * traded)
+    return np.array(equity), np.array(trades)
+
+
+@pytest.mark.parametrize('policy', ['monthly', 'quarterly', 'never'])
+def test_matches_day_by_day_rebalancing(returns, policy):
+    weights = np.array([[0.6, 0.3, 0.1, 0.0], [0.2, 0.5, 0.2, 0.1]])
+    result = backtest(returns, weights, (policy,), cost_bps=10.0)
+
+    for column, row in enumerate(weights):
+        equity, trades = day_by_day(returns, row, REBALANCE_PERIODS[policy], 10.0)
+        np.testing.assert_allclose(result.equity[0, :, column], equity, rtol=1e-12)
+        years = len(returns) / TRADING_DAYS
+        np.testing.assert_allclose(result.turnover[0, column], trades.sum() / 2.0 / years, rtol=1e-12)
+
+
+def test_never_rebalanced_is_buy_and_hold(returns):
+    weights = np.array([[0.5, 0.5, 0.0, 0.0]])
+    result = backtest(returns, weights, ('never',))
+
+    growth = np.vstack([np.ones(4), np.cumprod(1.0 + returns, axis=0)])
+    np.testing.assert_allclose(result.equity[0, :, 0], growth @ weights[0])
+    assert result.turnover[0, 0] == 0.0
+    np.testing.assert_allclose(benchmark_curve(returns[:, 0], 100.0), 100.0 * growth[:, 0])
+
+
+def test_summary_statistics(returns):
+    result = backtest(returns, np.array([[1.0, 0.0, 0.0, 0.0]]), ('annual',))
+    summary = result.summary()
+    equity = result.equity[0, :, 0]
+
+    assert summary['total_return'][0, 0] == pytest.approx(equity[-1] - 1.0)
+    assert summary['max_drawdown'][0, 0] == pytest.approx(1.0 - (equity / np.maximum.accumulate(equity)).min())
+    assert summary['volatility'][0, 0] == pytest.approx(returns[:, 0].std(ddof=1) * np.sqrt(TRADING_DAYS))
+
+
+def test_performance_window_and_scaling(returns):
+    backtester = Backtester(returns, returns[:, 0])
+    performance = backtester.performance({'Stocks': 60, 'Bonds': 40}, initial_value=1000.0,
+                                         policy='quarterly', cost_bps=0.0, days=120)
+
+    assert len(performance['dates']) == len(performance['portfolio']) == 121
+    assert performance['portfolio'][0] == performance['benchmark'][0] == 1000.0
+    equity, _ = day_by_day(returns[-120:], np.array([0.6, 0.4, 0.0, 0.0]), REBALANCE_PERIODS['quarterly'], 0.0)
+    np.testing.assert_allclose(performance['portfolio'], 1000.0 * equity)
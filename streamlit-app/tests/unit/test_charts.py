@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from components.charts import line_chart, lttb, point_budget
+
+
+def reference_lttb(x, y, threshold):
+    """Point-by-point LTTB as originally published (Steinarsson, 2013)"""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    selected, a = [0], 0
+    for i in range(threshold - 2):
+        avg_start, avg_end = int((i + 1) * every) + 1, min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = np.mean(x[avg_start:avg_end]), np.mean(y[avg_start:avg_end])
+        best, best_area = None, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    return np.array(selected + [n - 1])
+
+
+@pytest.mark.parametrize('n, threshold', [(1000, 100), (1001, 37), (5000, 1000), (10, 3)])
+def test_matches_reference_implementation(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.arange(n, dtype=np.float64)
+    y = np.cumsum(rng.normal(size=n))
+
+    np.testing.assert_array_equal(lttb(x, y, threshold), reference_lttb(x, y, threshold))
+
+
+def test_keeps_endpoints_and_spikes():
+    y = np.zeros(2000)
+    y[777], y[1500] = 50.0, -40.0
+    selected = lttb(np.arange(2000), y, 50)
+
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 1999
+    assert np.all(np.diff(selected) > 0)
+    assert {777, 1500} <= set(selected.tolist())
+
+
+def test_short_series_and_datetime_axis():
+    assert lttb(np.arange(5), np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+
+    dates = np.datetime64('2024-01-01') + np.arange(3000)
+    values = np.sin(np.arange(3000) / 50.0)
+    np.testing.assert_array_equal(lttb(dates, values, 200), lttb(np.arange(3000), values, 200))
+
+
+def test_line_chart_respects_point_budget():
+    dates = np.datetime64('2000-01-03') + np.arange(20000)
+    fig = line_chart(dates, {'Portfolio': np.linspace(1.0, 2.0, 20000)}, title="Growth")
+
+    assert all(len(trace.y) <= point_budget() for trace in fig.data)
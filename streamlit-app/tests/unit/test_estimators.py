@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from components.estimators import TRADING_DAYS, EWMAEstimator
+from components.market_data import ASSET_CLASS_PROXIES, MarketDataProvider
+
+ASSETS = list(ASSET_CLASS_PROXIES)
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(7)
+    return rng.normal(0.0005, 0.01, size=(250, len(ASSETS))) * [1.0, 0.4, 0.8, 0.05]
+
+
+def exponential_weights(estimator, count):
+    """Weights the recursion puts on each bar; the first bar seeds the mean"""
+    weights = (1.0 - estimator.decay) * estimator.decay ** (count - 1 - np.arange(count))
+    weights[0] = estimator.decay ** (count - 1)
+    return weights
+
+
+def test_incremental_updates_match_weighted_moments(returns):
+    estimator = EWMAEstimator(ASSETS, halflife=21)
+    estimator.update_many(returns)
+
+    weights = exponential_weights(estimator, len(returns))
+    mean = weights @ returns
+    centered = returns - mean
+    np.testing.assert_allclose(estimator.mean, mean, atol=1e-15)
+    np.testing.assert_allclose(estimator.covariance, (weights[:, None] * centered).T @ centered, atol=1e-15)
+
+    raw_mean, raw_covariance = estimator.snapshot(shrink=False, annualize=False)
+    annual_mean, annual_covariance = estimator.snapshot(shrink=False)
+    np.testing.assert_allclose(annual_mean, raw_mean * TRADING_DAYS)
+    np.testing.assert_allclose(annual_covariance, raw_covariance * TRADING_DAYS)
+
+
+def test_shrinkage_moves_covariance_toward_scaled_identity(returns):
+    estimator = EWMAEstimator(ASSETS, halflife=10)
+    estimator.update_many(returns[:30])
+
+    _, sample = estimator.snapshot(shrink=False, annualize=False)
+    _, shrunk = estimator.snapshot(annualize=False)
+    intensity, target = estimator.shrinkage_intensity(estimator.covariance, estimator.fourth_moment)
+
+    assert 0.0 < intensity <= 1.0
+    np.testing.assert_allclose(np.trace(target), np.trace(sample))
+    np.testing.assert_allclose(shrunk, intensity * target + (1.0 - intensity) * sample)
+    assert np.linalg.cond(shrunk) < np.linalg.cond(sample)
+
+
+def test_from_market_data_resumes_from_saved_state(tmp_path):
+    provider = MarketDataProvider(store_dir=str(tmp_path / 'market'))
+    provider.load_fixture()
+    path = str(tmp_path / 'ewma.npz')
+    dates, returns, _ = provider.asset_class_returns(assets=ASSETS)
+
+    # Persist state up to an earlier date, then fold in only the newer bars
+    head = EWMAEstimator(ASSETS)
+    head.update_many(returns[:100], dates[:100])
+    head.save(path)
+    resumed = EWMAEstimator.from_market_data(provider, ASSETS, path=path)
+
+    full = EWMAEstimator(ASSETS)
+    full.update_many(returns, dates)
+    assert resumed.observations == full.observations
+    assert resumed.last_date == str(dates[-1])
+    np.testing.assert_allclose(resumed.covariance, full.covariance)
+    np.testing.assert_allclose(EWMAEstimator.load(path).mean, full.mean)
+
+
+def test_from_market_data_rebuilds_state_saved_for_other_assets(tmp_path):
+    provider = MarketDataProvider(store_dir=str(tmp_path / 'market'))
+    provider.load_fixture()
+    path = str(tmp_path / 'ewma.npz')
+    EWMAEstimator.from_market_data(provider, ['stocks', 'bonds'], path=path)
+
+    # Same number of assets, different universe: the saved covariance must not be reused
+    rebuilt = EWMAEstimator.from_market_data(provider, ['stocks', 'cash'], path=path)
+    _, returns, _ = provider.asset_class_returns(assets=['stocks', 'cash'])
+    full = EWMAEstimator(['stocks', 'cash'])
+    full.update_many(returns)
+
+    assert rebuilt.assets == ['stocks', 'cash']
+    np.testing.assert_allclose(rebuilt.covariance, full.covariance)
+    assert EWMAEstimator.load(path).assets == ['stocks', 'cash']
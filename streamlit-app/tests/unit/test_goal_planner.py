@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from components.goal_planner import Goal, GoalPlanner, lognormal_parameters, standard_shocks
+
+
+def deterministic(expected_return=0.05):
+    """No volatility and no inflation: every path earns exactly ``expected_return``"""
+    return GoalPlanner(expected_return, 0.0, paths=200, inflation=0.0)
+
+
+def test_lognormal_parameters_match_the_moments():
+    mu, sigma = lognormal_parameters(0.07, 0.15)
+    draws = np.exp(mu + sigma * np.random.default_rng(0).standard_normal(400000)) - 1.0
+
+    assert draws.mean() == pytest.approx(0.07, abs=2e-3)
+    assert draws.std() == pytest.approx(0.15, abs=2e-3)
+
+
+def test_shocks_are_shared_and_prefix_stable():
+    short, long = standard_shocks(300, 5, seed=3), standard_shocks(300, 80, seed=3)
+
+    np.testing.assert_array_equal(short, long[:5])
+    assert long.shape == (80, 300) and not long.flags.writeable
+
+
+def test_success_probability_of_a_deterministic_target():
+    planner = deterministic()
+    # 100 grows to 162.9 after ten years
+    reached, missed = Goal('Reached', 160, 10, kind='target'), Goal('Missed', 170, 10, kind='target')
+
+    assert planner.success_probability(100, 0, [reached, missed]).tolist() == [1.0, 0.0]
+    assert planner.simulate(100, 0, [reached])['wealth'][-1] == pytest.approx(np.full(200, 100 * 1.05 ** 10))
+
+
+def test_withdrawals_are_paid_in_order_and_inflated():
+    planner = GoalPlanner(0.0, 0.0, paths=10, inflation=0.10)
+    first, second = Goal('First', 50, 1), Goal('Second', 100, 1)
+
+    assert planner.schedule([first], 2).tolist() == [[pytest.approx(55.0), 0.0]]
+    # 100 covers the first goal's 55, leaving 45 of the second goal's 110
+    result = planner.simulate(100, 0, [first, second])
+    assert result['shortfall'][:, 0].tolist() == pytest.approx([0.0, 65.0])
+    assert planner.success_probability(100, 0, [first, second]).tolist() == [1.0, 0.0]
+
+
+def test_success_probability_rises_with_the_contribution():
+    planner = GoalPlanner(0.06, 0.15, paths=2000)
+    goals = [Goal.from_template('Education'), Goal.from_template('Home Purchase')]
+
+    probabilities = planner.success_probability(20000, np.linspace(0, 20000, 9), goals)
+    assert probabilities.shape == (9, 2)
+    assert np.all(np.diff(probabilities, axis=0) >= 0)
+    assert probabilities[0].max() < probabilities[-1].min()
+
+
+def test_bisection_finds_the_deterministic_contribution():
+    planner = deterministic(0.0)
+    # Five equal contributions must cover 99% of the 1000 target
+    goal = Goal('Target', 1000, 5, kind='target')
+
+    required = planner.required_contribution(0, [goal], precision=1.0)
+    assert 198.0 <= required <= 199.0
+
+
+def test_required_contribution_meets_the_target_probability():
+    planner = GoalPlanner(0.06, 0.15, paths=2000)
+    goals = [Goal.from_template('Education'), Goal.from_template('Home Purchase')]
+
+    required = planner.required_contributions(10000, goals, 0.8, precision=10.0)
+    assert len(required) == 3 and required[-1] >= max(required[:2])
+    at_required = planner.success_probability(10000, required[-1], goals).min()
+    just_below = planner.success_probability(10000, required[-1] - 10.0, goals).min()
+    assert at_required >= 0.8 > just_below
+
+
+def test_funded_unreachable_and_empty_goals():
+    planner = deterministic()
+
+    assert planner.required_contribution(1000, [Goal('Small', 100, 3, kind='target')]) == 0.0
+    assert planner.required_contribution(0, [Goal('Huge', 1e9, 1, kind='target')], upper=1000.0) is None
+    assert planner.required_contributions(1000, []) == [0.0]
+
+
+def test_required_contributions_are_cached_per_inputs():
+    planner = deterministic()
+    goals = [Goal('Target', 5000, 5, kind='target')]
+
+    first = planner.required_contributions(0, goals)
+    first.append('changed by the caller')
+    assert planner.required_contributions(0, goals) == first[:-1]
+    assert len(planner._required) == 1
+
+
+def test_plan_rows_and_goal_validation():
+    rows = deterministic().plan(1000, 100, [Goal.from_template('Education', amount=500)])
+
+    assert rows[0]['goal'] == 'Education' and rows[0]['years'] == '10-13'
+    assert set(rows[0]) == {'goal', 'kind', 'amount', 'years', 'success_probability', 'required_contribution'}
+    with pytest.raises(ValueError):
+        Goal('Bad', 100, 1, kind='loan')
@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from utils.jobs import DONE, FAILED, JobQueue
+
+
+@pytest.fixture
+def queue():
+    return JobQueue(max_workers=2, ttl=60.0, max_jobs=3)
+
+
+def wait_done(queue, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while not queue.get(job_id).done:
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.005)
+    return queue.get(job_id)
+
+
+def test_result_and_failure(queue):
+    ok = wait_done(queue, queue.submit(lambda a, b=0: a + b, 2, b=3))
+    failed = wait_done(queue, queue.submit(lambda: 1 / 0))
+
+    assert (ok.state, ok.result, ok.error) == (DONE, 5, None)
+    assert failed.state == FAILED and 'division' in failed.error
+    assert ok.finished is not None and ok.elapsed >= 0.0
+
+
+def test_keyed_submissions_share_a_running_job_only(queue):
+    release = threading.Event()
+    first = queue.submit(release.wait, key='profile')
+    assert queue.submit(release.wait, key='profile') == first
+
+    release.set()
+    wait_done(queue, first)
+    assert queue.submit(lambda: None, key='profile') != first
+
+
+def test_expired_jobs_are_evicted(queue):
+    job_id = queue.submit(lambda: 'old')
+    wait_done(queue, job_id).finished -= 61.0
+
+    queue.submit(lambda: 'new')
+    assert queue.get(job_id) is None
+
+
+def test_oldest_finished_jobs_go_first_and_running_jobs_stay(queue):
+    release = threading.Event()
+    running = queue.submit(release.wait)
+    finished = [queue.submit(lambda i=i: i) for i in range(3)]
+    for job_id in finished:
+        wait_done(queue, job_id)
+
+    # Over max_jobs: the oldest finished job makes room, the running one is kept
+    queue.submit(lambda: 'next')
+    assert queue.get(finished[0]) is None
+    assert queue.get(running) is not None and not queue.get(running).done
+    assert all(queue.get(job_id) is not None for job_id in finished[1:])
+
+    release.set()
+    wait_done(queue, running)
+
+
+def test_keyed_expiry_clears_the_key(queue):
+    job_id = queue.submit(lambda: 1, key='k')
+    wait_done(queue, job_id).finished -= 61.0
+    queue.submit(lambda: 2)
+
+    assert queue.get(job_id) is None
+    assert 'k' not in queue._by_key
@@ -0,0 +1,50 @@
+import csv
+
+import numpy as np
+import pytest
+
+from components.market_data import FIXTURE_PATH, MarketDataProvider
+
+
+@pytest.fixture
+def provider(tmp_path):
+    provider = MarketDataProvider(store_dir=str(tmp_path / 'market'))
+    provider.load_fixture()
+    return provider
+
+
+def fixture_closes(ticker):
+    with open(FIXTURE_PATH, 'r', encoding='utf-8') as handle:
+        rows = list(csv.DictReader(handle))
+    return [row['date'] for row in rows], np.array([float(row[ticker]) for row in rows])
+
+
+def test_get_returns_matches_fixture_closes(provider):
+    dates, closes = fixture_closes('VTI')
+    returns_dates, returns = provider.get_returns(['VTI', 'SPY'])
+
+    assert returns.shape == (len(dates) - 1, 2)
+    assert str(returns_dates[0]) == dates[1]
+    np.testing.assert_allclose(returns[:, 0], closes[1:] / closes[:-1] - 1.0)
+
+
+def test_get_returns_aligns_on_shared_dates(provider):
+    all_dates, _ = provider.get_prices('VTI')
+    # Every other bar only, so just half the dates are shared
+    provider.store.append('GAPS', all_dates[::2], np.linspace(10.0, 20.0, len(all_dates[::2])))
+
+    dates, returns = provider.get_returns(['VTI', 'GAPS'])
+
+    np.testing.assert_array_equal(dates, all_dates[::2][1:])
+    vti = dict(zip(*provider.get_prices('VTI')))
+    shared = [vti[d] for d in all_dates[::2]]
+    np.testing.assert_allclose(returns[:, 0], np.diff(shared) / shared[:-1])
+
+
+def test_get_returns_window_and_unknown_ticker(provider):
+    dates, returns = provider.get_returns(['VTI'], start='2023-02-01', end='2023-02-28')
+    assert dates.min() > np.datetime64('2023-02-01')
+    assert dates.max() <= np.datetime64('2023-02-28')
+
+    dates, returns = provider.get_returns(['VTI', 'MISSING'])
+    assert len(dates) == 0 and returns.shape == (0, 2)
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pytest
+
+from advisor_core.allocation import ASSET_CLASSES, HORIZON_BUCKETS, HORIZON_UPPER_BOUNDS, assumption_moments
+from components.portfolio_optimizer import FrontierTable, PortfolioOptimizer
+from config.settings import Settings
+
+
+@pytest.fixture(scope='module')
+def table():
+    return FrontierTable.build(*assumption_moments(), levels=64)
+
+
+def test_build_sorts_each_horizon_by_volatility(table):
+    assert table.weights.shape == (len(HORIZON_BUCKETS), 64, len(ASSET_CLASSES))
+    assert table.volatility.dtype == np.float32
+    assert np.all(np.diff(table.volatility, axis=1) >= 0)
+    np.testing.assert_allclose(table.weights.sum(axis=-1), 1.0, atol=1e-5)
+    assert np.all(table.weights <= HORIZON_UPPER_BOUNDS[:, None, :] + 1e-5)
+
+
+def test_save_load_round_trip(table, tmp_path):
+    path = tmp_path / 'nested' / 'frontier.npz'
+    table.save(str(path))
+    loaded = FrontierTable.load(str(path))
+
+    assert (loaded.assets, loaded.horizons) == (table.assets, table.horizons)
+    for name in ('volatility', 'expected_return', 'weights'):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(table, name))
+    assert os.listdir(path.parent) == ['frontier.npz']
+
+
+def test_lookup_interpolates_between_grid_points(table):
+    bucket, row = 2, 20
+    low, high = table.volatility[bucket, row:row + 2].astype(np.float64)
+    assert high > low
+    target = low + 0.25 * (high - low)
+
+    weights, expected, volatility = table.lookup(target, HORIZON_BUCKETS[bucket])
+    np.testing.assert_allclose(weights, 0.75 * table.weights[bucket, row] + 0.25 * table.weights[bucket, row + 1],
+                               rtol=1e-5)
+    assert expected == pytest.approx(0.75 * table.expected_return[bucket, row]
+                                     + 0.25 * table.expected_return[bucket, row + 1], rel=1e-5)
+    assert volatility == pytest.approx(target)
+
+
+def test_lookup_clamps_to_the_frontier_ends(table):
+    low_weights, _, low_volatility = table.lookup(0.0, '1-3 years')
+    high_weights, _, high_volatility = table.lookup(5.0, '1-3 years')
+
+    np.testing.assert_array_equal(low_weights, table.weights[0, 0])
+    np.testing.assert_array_equal(high_weights, table.weights[0, -1])
+    assert (low_volatility, high_volatility) == (pytest.approx(table.volatility[0, 0]),
+                                                 pytest.approx(table.volatility[0, -1]))
+    # Unknown horizons use the longest bucket
+    np.testing.assert_array_equal(table.lookup(5.0, '30 years')[0], table.weights[-1, -1])
+
+
+def test_lookup_many_matches_lookup(table):
+    targets = np.array([0.0, 0.03, 0.055, 0.08, 0.1234, 0.5])
+    buckets = np.array([0, 1, 2, 3, 3, 1])
+
+    batched = table.lookup_many(targets, buckets)
+    for target, bucket, weights in zip(targets, buckets, batched):
+        np.testing.assert_allclose(weights, table.lookup(target, HORIZON_BUCKETS[bucket])[0], atol=1e-6)
+
+
+def test_optimizer_builds_and_saves_a_missing_table(tmp_path):
+    settings = Settings()
+    settings.market_data_dir = str(tmp_path / 'market')
+    settings.frontier_table_path = str(tmp_path / 'frontier.npz')
+    optimizer = PortfolioOptimizer(settings=settings)
+
+    assert os.path.exists(settings.frontier_table_path)
+    allocation = optimizer.allocation(5.5, '5-10 years')
+    assert sum(allocation.values()) == pytest.approx(100.0, abs=0.5)
+    assert optimizer.allocation(9.0, '1-3 years')['Stocks'] <= HORIZON_UPPER_BOUNDS[0][0] * 100 + 0.1
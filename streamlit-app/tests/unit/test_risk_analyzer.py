@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from components.risk_analyzer import TRADING_DAYS, RiskAnalyzer
+from utils.snapshots import USER_DATA_PREFIX, compact_user_data
+from utils.storage import LocalStorage
+
+
+@pytest.fixture
+def analyzer():
+    rng = np.random.default_rng(11)
+    returns = rng.normal(0.0003, [0.012, 0.004, 0.009, 0.0003], size=(500, 4))
+    return RiskAnalyzer(asset_returns=returns, benchmark_returns=returns[:, 0], chunk_size=3)
+
+
+def one_portfolio(analyzer, weights):
+    """Reference metrics for a single weight vector, straight from its return series"""
+    series = analyzer.asset_returns @ weights
+    tail = int(0.05 * len(series))
+    worst = np.sort(series)[:tail]
+    wealth = np.cumprod(1.0 + series)
+    peak = np.maximum(np.maximum.accumulate(wealth), 1.0)
+    return {
+        'expected_return': series.mean() * TRADING_DAYS,
+        'volatility': series.std(ddof=1) * np.sqrt(TRADING_DAYS),
+        'var_95_daily': -worst[-1],
+        'cvar_95_daily': -worst.mean(),
+        'beta': np.cov(series, analyzer.benchmark_returns)[0, 1] / analyzer.benchmark_returns.var(ddof=1),
+        'max_drawdown': 1.0 - (wealth / peak).min(),
+    }
+
+
+def test_compute_matches_per_portfolio_reference(analyzer):
+    weights = np.array([[60, 30, 10, 0], [20, 50, 20, 10], [0, 0, 0, 100], [25, 25, 25, 25], [100, 0, 0, 0]])
+    metrics = analyzer.compute(weights)
+
+    for row, values in enumerate(weights / weights.sum(axis=1, keepdims=True)):
+        for name, expected in one_portfolio(analyzer, values).items():
+            assert metrics[name][row] == pytest.approx(expected, rel=1e-9, abs=1e-12), name
+    assert metrics['effective_assets'][3] == pytest.approx(4.0)
+
+
+def test_analyze_book_reuses_only_identical_inputs(analyzer, tmp_path):
+    analyzer.cache_dir = str(tmp_path / 'risk')
+    weights = np.array([[0.6, 0.4, 0.0, 0.0], [0.2, 0.8, 0.0, 0.0]])
+
+    book = analyzer.analyze_book('2024-06-30', ['a', 'b'], weights)
+    assert analyzer.analyze_book('2024-06-30', ['a', 'b'], weights.copy()) is book
+    assert book.lookup('b')['volatility'] == pytest.approx(analyzer.assess({'stocks': 20, 'bonds': 80})['volatility'])
+    assert book.lookup('missing') is None
+
+    changed = analyzer.analyze_book('2024-06-30', ['a', 'b'], weights[::-1])
+    assert changed.digest != book.digest
+    assert changed.lookup('a')['volatility'] == pytest.approx(book.lookup('b')['volatility'])
+
+    # A fresh analyzer finds the book on disk under its content digest
+    fresh = RiskAnalyzer(analyzer.asset_returns, analyzer.benchmark_returns, cache_dir=analyzer.cache_dir)
+    reloaded = fresh.analyze_book('2024-06-30', ['a', 'b'], weights)
+    np.testing.assert_allclose(reloaded.metrics['var_95_daily'], book.metrics['var_95_daily'])
+
+
+def test_book_caches_are_bounded(analyzer):
+    analyzer.book_cache_size = 2
+    for day in range(1, 6):
+        analyzer.analyze_book(f"2024-07-0{day}", ['a'], np.array([[1.0, 0.0, 0.0, 0.0]]))
+
+    assert list(analyzer._books) == ['2024-07-04', '2024-07-05']
+    assert analyzer.lookup('2024-07-01', 'a') is None
+
+
+def test_load_book_follows_recompaction(analyzer, tmp_path, monkeypatch):
+    storage = LocalStorage(str(tmp_path / 'bucket'))
+    storage.put_json(f"{USER_DATA_PREFIX}u1.json", {'user_id': 'u1', 'risk_tolerance': 'Moderate',
+                                                     'current_portfolio': {'Stocks': 60, 'Bonds': 40}})
+    storage.put_json(f"{USER_DATA_PREFIX}u2.json", {'user_id': 'u2', 'risk_tolerance': 'Conservative',
+                                                     'current_portfolio': {'Bonds': 100}})
+    compact_user_data(storage, snapshot_date='2024-06-30')
+
+    book = analyzer.load_book(storage, '2024-06-30')
+    assert sorted(book.user_ids) == ['u1', 'u2']
+    assert analyzer.load_book(storage, '2024-06-30') is book
+
+    storage.put_json(f"{USER_DATA_PREFIX}u1.json", {'user_id': 'u1', 'risk_tolerance': 'Aggressive',
+                                                     'current_portfolio': {'Stocks': 100}})
+    compact_user_data(storage, snapshot_date='2024-06-30')
+    updated = analyzer.load_book(storage, '2024-06-30')
+
+    assert updated is not book and len(updated) == 2
+    assert updated.lookup('u1')['volatility'] == pytest.approx(analyzer.assess({'stocks': 100})['volatility'])
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from advisor_core.allocation import assumption_moments, horizon_bucket, score_to_volatility
+from components.portfolio_optimizer import FrontierTable, PortfolioOptimizer
+from components.sensitivity import METRICS, SensitivitySweep
+from config.settings import Settings
+
+AMOUNTS = [10000, 50000, 250000]
+HORIZONS = [2, 4, 7, 20]
+SCORES = [2.0, 5.0, 8.0]
+
+
+@pytest.fixture(scope='module')
+def sweep(tmp_path_factory):
+    settings = Settings()
+    settings.market_data_dir = str(tmp_path_factory.mktemp('market'))  # no history: capital market assumptions
+    table = FrontierTable.build(*assumption_moments(), levels=64)
+    return SensitivitySweep(PortfolioOptimizer(table, settings), paths=2000)
+
+
+@pytest.mark.parametrize('years, open_ended, bucket', [
+    (1, False, 0), (3, False, 0), (4, False, 1), (5, False, 1), (10, False, 2), (11, False, 3),
+    (10, True, 3), (3, True, 1),
+])
+def test_horizon_bucket(years, open_ended, bucket):
+    assert horizon_bucket(years, open_ended) == bucket
+
+
+def test_result_shapes(sweep):
+    result = sweep.run(AMOUNTS, HORIZONS, SCORES)
+
+    assert set(result.metrics) == set(METRICS)
+    for values in result.metrics.values():
+        assert values.shape == (len(AMOUNTS), len(HORIZONS), len(SCORES))
+    assert result.weights.shape == (len(HORIZONS), len(SCORES), len(sweep.optimizer.table.assets))
+    assert result.slice('median_value', amount=50000).shape == (len(HORIZONS), len(SCORES))
+    assert result.slice('median_value', horizon=7).shape == (len(AMOUNTS), len(SCORES))
+
+
+def test_allocations_follow_the_frontier_table(sweep):
+    result = sweep.run(AMOUNTS, HORIZONS, SCORES)
+    table = sweep.optimizer.table
+
+    for row, years in enumerate(HORIZONS):
+        expected = table.lookup_many([score_to_volatility(score) for score in SCORES],
+                                     [horizon_bucket(years)] * len(SCORES))
+        np.testing.assert_allclose(result.weights[row], expected)
+    np.testing.assert_allclose(result.weights.sum(axis=-1), 1.0, atol=1e-5)
+
+
+def test_monotone_in_risk_horizon_and_amount(sweep):
+    metrics = sweep.run(AMOUNTS, HORIZONS, SCORES).metrics
+
+    # More risk tolerance never lowers volatility or the stock share
+    assert np.all(np.diff(metrics['volatility'], axis=2) >= -1e-9)
+    assert np.all(np.diff(metrics['stocks_weight'], axis=2) >= -1e-9)
+    # Longer horizons lift the equity caps
+    assert np.all(np.diff(metrics['stocks_weight'], axis=1) >= -1e-9)
+    # Without contributions, outcomes scale with the amount and the loss probability does not depend on it
+    np.testing.assert_allclose(metrics['median_value'] / np.array(AMOUNTS)[:, None, None],
+                               np.broadcast_to(metrics['median_value'][:1] / AMOUNTS[0], metrics['median_value'].shape))
+    np.testing.assert_allclose(metrics['probability_of_loss'], metrics['probability_of_loss'][:1].repeat(3, 0))
+    assert np.all(metrics['p05_value'] <= metrics['median_value'])
+    # Median growth compounds with the horizon
+    assert np.all(np.diff(metrics['median_value'], axis=1) > 0)
+
+
+def test_contributions_add_value_and_results_are_cached(sweep):
+    plain = sweep.run(AMOUNTS, HORIZONS, SCORES)
+    funded = sweep.run(AMOUNTS, HORIZONS, SCORES, contribution=5000)
+
+    assert sweep.run(AMOUNTS, HORIZONS, SCORES) is plain
+    assert np.all(funded.metrics['median_value'] > plain.metrics['median_value'])
+    # A one-year horizon's single contribution arrives at the end and does not grow
+    one_year = sweep.run([10000], [1], [5.0])
+    one_year_funded = sweep.run([10000], [1], [5.0], contribution=5000)
+    assert one_year_funded.metrics['median_value'][0, 0, 0] == pytest.approx(
+        one_year.metrics['median_value'][0, 0, 0] + 5000)
+    assert sweep.cached_bytes() > 0
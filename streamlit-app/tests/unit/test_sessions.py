@@ -0,0 +1,96 @@
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from utils.sessions import LOCAL_SESSION, SessionRecord, SessionRegistry, current_session_id, deep_size
+
+PROFILE = {'investment_amount': 250000, 'risk_tolerance': 'Aggressive', 'time_horizon': '10+ years',
+           'investment_goals': ['Income Generation', 'Retirement'], 'risk_score': 7.5}
+
+
+def test_record_stores_the_profile_compactly():
+    record = SessionRecord('abc')
+    record.update(PROFILE)
+
+    assert record.profile == PROFILE
+    assert record.goals == bytes([4, 0])  # selection order kept
+    record.update({**PROFILE, 'risk_score': None})
+    assert 'risk_score' not in record.profile
+
+
+def test_session_is_created_once_and_marked_seen():
+    registry = SessionRegistry(idle_ttl=60.0, sweep_interval=60.0)
+    record = registry.session('a')
+    record.last_seen -= 30
+
+    assert registry.session('a') is record
+    assert time.time() - record.last_seen < 1.0
+    assert len(registry) == 1
+
+
+def test_evict_idle_drops_only_stale_records():
+    registry = SessionRegistry(idle_ttl=60.0, sweep_interval=3600.0)
+    stale, fresh = registry.session('stale'), registry.session('fresh')
+    now = time.time()
+    stale.last_seen = now - 61
+    fresh.last_seen = now - 59
+
+    assert registry.evict_idle(now) == ['stale']
+    assert len(registry) == 1 and registry.session('fresh') is fresh
+    # A returning tab gets a new, default record
+    assert registry.session('stale') is not stale
+
+
+def test_session_calls_sweep_at_most_once_per_interval():
+    registry = SessionRegistry(idle_ttl=10.0, sweep_interval=3600.0)
+    registry.session('idle').last_seen -= 100
+    registry.session('other')
+    assert len(registry) == 2  # sweep not due yet
+
+    registry._last_sweep -= 3600
+    registry.session('other')
+    assert len(registry) == 1
+
+
+def test_report_is_sorted_by_size():
+    registry = SessionRegistry()
+    small, large = registry.session('small-session'), registry.session('large-session')
+    large.measure({'prices': np.zeros(10000)})
+
+    rows = registry.report()
+    assert [row['session'] for row in rows] == ['large-se', 'small-se']
+    assert rows[0]['state_bytes'] >= 80000 and rows[1]['state_bytes'] == 0
+    assert rows[1]['record_bytes'] == deep_size(small) > 0
+
+
+def test_deep_size_counts_arrays_and_shared_objects_once():
+    array = np.zeros(1000)
+    shared = [array, array[:10], array[500:]]
+    alone = deep_size(array)
+
+    assert alone >= 8000
+    assert deep_size(shared) < alone + 1000
+    assert deep_size({'a': shared, 'b': shared}) < deep_size(shared) + 1000
+
+
+def test_deep_size_follows_slots_and_survives_cycles():
+    record = SessionRecord('x' * 1000)
+    cycle = []
+    cycle.append(cycle)
+
+    assert deep_size(record) >= 1000
+    assert deep_size(cycle) == sys.getsizeof(cycle, 0)
+
+
+def test_current_session_id_outside_a_script():
+    assert current_session_id() == LOCAL_SESSION
+
+
+@pytest.mark.parametrize('field', ['tolerance', 'horizon'])
+def test_unknown_option_is_rejected(field):
+    record = SessionRecord('x')
+    bad = {**PROFILE, 'risk_tolerance' if field == 'tolerance' else 'time_horizon': 'Reckless'}
+    with pytest.raises(ValueError):
+        record.update(bad)
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from utils.snapshots import USER_DATA_PREFIX, compact_user_data, parse_partition, read_snapshots
+from utils.storage import LocalStorage
+
+RISK_TOLERANCES = ('Conservative', 'Moderate', 'Aggressive')
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = LocalStorage(str(tmp_path / 'bucket'))
+    for i in range(30):
+        storage.put_json(f"{USER_DATA_PREFIX}user-{i:02d}.json", {
+            'user_id': f"user-{i:02d}",
+            'risk_tolerance': RISK_TOLERANCES[i % 3],
+            'investment_amount': 1000 * (i + 1),
+            'time_horizon': '5-10 years',
+            'current_portfolio': {'Stocks': 60, 'Bonds': 30, 'Cash': 5, 'Crypto': 5},
+            'timestamp': '2024-06-30T12:00:00',
+        })
+    return storage
+
+
+def test_compaction_writes_one_partition_per_risk_tolerance(storage):
+    keys = compact_user_data(storage, snapshot_date='2024-06-30')
+
+    assert len(keys) == 3
+    assert sorted(parse_partition(key)['risk_tolerance'] for key in keys) == ['aggressive', 'conservative', 'moderate']
+    assert all(parse_partition(key)['snapshot_date'] == '2024-06-30' for key in keys)
+
+
+def test_read_back_with_projection_and_filters(storage):
+    compact_user_data(storage, snapshot_date='2024-06-30')
+
+    table = read_snapshots(storage)
+    assert table.num_rows == 30
+    row = table.filter(table.column('user_id').to_numpy(zero_copy_only=False) == 'user-04').to_pylist()[0]
+    assert (row['stocks'], row['bonds'], row['alternatives'], row['cash']) == (60, 30, 0, 5)
+    assert json.loads(row['other_allocation']) == {'crypto': 5}
+    assert row['risk_tolerance'] == 'moderate'
+
+    table = read_snapshots(storage, columns=['user_id', 'investment_amount'],
+                           filters=[('risk_tolerance', '=', 'aggressive'), ('investment_amount', '>=', 20000)])
+    assert table.column_names == ['user_id', 'investment_amount']
+    assert table.column('user_id').to_pylist() == ['user-20', 'user-23', 'user-26', 'user-29']
+
+
+def test_recompaction_replaces_the_date_and_keeps_others(storage):
+    compact_user_data(storage, snapshot_date='2024-06-30')
+    storage.put_json(f"{USER_DATA_PREFIX}user-30.json", {'user_id': 'user-30', 'risk_tolerance': 'Moderate'})
+    compact_user_data(storage, snapshot_date='2024-07-01')
+    compact_user_data(storage, snapshot_date='2024-06-30')
+
+    assert read_snapshots(storage, filters=[('snapshot_date', '=', '2024-06-30')]).num_rows == 31
+    assert read_snapshots(storage, filters=[('snapshot_date', '=', '2024-07-01')]).num_rows == 31
+    assert read_snapshots(storage, filters=[('snapshot_date', '=', '2024-01-01')]).num_rows == 0
+
+
+def test_rejects_unknown_operators(storage):
+    with pytest.raises(ValueError):
+        read_snapshots(storage, filters=[('user_id', 'like', 'user-%')])
+
+
+def test_recompaction_drops_partitions_a_changed_client_left(storage):
+    compact_user_data(storage, snapshot_date='2024-06-30')
+    # Every Conservative client moves to Aggressive
+    for i in range(0, 30, 3):
+        record = storage.get_json(f"{USER_DATA_PREFIX}user-{i:02d}.json")
+        storage.put_json(f"{USER_DATA_PREFIX}user-{i:02d}.json", dict(record, risk_tolerance='Aggressive'))
+
+    keys = compact_user_data(storage, snapshot_date='2024-06-30')
+    table = read_snapshots(storage, columns=['user_id', 'risk_tolerance'])
+
+    assert sorted(parse_partition(key)['risk_tolerance'] for key in keys) == ['aggressive', 'moderate']
+    assert sorted(storage.list_keys('snapshots/', suffix='.parquet')) == sorted(keys)
+    assert table.num_rows == 30 and len(set(table.column('user_id').to_pylist())) == 30
+    row = table.filter(table.column('user_id').to_numpy(zero_copy_only=False) == 'user-00').to_pylist()
+    assert row == [{'user_id': 'user-00', 'risk_tolerance': 'aggressive'}]
@@ -0,0 +1,67 @@
+import os
+import threading
+
+import pytest
+
+from utils.storage import LocalStorage, StorageBackend
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(str(tmp_path / 'bucket'))
+
+
+def test_round_trip_ranges_and_sizes(storage):
+    storage.put_bytes('reports/a.bin', bytes(range(256)) * 100)
+    storage.put_json('user-data/u1.json', {'user_id': 'u1'})
+
+    assert storage.size('reports/a.bin') == 25600
+    assert storage.get_range('reports/a.bin', 10, 19) == bytes(range(10, 20))
+    assert storage.download_large('reports/a.bin', part_size=1000) == bytes(range(256)) * 100
+    assert storage.get_json('user-data/u1.json') == {'user_id': 'u1'}
+    assert storage.list_keys('user-data/', suffix='.json') == ['user-data/u1.json']
+
+
+def test_listing_skips_temp_files(storage):
+    storage.put_bytes('data/x.json', b'{}')
+    # An abandoned write, as left by a crashed put_bytes
+    open(os.path.join(storage.root, 'data', '.x.json.abc123.tmp'), 'wb').close()
+
+    assert storage.list_keys('data/') == ['data/x.json']
+
+
+def test_concurrent_writers_of_one_key(storage):
+    payloads = [bytes([i]) * 200_000 for i in range(8)]
+    threads = [threading.Thread(target=storage.put_bytes, args=('shared/key.bin', p)) for p in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert storage.get_bytes('shared/key.bin') in payloads
+    assert os.listdir(os.path.join(storage.root, 'shared')) == ['key.bin']
+
+
+def test_bulk_operations(storage):
+    items = {f"batch/{i:03d}.json": f'{{"n": {i}}}'.encode() for i in range(40)}
+    storage.put_many(items)
+
+    assert storage.get_many(items) == items
+    assert storage.load_json_prefix('batch/')['batch/007.json'] == {'n': 7}
+
+
+def test_keys_cannot_escape_root(storage):
+    with pytest.raises(ValueError):
+        storage.put_bytes('../outside.bin', b'x')
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        StorageBackend()
+
+
+def test_delete_many_ignores_missing_keys(storage):
+    storage.put_many({'d/a.bin': b'a', 'd/b.bin': b'b'})
+    storage.delete_many(['d/a.bin', 'd/missing.bin'])
+
+    assert storage.list_keys('d/') == ['d/b.bin']
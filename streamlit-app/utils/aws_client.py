@@ -0,0 +1,45 @@
+"""
+AWS Client
+Connectivity checks and service access for the Streamlit app
+"""
+
+import logging
+from typing import Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from config.settings import Settings
+from advisor_core.aws_clients import get_client
+
+logger = logging.getLogger(__name__)
+
+
+class AWSClient:
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or Settings()
+
+    @property
+    def s3(self):
+        return get_client('s3', settings=self.settings)
+
+    @property
+    def bedrock_runtime(self):
+        return get_client('bedrock-runtime', settings=self.settings)
+
+    def check_connection(self) -> bool:
+        """Check that AWS credentials resolve to an identity"""
+        try:
+            get_client('sts', settings=self.settings).get_caller_identity()
+            return True
+        except (BotoCoreError, ClientError) as e:
+            logger.warning(f"AWS connection check failed: {str(e)}")
+            return False
+
+    def check_bedrock_access(self) -> bool:
+        """Check that Bedrock foundation models can be listed"""
+        try:
+            get_client('bedrock', settings=self.settings).list_foundation_models(byOutputModality='TEXT')
+            return True
+        except (BotoCoreError, ClientError) as e:
+            logger.warning(f"Bedrock access check failed: {str(e)}")
+            return False
@@ -0,0 +1,109 @@
+"""
+Background Jobs
+Process-wide queue for slow calls (AI analysis) so Streamlit script runs
+submit work, return immediately and poll for the result
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class Job:
+    """State of one submitted call; read by any session that holds its id"""
+
+    __slots__ = ('job_id', 'key', 'state', 'result', 'error', 'submitted', 'started', 'finished')
+
+    def __init__(self, job_id: str, key: Optional[str]):
+        self.job_id = job_id
+        self.key = key
+        self.state = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in (DONE, FAILED)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.time()) - (self.started or self.submitted)
+
+
+class JobQueue:
+    """Bounded worker pool plus a job table shared by every session in the process.
+
+    Submitting returns a job id at once; the call runs on one of
+    ``max_workers`` threads, so slow model calls never hold a Streamlit
+    script thread. Jobs submitted with the same ``key`` while one is still
+    queued or running share that job, so identical requests from several
+    sessions cost one call; once it has finished, a new submission starts a
+    new call. Finished jobs expire after ``ttl`` and the table never holds
+    more than ``max_jobs`` entries.
+    """
+
+    def __init__(self, max_workers: int = 4, ttl: float = 900.0, max_jobs: int = 1000):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-job')
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._by_key: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args, key: Optional[str] = None, **kwargs) -> str:
+        with self._lock:
+            self._evict()
+            if key is not None:
+                existing = self._jobs.get(self._by_key.get(key, ''))
+                if existing is not None and not existing.done:
+                    return existing.job_id
+            job = Job(uuid.uuid4().hex, key)
+            self._jobs[job.job_id] = job
+            if key is not None:
+                self._by_key[key] = job.job_id
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.job_id
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id) if job_id else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.state] += 1
+            return counts
+
+    def _run(self, job: Job, fn: Callable[..., Any], args, kwargs):
+        job.started = time.time()
+        job.state = RUNNING
+        try:
+            result, error, state = fn(*args, **kwargs), None, DONE
+        except Exception as e:
+            logger.warning(f"Job {job.job_id} failed: {str(e)}")
+            result, error, state = None, str(e), FAILED
+        # finished is set before the terminal state is published, so done jobs always have it
+        job.result, job.error, job.finished = result, error, time.time()
+        job.state = state
+
+    def _evict(self):
+        """Drop expired finished jobs, then the oldest finished ones beyond max_jobs (lock held)"""
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            over = len(self._jobs) > self.max_jobs
+            if job.done and job.finished is not None and (over or now - job.finished > self.ttl):
+                del self._jobs[job_id]
+                if job.key is not None and self._by_key.get(job.key) == job_id:
+                    del self._by_key[job.key]
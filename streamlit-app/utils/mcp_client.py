@@ -0,0 +1,61 @@
+"""
+MCP Client
+Configured MCP server discovery and Bedrock text generation for the
+Streamlit app
+"""
+
+import copy
+import json
+import logging
+import shutil
+from typing import Dict, List, Optional
+
+from advisor_core.circuit_breaker import CircuitBreaker
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class MCPClient:
+    """Reads the MCP server configuration and calls Bedrock for app-level prompts.
+
+    Prompts go straight to bedrock-runtime through the shared client, so a
+    call costs one HTTPS request rather than a server subprocess per run.
+    That client has its own short read timeout and retry budget, and callers
+    record outcomes on ``breaker`` so a failing service is skipped for a while.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or Settings()
+        self.servers = self._load_config()
+        self.breaker = CircuitBreaker(self.settings.bedrock_circuit_failures, self.settings.bedrock_circuit_reset)
+        # Different timeout fields give model calls their own pooled client
+        self.bedrock_settings = copy.copy(self.settings)
+        self.bedrock_settings.aws_read_timeout = self.settings.bedrock_timeout
+        self.bedrock_settings.aws_max_attempts = self.settings.bedrock_max_attempts
+
+    def _load_config(self) -> Dict[str, Dict]:
+        try:
+            with open(self.settings.mcp_config_path, 'r') as handle:
+                return json.load(handle).get('mcpServers', {})
+        except (OSError, ValueError) as e:
+            logger.info(f"No MCP configuration loaded: {str(e)}")
+            return {}
+
+    def check_servers(self) -> List[str]:
+        """Configured servers whose launch command is installed"""
+        return [name for name, server in self.servers.items() if shutil.which(server.get('command', ''))]
+
+    def call_bedrock(self, prompt: str, model_id: str = 'amazon.titan-text-express-v1',
+                     max_tokens: int = 800) -> str:
+        """Generate text with a Titan text model (raises on AWS errors and timeouts)"""
+        from advisor_core.aws_clients import get_client  # boto3 loads on the first AI call, not at startup
+        
+        response = get_client('bedrock-runtime', settings=self.bedrock_settings).invoke_model(
+            modelId=model_id,
+            body=json.dumps({
+                'inputText': prompt,
+                'textGenerationConfig': {'maxTokenCount': max_tokens, 'temperature': 0.5, 'topP': 0.9}
+            })
+        )
+        return json.loads(response['body'].read())['results'][0]['outputText']
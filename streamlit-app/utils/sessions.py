@@ -0,0 +1,186 @@
+"""
+Session Registry
+Compact per-session records shared by one process, idle-session eviction
+and a per-session memory report
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sidebar options; records store indexes into these instead of the strings
+RISK_TOLERANCES = ("Conservative", "Moderate", "Aggressive")
+TIME_HORIZONS = ("1-3 years", "3-5 years", "5-10 years", "10+ years")
+INVESTMENT_GOALS = ("Retirement", "Education", "Home Purchase", "Wealth Building", "Income Generation")
+
+LOCAL_SESSION = 'local'
+
+
+def deep_size(obj: Any) -> int:
+    """Approximate bytes reachable from ``obj``: containers, records and numpy buffers, each counted once"""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, type):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item, 0)
+        if isinstance(item, np.ndarray):
+            if item.base is None:
+                total += item.nbytes
+            else:
+                stack.append(item.base)
+        elif isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        else:
+            stack.extend(getattr(item, slot) for slot in getattr(type(item), '__slots__', ())
+                         if hasattr(item, slot))
+            if hasattr(item, '__dict__'):
+                stack.append(vars(item))
+    return total
+
+
+def process_rss() -> int:
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_session_id() -> str:
+    """Streamlit session id of the running script, or ``LOCAL_SESSION`` outside a script run"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else LOCAL_SESSION
+
+
+class SessionRecord:
+    """Everything the apps keep per browser session, packed into a few scalars.
+
+    The profile is stored as option indexes (goals as an ordered byte
+    string, since goals are funded in the order selected) and expanded to
+    the usual dict on demand. ``state_bytes`` is the last measured size of
+    the session's Streamlit state.
+    """
+
+    __slots__ = ('session_id', 'amount', 'tolerance', 'horizon', 'goals', 'risk_score',
+                 'ai_job', 'created', 'last_seen', 'state_bytes')
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.amount = 100000
+        self.tolerance = RISK_TOLERANCES.index("Moderate")
+        self.horizon = TIME_HORIZONS.index("5-10 years")
+        self.goals = b''
+        self.risk_score: Optional[float] = None
+        self.ai_job: Optional[str] = None
+        self.created = self.last_seen = time.time()
+        self.state_bytes = 0
+
+    def touch(self):
+        self.last_seen = time.time()
+
+    def update(self, profile: Dict[str, Any]):
+        """Store a sidebar profile dict"""
+        self.amount = int(profile['investment_amount'])
+        self.tolerance = RISK_TOLERANCES.index(profile['risk_tolerance'])
+        self.horizon = TIME_HORIZONS.index(profile['time_horizon'])
+        self.goals = bytes(INVESTMENT_GOALS.index(goal) for goal in profile['investment_goals'])
+        risk_score = profile.get('risk_score')
+        self.risk_score = None if risk_score is None else float(risk_score)
+
+    @property
+    def profile(self) -> Dict[str, Any]:
+        """The stored profile as the dict the engine takes (built per call, never kept)"""
+        profile = {
+            'investment_amount': self.amount,
+            'risk_tolerance': RISK_TOLERANCES[self.tolerance],
+            'time_horizon': TIME_HORIZONS[self.horizon],
+            'investment_goals': [INVESTMENT_GOALS[index] for index in self.goals],
+        }
+        if self.risk_score is not None:
+            profile['risk_score'] = self.risk_score
+        return profile
+
+    def measure(self, session_state: Dict[str, Any]):
+        """Record the approximate size of the session's Streamlit state"""
+        self.state_bytes = deep_size(session_state)
+
+
+class SessionRegistry:
+    """Process-wide table of session records with idle eviction.
+
+    At most once per ``sweep_interval`` seconds, any call to ``session``
+    drops records idle for longer than ``idle_ttl``, so sessions that went
+    away stop holding their record. The Streamlit sessions themselves are
+    left to Streamlit, which expires them once their browser disconnects;
+    a tab that comes back after eviction simply gets a new record, filled
+    in again from its sidebar on the next run.
+    """
+
+    def __init__(self, idle_ttl: float = 1800.0, sweep_interval: float = 60.0):
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self._records: Dict[str, SessionRecord] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def session(self, session_id: str) -> SessionRecord:
+        """The record for a session (created on first use), marked as seen now"""
+        with self._lock:
+            record = self._records.get(session_id)
+            if record is None:
+                record = self._records[session_id] = SessionRecord(session_id)
+            else:
+                record.touch()
+        if time.time() - self._last_sweep >= self.sweep_interval:
+            self.evict_idle()
+        return record
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """Drop records idle for longer than ``idle_ttl``; returns their session ids"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            evicted = [session_id for session_id, record in self._records.items()
+                       if now - record.last_seen > self.idle_ttl]
+            for session_id in evicted:
+                del self._records[session_id]
+            active = len(self._records)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} idle session records; {active} active")
+        return evicted
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-session memory and idle time, largest first"""
+        now = time.time()
+        with self._lock:
+            records = list(self._records.values())
+        rows = [{
+            'session': record.session_id[:8],
+            'idle_seconds': round(now - record.last_seen),
+            'age_seconds': round(now - record.created),
+            'record_bytes': deep_size(record),
+            'state_bytes': record.state_bytes,
+        } for record in records]
+        return sorted(rows, key=lambda row: -(row['record_bytes'] + row['state_bytes']))
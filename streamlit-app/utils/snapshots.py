@@ -0,0 +1,248 @@
+"""
+Portfolio Snapshots
+Columnar (Parquet) snapshots of user portfolio data, partitioned by
+snapshot date and risk tolerance, stored through the storage layer
+"""
+
+import hashlib
+import io
+import json
+import logging
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from utils.storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = 'snapshots/portfolios/'
+USER_DATA_PREFIX = 'user-data/'
+PARTITION_COLUMNS = ('snapshot_date', 'risk_tolerance')
+ALLOCATION_FIELDS = ('stocks', 'bonds', 'alternatives', 'cash')
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ('user_id', pa.string()),
+    ('investment_amount', pa.float64()),
+    ('time_horizon', pa.string()),
+    ('stocks', pa.float64()),
+    ('bonds', pa.float64()),
+    ('alternatives', pa.float64()),
+    ('cash', pa.float64()),
+    # Holdings outside the standard asset classes, kept as a JSON object
+    ('other_allocation', pa.string()),
+    ('updated_at', pa.string()),
+])
+
+# Filters use pyarrow's tuple form: [('risk_tolerance', '=', 'moderate'), ...]
+Filter = Tuple[str, str, Any]
+
+_OPERATORS = {
+    '=': lambda a, b: a == b,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+    'in': lambda a, b: a in b,
+    'not in': lambda a, b: a not in b,
+}
+
+
+class RangeReader(io.RawIOBase):
+    """Seekable file over ranged storage reads.
+
+    Parquet readers only fetch the footer and the column chunks they need,
+    so column projection and row-group pruning also cut bytes transferred.
+    """
+
+    def __init__(self, storage: StorageBackend, key: str):
+        self.storage = storage
+        self.key = key
+        self.length = storage.size(key)
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        else:
+            self.position = self.length + offset
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        if self.position >= self.length:
+            return 0
+        end = min(self.position + len(buffer), self.length) - 1
+        data = self.storage.get_range(self.key, self.position, end)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+def partition_key(snapshot_date: str, risk_tolerance: str, prefix: str = SNAPSHOT_PREFIX) -> str:
+    return f"{prefix}snapshot_date={snapshot_date}/risk_tolerance={risk_tolerance}/part-0.parquet"
+
+
+def parse_partition(key: str) -> Dict[str, str]:
+    """Extract hive-style ``name=value`` partition values from a key"""
+    values = {}
+    for segment in key.split('/'):
+        name, sep, value = segment.partition('=')
+        if sep and name in PARTITION_COLUMNS:
+            values[name] = value
+    return values
+
+
+def records_to_table(records: Iterable[Dict[str, Any]]) -> pa.Table:
+    """Flatten user-data JSON records into the snapshot schema"""
+    columns: Dict[str, List[Any]] = {field.name: [] for field in SNAPSHOT_SCHEMA}
+    for record in records:
+        allocation = {str(k).lower(): v for k, v in (record.get('current_portfolio') or {}).items()}
+        columns['user_id'].append(record.get('user_id'))
+        columns['investment_amount'].append(float(record.get('investment_amount', 0)))
+        columns['time_horizon'].append(record.get('time_horizon'))
+        for field in ALLOCATION_FIELDS:
+            columns[field].append(float(allocation.pop(field, 0)))
+        columns['other_allocation'].append(json.dumps(allocation) if allocation else None)
+        columns['updated_at'].append(record.get('timestamp'))
+    return pa.table(columns, schema=SNAPSHOT_SCHEMA)
+
+
+def write_snapshot(storage: StorageBackend, records: Iterable[Dict[str, Any]],
+                   snapshot_date: Optional[str] = None, prefix: str = SNAPSHOT_PREFIX,
+                   row_group_size: int = 64 * 1024) -> List[str]:
+    """Write records as one Parquet file per (date, risk tolerance) partition.
+
+    The records become the date's whole snapshot: partitions left from an
+    earlier write for the same date are deleted after the new ones land.
+    """
+    snapshot_date = snapshot_date or date.today().isoformat()
+
+    by_risk: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        risk = str(record.get('risk_tolerance', 'unknown')).lower()
+        by_risk.setdefault(risk, []).append(record)
+
+    files = {}
+    for risk, group in by_risk.items():
+        # Sorted user ids give tight row-group statistics for user lookups
+        table = records_to_table(group).sort_by('user_id')
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer, compression='zstd', row_group_size=row_group_size)
+        files[partition_key(snapshot_date, risk, prefix)] = buffer.getvalue()
+
+    storage.put_many(files, content_type='application/vnd.apache.parquet')
+    # The batch replaces the whole date: drop partitions an earlier run wrote
+    # that this one did not (e.g. a risk tolerance no client holds any more)
+    stale = [key for key in storage.list_keys(f"{prefix}snapshot_date={snapshot_date}/") if key not in files]
+    if stale:
+        storage.delete_many(stale)
+    logger.info(f"Wrote {sum(len(g) for g in by_risk.values())} records to {len(files)} partitions"
+                f"{f', removed {len(stale)} stale' if stale else ''}")
+    return sorted(files)
+
+
+def compact_user_data(storage: StorageBackend, snapshot_date: Optional[str] = None,
+                      source_prefix: str = USER_DATA_PREFIX, prefix: str = SNAPSHOT_PREFIX) -> List[str]:
+    """Compact the per-user JSON uploads under ``source_prefix`` into a snapshot"""
+    records = storage.load_json_prefix(source_prefix)
+    return write_snapshot(storage, records.values(), snapshot_date, prefix)
+
+
+def snapshot_dates(storage: StorageBackend, prefix: str = SNAPSHOT_PREFIX) -> List[str]:
+    """Snapshot dates present in storage, newest first"""
+    dates = {parse_partition(key).get('snapshot_date') for key in storage.list_keys(prefix, suffix='.parquet')}
+    return sorted((d for d in dates if d), reverse=True)
+
+
+def snapshot_version(storage: StorageBackend, snapshot_date: str, prefix: str = SNAPSHOT_PREFIX) -> str:
+    """Digest of a date's partition listing; changes whenever the date is recompacted"""
+    digest = hashlib.sha1()
+    objects = storage.list_objects(f"{prefix}snapshot_date={snapshot_date}/")
+    for obj in sorted(objects, key=lambda obj: obj['Key']):
+        if obj['Key'].endswith('.parquet'):
+            stamp = obj.get('ETag') or obj.get('LastModified')
+            digest.update(f"{obj['Key']}\x1f{obj['Size']}\x1f{stamp}\n".encode('utf-8'))
+    return digest.hexdigest()[:20]
+
+
+def _matches(value: Any, op: str, operand: Any) -> bool:
+    return _OPERATORS[op](value, operand)
+
+
+def _row_filter_expression(filters: Sequence[Filter]):
+    expression = None
+    for column, op, operand in filters:
+        field = pc.field(column)
+        if op == 'in':
+            term = field.isin(list(operand))
+        elif op == 'not in':
+            term = ~field.isin(list(operand))
+        else:
+            term = _OPERATORS[op](field, operand)
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def read_snapshots(storage: StorageBackend, columns: Optional[Sequence[str]] = None,
+                   filters: Optional[Sequence[Filter]] = None,
+                   prefix: str = SNAPSHOT_PREFIX) -> pa.Table:
+    """Read snapshot rows with column projection and predicate pushdown.
+
+    Predicates on partition columns prune whole files by key; the rest are
+    pushed into the Parquet reader, which skips row groups by statistics.
+    """
+    filters = list(filters or [])
+    partition_filters = [f for f in filters if f[0] in PARTITION_COLUMNS]
+    row_filters = [f for f in filters if f[0] not in PARTITION_COLUMNS]
+
+    for column, op, _ in filters:
+        if op not in _OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+
+    wanted_partitions = [c for c in PARTITION_COLUMNS if columns is None or c in columns]
+    data_columns = None
+    if columns is not None:
+        data_columns = [c for c in columns if c not in PARTITION_COLUMNS]
+        # Filter columns must be read even if they are not returned
+        data_columns += [c for c, _, _ in row_filters if c not in data_columns]
+
+    keys = []
+    for key in storage.list_keys(prefix, suffix='.parquet'):
+        partition = parse_partition(key)
+        if all(_matches(partition.get(column), op, operand) for column, op, operand in partition_filters):
+            keys.append((key, partition))
+
+    tables = []
+    expression = _row_filter_expression(row_filters) if row_filters else None
+    for key, partition in keys:
+        table = pq.read_table(RangeReader(storage, key), columns=data_columns, filters=expression)
+        for column in wanted_partitions:
+            table = table.append_column(column, pa.array([partition.get(column)] * table.num_rows, pa.string()))
+        tables.append(table)
+
+    if tables:
+        table = pa.concat_tables(tables)
+    else:
+        schema = SNAPSHOT_SCHEMA
+        for column in PARTITION_COLUMNS:
+            schema = schema.append(pa.field(column, pa.string()))
+        table = schema.empty_table()
+    if columns is not None:
+        table = table.select(list(columns))
+    return table
@@ -0,0 +1,237 @@
+"""
+Storage Layer
+Bulk object I/O for the investment data and knowledge base buckets, with an
+S3 backend and a local-filesystem backend for development and tests
+"""
+
+import io
+import json
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# LocalStorage writes land in hidden temp files next to their target first
+TMP_PREFIX = '.'
+TMP_SUFFIX = '.tmp'
+
+
+class StorageBackend(ABC):
+    """Common bulk operations built on a few per-object primitives.
+
+    Backends implement ``list_objects``, ``get_bytes``, ``put_bytes``,
+    ``delete_many`` and ``size``; the bulk helpers fan those out over a thread pool so loading
+    thousands of small objects is bounded by bandwidth rather than by
+    sequential round-trips.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        # Match the HTTP pool size so workers never queue for a connection
+        self.max_workers = max_workers or Settings().aws_max_pool_connections
+
+    # Per-object primitives
+    @abstractmethod
+    def list_objects(self, prefix: str = '') -> Iterator[Dict[str, Any]]:
+        """Objects under a prefix as ``{'Key', 'Size', 'LastModified'}`` dicts"""
+
+    @abstractmethod
+    def get_bytes(self, key: str, byte_range: Optional[Tuple[int, int]] = None) -> bytes:
+        """Read an object, or the inclusive ``(start, end)`` byte range of it"""
+
+    @abstractmethod
+    def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None) -> None:
+        """Write an object, replacing any existing one"""
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """Delete objects; keys that do not exist are ignored"""
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        """Object size in bytes"""
+
+    # Convenience helpers
+    def list_keys(self, prefix: str = '', suffix: str = '') -> List[str]:
+        return [obj['Key'] for obj in self.list_objects(prefix) if obj['Key'].endswith(suffix)]
+
+    def get_json(self, key: str) -> Any:
+        return json.loads(self.get_bytes(key))
+
+    def put_json(self, key: str, data: Any) -> None:
+        self.put_bytes(key, json.dumps(data, separators=(',', ':')).encode('utf-8'), 'application/json')
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        return self.get_bytes(key, (start, end))
+
+    # Bulk operations
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Fetch many objects concurrently"""
+        keys = list(keys)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return dict(zip(keys, pool.map(self.get_bytes, keys)))
+
+    def put_many(self, items: Dict[str, bytes], content_type: Optional[str] = None) -> None:
+        """Write many objects concurrently"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(lambda item: self.put_bytes(item[0], item[1], content_type), items.items()))
+
+    def load_json_prefix(self, prefix: str) -> Dict[str, Any]:
+        """Load every JSON object under a prefix (e.g. ``user-data/``)"""
+        blobs = self.get_many(self.list_keys(prefix, suffix='.json'))
+        return {key: json.loads(blob) for key, blob in blobs.items()}
+
+    def download_large(self, key: str, part_size: int = 8 * MB) -> bytes:
+        """Download a large object as concurrent ranged parts"""
+        total = self.size(key)
+        if total <= part_size:
+            return self.get_bytes(key)
+
+        ranges = [(start, min(start + part_size, total) - 1) for start in range(0, total, part_size)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            parts = pool.map(lambda byte_range: self.get_bytes(key, byte_range), ranges)
+            return b''.join(parts)
+
+
+class S3Storage(StorageBackend):
+    """S3 bucket backend using the shared pooled client"""
+
+    def __init__(self, bucket: str, client=None, max_workers: Optional[int] = None,
+                 multipart_threshold: int = 16 * MB, multipart_chunksize: int = 8 * MB):
+        super().__init__(max_workers)
+        if client is None:
+            from advisor_core.aws_clients import get_client
+            client = get_client('s3')
+        self.bucket = bucket
+        self.client = client
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunksize = multipart_chunksize
+
+    def list_objects(self, prefix: str = '') -> Iterator[Dict[str, Any]]:
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield obj
+
+    def get_bytes(self, key: str, byte_range: Optional[Tuple[int, int]] = None) -> bytes:
+        kwargs = {'Bucket': self.bucket, 'Key': key}
+        if byte_range is not None:
+            kwargs['Range'] = f"bytes={byte_range[0]}-{byte_range[1]}"
+        return self.client.get_object(**kwargs)['Body'].read()
+
+    def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None) -> None:
+        extra_args = {'ContentType': content_type} if content_type else {}
+        if len(data) < self.multipart_threshold:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=data, **extra_args)
+        else:
+            self.upload_fileobj(io.BytesIO(data), key, extra_args)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        # DeleteObjects takes at most 1000 keys per request
+        for start in range(0, len(keys), 1000):
+            batch = [{'Key': key} for key in keys[start:start + 1000]]
+            response = self.client.delete_objects(Bucket=self.bucket, Delete={'Objects': batch, 'Quiet': True})
+            for error in response.get('Errors', []):
+                logger.warning(f"Delete failed for {error.get('Key')}: {error.get('Message')}")
+
+    def size(self, key: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=key)['ContentLength']
+
+    def _transfer_config(self):
+        from boto3.s3.transfer import TransferConfig
+        return TransferConfig(
+            multipart_threshold=self.multipart_threshold,
+            multipart_chunksize=self.multipart_chunksize,
+            max_concurrency=self.max_workers
+        )
+
+    def upload_fileobj(self, fileobj, key: str, extra_args: Optional[Dict[str, str]] = None) -> None:
+        """Concurrent multipart upload for large objects"""
+        self.client.upload_fileobj(fileobj, self.bucket, key, ExtraArgs=extra_args or None,
+                                   Config=self._transfer_config())
+
+    def upload_file(self, path: str, key: str) -> None:
+        self.client.upload_file(path, self.bucket, key, Config=self._transfer_config())
+
+    def download_file(self, key: str, path: str) -> None:
+        """Concurrent multipart download straight to disk"""
+        self.client.download_file(self.bucket, key, path, Config=self._transfer_config())
+
+
+class LocalStorage(StorageBackend):
+    """Directory-backed storage with S3-style keys, for local runs and tests"""
+
+    def __init__(self, root: str, max_workers: Optional[int] = None):
+        super().__init__(max_workers)
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Key escapes storage root: {key}")
+        return path
+
+    def list_objects(self, prefix: str = '') -> Iterator[Dict[str, Any]]:
+        # Only walk the directory that can contain the prefix
+        start = os.path.join(self.root, os.path.dirname(prefix))
+        for directory, _, files in os.walk(start):
+            for name in sorted(files):
+                if name.startswith(TMP_PREFIX) and name.endswith(TMP_SUFFIX):
+                    continue  # an in-progress or abandoned put_bytes
+                path = os.path.join(directory, name)
+                key = os.path.relpath(path, self.root).replace(os.sep, '/')
+                if key.startswith(prefix):
+                    stat = os.stat(path)
+                    yield {'Key': key, 'Size': stat.st_size,
+                           'LastModified': datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)}
+
+    def get_bytes(self, key: str, byte_range: Optional[Tuple[int, int]] = None) -> bytes:
+        with open(self._path(key), 'rb') as handle:
+            if byte_range is None:
+                return handle.read()
+            handle.seek(byte_range[0])
+            return handle.read(byte_range[1] - byte_range[0] + 1)
+
+    def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None) -> None:
+        path = self._path(key)
+        directory, name = os.path.split(path)
+        os.makedirs(directory, exist_ok=True)
+        # A unique temp file per write, so concurrent writers of one key never share it
+        handle = tempfile.NamedTemporaryFile(dir=directory, prefix=f"{TMP_PREFIX}{name}.", suffix=TMP_SUFFIX,
+                                             delete=False)
+        try:
+            with handle:
+                handle.write(data)
+            os.replace(handle.name, path)
+        except BaseException:
+            if os.path.exists(handle.name):
+                os.unlink(handle.name)
+            raise
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self._path(key))
+
+
+def get_storage(bucket: str, settings: Optional[Settings] = None) -> StorageBackend:
+    """Storage for a bucket; ``STORAGE_LOCAL_ROOT`` switches to the filesystem backend"""
+    settings = settings or Settings()
+    if settings.storage_local_root:
+        return LocalStorage(os.path.join(settings.storage_local_root, bucket))
+    return S3Storage(bucket)
@@ -83,6 +83,7 @@ variable "bedrock_models" {
   default = [
     "amazon.titan-text-express-v1",
     "amazon.nova-pro-v1:0",
+    "amazon.nova-lite-v1:0",
     "anthropic.claude-3-haiku-20240307-v1:0"
   ]
 }